@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from typing import TYPE_CHECKING, Callable, ClassVar, Iterator
+
+from qgis.core import Qgis, QgsProject
+
+from arho_feature_template.utils.misc_utils import iface
+
+try:
+    # Edit buffer groups are available from QGIS 3.26 on
+    from qgis.core import QgsVectorLayerEditBufferGroup
+except ImportError:
+    QgsVectorLayerEditBufferGroup = None  # type: ignore[assignment,misc]
+
+if TYPE_CHECKING:
+    from qgis.core import QgsVectorLayer
+
+logger = logging.getLogger(__name__)
+
+
+class EditTransaction:
+    """
+    Collects inserts, updates and deletes of several layers into their edit buffers and commits them at once.
+
+    While a transaction is active, features are only written to the edit buffers of the layers. When the
+    outermost transaction ends, all buffered changes are committed in a single database transaction and
+    rolled back together if any of the layers fails to commit. On QGIS versions without edit buffer groups
+    the layers are committed in turn, and only the layers not committed yet are rolled back on failure.
+    """
+
+    _active: ClassVar[EditTransaction | None] = None
+
+    def __init__(self, edit_text: str = ""):
+        self.edit_text = edit_text
+        self.layers: dict[str, QgsVectorLayer] = {}
+        # Undo stack positions of the layers when they joined the transaction
+        self._undo_indexes: dict[str, int] = {}
+        # Layers that were not editable before the transaction
+        self._started_layer_ids: set[str] = set()
+        self.edit_count = 0
+        self.failed_edit_count = 0
+        self.commit_errors: list[str] = []
+        # Errors of single edits, reported together with the result of the transaction
+        self.edit_errors: list[str] = []
+        self.committed: bool | None = None
+
+    @classmethod
+    def active(cls) -> EditTransaction | None:
+        return cls._active
+
+    def add_layer(self, layer: QgsVectorLayer) -> None:
+        if layer.id() in self.layers:
+            return
+        if not layer.isEditable():
+            layer.startEditing()
+            self._started_layer_ids.add(layer.id())
+        self.layers[layer.id()] = layer
+        self._undo_indexes[layer.id()] = layer.undoStack().index()
+
+    def record_edit(self, layer: QgsVectorLayer, success: bool) -> bool:  # noqa: FBT001
+        self.add_layer(layer)
+        self.edit_count += 1
+        if not success:
+            self.failed_edit_count += 1
+        return success
+
+    def commit(self) -> bool:
+        if self.failed_edit_count > 0:
+            self.commit_errors.append(f"{self.failed_edit_count} muutosta ei voitu lisätä muokkauspuskuriin")
+            self.rollback()
+            return False
+
+        layers = [layer for layer in self.layers.values() if layer.isModified()]
+        if not layers:
+            return True
+
+        project = QgsProject.instance()
+        if QgsVectorLayerEditBufferGroup is None:
+            success, errors = self._commit_layers_in_turn(layers)
+        elif project.transactionMode() == Qgis.TransactionMode.BufferedGroups:
+            # Project edit buffer group already commits all of its layers in one transaction
+            success, errors = project.commitChanges(False, layers[0])
+        else:
+            edit_buffer_group = QgsVectorLayerEditBufferGroup()
+            for layer in layers:
+                edit_buffer_group.addLayer(layer)
+            success, errors = edit_buffer_group.commitChanges(False)
+
+        if not success:
+            self.commit_errors.extend(errors)
+            self.rollback()
+            return False
+
+        logger.info("%s: committed %d edits to %d layers", self.edit_text, self.edit_count, len(layers))
+        return True
+
+    @staticmethod
+    def _commit_layers_in_turn(layers: list[QgsVectorLayer]) -> tuple[bool, list[str]]:
+        for layer in layers:
+            if not layer.commitChanges(False):
+                return False, layer.commitErrors()
+        return True, []
+
+    def rollback(self) -> None:
+        """
+        Discards the edits made in the transaction.
+
+        Edits that were in the edit buffers before the transaction are kept by undoing the layers back to where
+        their undo stacks were when they joined the transaction.
+        """
+        for layer_id, layer in self.layers.items():
+            if not layer.isEditable():
+                continue
+            if layer_id in self._started_layer_ids:
+                layer.rollBack(False)
+            else:
+                layer.undoStack().setIndex(self._undo_indexes[layer_id])
+
+    def add_edit_error(self, message: str) -> None:
+        self.edit_errors.append(message)
+
+    def report_failure(self) -> None:
+        message = f"{self.edit_text} epäonnistui." if self.edit_text else "Tallentaminen epäonnistui."
+        errors = [*self.edit_errors, *self.commit_errors]
+        if errors:
+            message = f"{message} {'; '.join(errors)}"
+        logger.warning(message)
+        iface.messageBar().pushCritical("", message)
+
+
+@contextmanager
+def edit_transaction(edit_text: str = "") -> Iterator[EditTransaction]:
+    """
+    Context manager that buffers all edits made inside it into one transaction.
+
+    Nested calls join the outermost transaction, which is the only one that commits.
+    """
+    active = EditTransaction.active()
+    if active is not None:
+        yield active
+        return
+
+    transaction = EditTransaction(edit_text)
+    EditTransaction._active = transaction  # noqa: SLF001
+    try:
+        yield transaction
+    except Exception:
+        transaction.rollback()
+        raise
+    finally:
+        EditTransaction._active = None  # noqa: SLF001
+
+    transaction.committed = transaction.commit()
+    if not transaction.committed or transaction.edit_errors:
+        transaction.report_failure()
+
+
+def report_edit_error(message: str) -> None:
+    """Shows the error of an edit, or inside an edit transaction leaves it to the single report of the transaction."""
+    transaction = EditTransaction.active()
+    if transaction is not None:
+        transaction.add_edit_error(message)
+        return
+    logger.warning(message)
+    iface.messageBar().pushCritical("", message)
+
+
+def transactional(edit_text: str) -> Callable:
+    """
+    Decorator running the function inside `edit_transaction`.
+
+    If the outermost transaction fails to commit, the decorated function returns None.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with edit_transaction(edit_text) as transaction:
+                result = func(*args, **kwargs)
+            if transaction.committed is False:
+                return None
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from qgis.core import QgsApplication, QgsFeatureRequest, QgsProject, QgsTask, QgsVectorLayerFeatureSource
+from qgis.PyQt.QtCore import QObject, pyqtSignal
+
+from arho_feature_template.core.edit_transaction import edit_transaction
+from arho_feature_template.core.models import PlanFeature
+from arho_feature_template.project.layers.plan_layers import (
+    FEATURE_LAYER_NAME_TO_CLASS_MAP,
+    RegulationGroupAssociationLayer,
+)
+from arho_feature_template.utils.misc_utils import get_active_plan_id
+
+if TYPE_CHECKING:
+    from qgis.core import QgsCoordinateReferenceSystem, QgsFeature, QgsVectorLayer
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+# Number of read chunks allowed to wait for writing, limits the number of source features held in memory
+MAX_PENDING_CHUNKS = 2
+
+
+class FeatureReadTask(QgsTask):
+    """
+    Reads features of a source layer in chunks in a background task and converts them into plan feature models.
+
+    Geometries are transformed into the target CRS by the feature request and converted to multi type.
+    Each converted chunk is emitted with `chunk_read`. Reading pauses while `MAX_PENDING_CHUNKS` chunks are
+    waiting to be written, so `release_chunk` must be called after each chunk has been handled.
+    """
+
+    chunk_read = pyqtSignal(list)
+
+    def __init__(
+        self,
+        source_layer: QgsVectorLayer,
+        target_crs: QgsCoordinateReferenceSystem,
+        target_layer_name: str,
+        type_of_underground_id: str | None,
+        name_field: str | None,
+        description_field: str | None,
+        selected_features_only: bool,  # noqa: FBT001
+    ):
+        super().__init__(f"ARHO: kaavakohteiden tuonti tasolta {source_layer.name()}", QgsTask.CanCancel)
+        self.feature_source = QgsVectorLayerFeatureSource(source_layer)
+        self.target_layer_name = target_layer_name
+        self.type_of_underground_id = type_of_underground_id
+        self.name_field = name_field
+        self.description_field = description_field
+
+        self.request = QgsFeatureRequest()
+        self.request.setDestinationCrs(target_crs, QgsProject.instance().transformContext())
+        attributes = [field for field in (name_field, description_field) if field]
+        if attributes:
+            self.request.setSubsetOfAttributes(attributes, source_layer.fields())
+        else:
+            self.request.setNoAttributes()
+        if selected_features_only:
+            self.request.setFilterFids(source_layer.selectedFeatureIds())
+            self.total_count = source_layer.selectedFeatureCount()
+        else:
+            self.total_count = source_layer.featureCount()
+
+        self.read_count = 0
+        self._pending_chunks = threading.Semaphore(MAX_PENDING_CHUNKS)
+        self.exception: Exception | None = None
+
+    def release_chunk(self):
+        self._pending_chunks.release()
+
+    def run(self) -> bool:
+        try:
+            chunk: list[PlanFeature] = []
+            for feature in self.feature_source.getFeatures(self.request):
+                if self.isCanceled():
+                    return False
+                chunk.append(self._model_from_feature(feature))
+                if len(chunk) >= CHUNK_SIZE:
+                    if not self._emit_chunk(chunk):
+                        return False
+                    chunk = []
+            if chunk and not self._emit_chunk(chunk):
+                return False
+        except Exception as e:  # noqa: BLE001
+            self.exception = e
+            return False
+        return not self.isCanceled()
+
+    def _emit_chunk(self, chunk: list[PlanFeature]) -> bool:
+        # Wait for the writer to catch up, but stop waiting if the task gets cancelled
+        while not self._pending_chunks.acquire(timeout=0.1):
+            if self.isCanceled():
+                return False
+        self.read_count += len(chunk)
+        self.chunk_read.emit(chunk)
+        if self.total_count > 0:
+            self.setProgress(100 * min(self.read_count / self.total_count, 1))
+        return True
+
+    def _model_from_feature(self, feature: QgsFeature) -> PlanFeature:
+        geom = feature.geometry()
+        if not geom.isMultipart():
+            geom.convertToMultiType()
+        return PlanFeature(
+            geom=geom,
+            type_of_underground_id=self.type_of_underground_id,
+            layer_name=self.target_layer_name,
+            name=feature[self.name_field] if self.name_field else None,
+            description=feature[self.description_field] if self.description_field else None,
+        )
+
+
+class FeatureImporter(QObject):
+    """
+    Imports features of a source layer into a plan feature layer.
+
+    Source features are read and converted in a `FeatureReadTask`. Each chunk is added to the target layer
+    (and the regulation group association layer) with `addFeatures` and committed in one transaction.
+    """
+
+    progress_changed = pyqtSignal(float)
+    # Number of imported features, number of features not imported because of errors, whether the user cancelled
+    finished = pyqtSignal(int, int, bool)
+
+    def __init__(self, target_layer: QgsVectorLayer, regulation_group_ids: list[str]):
+        super().__init__()
+        self.target_layer = target_layer
+        self.target_layer_class = FEATURE_LAYER_NAME_TO_CLASS_MAP.get(target_layer.name())
+        if not self.target_layer_class:
+            msg = f"Could not find plan feature layer class for layer name {target_layer.name()}"
+            raise ValueError(msg)
+        self.regulation_group_ids = regulation_group_ids
+        self.plan_id = get_active_plan_id()
+
+        self.task: FeatureReadTask | None = None
+        self.imported_count = 0
+        self.failed_count = 0
+        self._write_failed = False
+
+    def start(self, task: FeatureReadTask):
+        self.task = task
+        self.task.chunk_read.connect(self._write_chunk)
+        self.task.taskCompleted.connect(self._on_task_done)
+        self.task.taskTerminated.connect(self._on_task_done)
+        QgsApplication.taskManager().addTask(self.task)
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    def is_running(self) -> bool:
+        return self.task is not None
+
+    def _write_chunk(self, models: list[PlanFeature]):
+        task = self.task
+        if task is None:
+            return
+        try:
+            if task.isCanceled():
+                return
+
+            features = [self.target_layer_class.feature_from_model(model, self.plan_id) for model in models]
+            with edit_transaction("Kaavakohteiden tuonti") as transaction:
+                transaction.add_layer(self.target_layer)
+                success = self.target_layer.addFeatures(features)
+                transaction.record_edit(self.target_layer, success)
+                if success and self.regulation_group_ids:
+                    association_layer = RegulationGroupAssociationLayer.get_from_project()
+                    transaction.add_layer(association_layer)
+                    associations = [
+                        RegulationGroupAssociationLayer.feature_from(group_id, self.target_layer.name(), feature["id"])
+                        for group_id in self.regulation_group_ids
+                        for feature in features
+                    ]
+                    transaction.record_edit(association_layer, association_layer.addFeatures(associations))
+
+            if transaction.committed:
+                self.imported_count += len(features)
+                if task.total_count > 0:
+                    self.progress_changed.emit(100 * min(self.imported_count / task.total_count, 1))
+            else:
+                # Stop importing, features of earlier chunks have been committed already
+                self._write_failed = True
+                task.cancel()
+        finally:
+            task.release_chunk()
+
+    def _on_task_done(self):
+        task = self.task
+        self.task = None
+        if task is None:
+            return
+        if task.exception is not None:
+            logger.warning("Reading features to import failed: %s", task.exception)
+        failed = self._write_failed or task.exception is not None
+        if failed:
+            self.failed_count = max(task.total_count - self.imported_count, 0)
+        self.finished.emit(self.imported_count, self.failed_count, task.isCanceled() and not failed)
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import enum
 import logging
+from collections import UserList
 from dataclasses import dataclass, field, fields
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, Callable, Iterable, MutableSequence, cast
 
 from arho_feature_template.project.layers.code_layers import (
     AdditionalInformationTypeLayer,
@@ -55,18 +56,21 @@ class FeatureTemplateLibrary:
     description: str | None = None
     feature_templates: list[PlanFeature] = field(default_factory=list, compare=False)
 
-    @classmethod
-    def find_matching_group_config(cls, group_heading: str, regulation_group_libraries: list[RegulationGroupLibrary]):
-        for library in regulation_group_libraries:
-            for group in library.regulation_groups:
-                if group.heading == group_heading:
-                    return group
-        return None
-
     @classmethod
     def from_template_dict(
-        cls, data: dict, regulation_group_libraries: list[RegulationGroupLibrary]
+        cls,
+        data: dict,
+        regulation_group_libraries: list[RegulationGroupLibrary],
+        group_index: RegulationGroupHeadingIndex | None = None,
     ) -> FeatureTemplateLibrary:
+        """
+        Returns the feature template library described by the data.
+
+        Regulation group headings of the templates are resolved with `group_index`, which is built from
+        `regulation_group_libraries` if not given. Headings that are not found are left out.
+        """
+        if group_index is None:
+            group_index = RegulationGroupHeadingIndex(regulation_group_libraries)
         get_underground_id = UndergroundTypeLayer.get_attribute_value_by_another_attribute_value
         try:
             return FeatureTemplateLibrary(
@@ -87,7 +91,7 @@ class FeatureTemplateLibrary:
                         regulation_groups=[
                             group
                             for group_heading in feature_data.get("regulation_groups", [])
-                            if (group := cls.find_matching_group_config(group_heading, regulation_group_libraries))
+                            if (group := group_index.resolve(group_heading))
                         ],
                         plan_id=None,
                         id_=None,
@@ -101,6 +105,41 @@ class FeatureTemplateLibrary:
             raise TemplateSyntaxError(str(cls), str(e)) from e
 
 
+class RegulationGroupHeadingIndex:
+    """
+    Regulation groups of libraries by heading, for resolving the regulation groups of feature templates.
+
+    If several groups have the same heading, the first one in library order is used, like a search through the
+    libraries would find. Headings that were ambiguous or not found when resolved are collected for reporting.
+    """
+
+    def __init__(self, regulation_group_libraries: list[RegulationGroupLibrary]):
+        self.groups: dict[str, RegulationGroup] = {}
+        # Names of the libraries of the groups of each heading that occurs more than once
+        self._duplicates: dict[str, list[str]] = {}
+        self.ambiguous_headings: dict[str, list[str]] = {}
+        self.unresolved_headings: set[str] = set()
+
+        library_names: dict[str, str] = {}
+        for library in regulation_group_libraries:
+            for group in library.regulation_groups:
+                if group.heading is None:
+                    continue
+                if group.heading not in self.groups:
+                    self.groups[group.heading] = group
+                    library_names[group.heading] = library.name
+                else:
+                    self._duplicates.setdefault(group.heading, [library_names[group.heading]]).append(library.name)
+
+    def resolve(self, group_heading: str) -> RegulationGroup | None:
+        group = self.groups.get(group_heading)
+        if group is None:
+            self.unresolved_headings.add(group_heading)
+        elif group_heading in self._duplicates:
+            self.ambiguous_headings[group_heading] = self._duplicates[group_heading]
+        return group
+
+
 @dataclass
 class RegulationGroupLibrary:
     """A collection of plan regulation groups."""
@@ -164,6 +203,45 @@ class PlanBaseModel:
             setattr(self, _field.name, null_to_none(value))
 
 
+class LazyModelList(UserList):
+    """
+    List of child models that are loaded with the given loader when the list is first accessed.
+
+    Used for children of models whose own attributes are often enough, like regulation groups listed by name.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Any]]):
+        # UserList.__init__ is not called, since it would set the data
+        self._loader: Callable[[], Iterable[Any]] | None = loader
+        self._data: list[Any] | None = None
+
+    @property
+    def data(self) -> list[Any]:  # type: ignore[override]
+        if self._data is None:
+            loader = cast(Callable[[], Iterable[Any]], self._loader)
+            self._data = list(loader())
+            self._loader = None
+        return self._data
+
+    @data.setter
+    def data(self, value: list[Any]):
+        self._data = value
+        self._loader = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._data is not None
+
+    def __eq__(self, other: object) -> bool:
+        # Comparing to other values, like NULL checks in PlanBaseModel, should not load the list. Unknown types
+        # are left to the other operand, so equality stays symmetric.
+        if not isinstance(other, (list, UserList)):
+            return NotImplemented
+        return super().__eq__(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
 @dataclass
 class AttributeValue(PlanBaseModel):
     value_data_type: AttributeValueDataType | None = None
@@ -332,8 +410,9 @@ class RegulationGroup(PlanBaseModel):
     letter_code: str | None = None
     color_code: str | None = None
     group_number: int | None = None
-    regulations: list[Regulation] = field(default_factory=list, compare=False)
-    propositions: list[Proposition] = field(default_factory=list, compare=False)
+    # Lists, or `LazyModelList`s for groups whose children are loaded when accessed
+    regulations: MutableSequence[Regulation] = field(default_factory=list, compare=False)
+    propositions: MutableSequence[Proposition] = field(default_factory=list, compare=False)
     modified: bool = field(compare=False, default=True)
     category: str | None = None
     id_: str | None = None
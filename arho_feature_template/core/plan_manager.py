@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+from contextlib import suppress
 from pathlib import Path
 from typing import TYPE_CHECKING, Generator, Iterable, cast
 
@@ -10,6 +11,12 @@ from qgis.gui import QgsMapToolDigitizeFeature
 from qgis.PyQt.QtCore import QObject, pyqtSignal
 from qgis.PyQt.QtWidgets import QDialog
 
+from arho_feature_template.core.edit_transaction import (
+    EditTransaction,
+    edit_transaction,
+    report_edit_error,
+    transactional,
+)
 from arho_feature_template.core.lambda_service import LambdaService
 from arho_feature_template.core.models import (
     AdditionalInformation,
@@ -19,8 +26,11 @@ from arho_feature_template.core.models import (
     Plan,
     PlanFeature,
     RegulationGroup,
+    RegulationGroupHeadingIndex,
     RegulationGroupLibrary,
 )
+from arho_feature_template.core.plan_tree_loader import PlanTreeLoader
+from arho_feature_template.core.project_initializer import LibraryTemplates, ProjectInitializer, library_template_files
 from arho_feature_template.core.template_manager import TemplateManager
 from arho_feature_template.exceptions import UnsavedChangesError
 from arho_feature_template.gui.dialogs.import_features_form import ImportFeaturesForm
@@ -35,12 +45,14 @@ from arho_feature_template.gui.dialogs.serialize_plan_matter import SerializePla
 from arho_feature_template.gui.docks.new_feature_dock import NewFeatureDock
 from arho_feature_template.gui.docks.regulation_groups_dock import RegulationGroupsDock
 from arho_feature_template.gui.tools.inspect_plan_features_tool import InspectPlanFeatures
+from arho_feature_template.project.layers import clear_attribute_filters
 from arho_feature_template.project.layers.code_layers import (
     AdditionalInformationTypeLayer,
     PlanRegulationGroupTypeLayer,
     PlanRegulationTypeLayer,
     code_layers,
 )
+from arho_feature_template.project.layers.identity_map import model_identity_map
 from arho_feature_template.project.layers.plan_layers import (
     FEATURE_LAYER_NAME_TO_CLASS_MAP,
     AdditionalInformationLayer,
@@ -48,20 +60,18 @@ from arho_feature_template.project.layers.plan_layers import (
     LegalEffectAssociationLayer,
     LifeCycleLayer,
     PlanLayer,
+    PlanModelLoader,
     PlanPropositionLayer,
     PlanRegulationLayer,
     PlanThemeAssociationLayer,
     RegulationGroupAssociationLayer,
     RegulationGroupLayer,
     TypeOfVerbalRegulationAssociationLayer,
+    apply_plan_filters,
+    indexed_layers,
     plan_layers,
 )
-from arho_feature_template.resources.libraries.feature_templates import feature_template_library_config_files
-from arho_feature_template.resources.libraries.regulation_groups import (
-    get_default_regulation_group_library_config_files,
-    get_user_regulation_group_library_config_files,
-    set_user_regulation_group_library_config_files,
-)
+from arho_feature_template.resources.libraries.regulation_groups import set_user_regulation_group_library_config_files
 from arho_feature_template.utils.db_utils import get_existing_database_connection_names
 from arho_feature_template.utils.misc_utils import (
     check_layer_changes,
@@ -73,6 +83,7 @@ from arho_feature_template.utils.misc_utils import (
     set_imported_layer_invisible,
     use_wait_cursor,
 )
+from arho_feature_template.utils.project_utils import layer_registry
 
 if TYPE_CHECKING:
     from arho_feature_template.core.models import Proposition, Regulation
@@ -93,6 +104,7 @@ class PlanManager(QObject):
     plan_unset = pyqtSignal()
     project_loaded = pyqtSignal()
     project_cleared = pyqtSignal()
+    libraries_loaded = pyqtSignal()
     plan_identifier_set = pyqtSignal(str)
 
     def __init__(self):
@@ -103,6 +115,17 @@ class PlanManager(QObject):
 
         self.feature_template_libraries = []
         self.regulation_group_libraries = []
+        self.libraries_ready = False
+
+        # Initialize project initialization stages
+        self.project_initializer = ProjectInitializer()
+        self.project_initializer.code_layers_ready.connect(self._on_code_layers_ready)
+        self.project_initializer.library_templates_ready.connect(self._on_library_templates_ready)
+
+        # Regulation groups changed since the last active plan regulation group library update
+        self._changed_regulation_group_ids: set[str] = set()
+        self._regulation_groups_removed = False
+        self._regulation_group_layer: QgsVectorLayer | None = None
 
         # Initialize new feature dock
         self.new_feature_dock = NewFeatureDock(iface.mainWindow())
@@ -146,84 +169,154 @@ class PlanManager(QObject):
         self.lambda_service.plan_jsons_received.connect(self.save_plan_jsons)
         self.lambda_service.plan_matter_json_received.connect(self.save_plan_matter_json)
 
-    def initialize_from_project(self):
-        # # If project is not open, don't try to initialize
-        # # NOTE: QgsProject.instance(), QgsProject().fileInfo() and QgsProject().fileIName()
-        # # don't seem to work as indicators whether a project is open?
-        # if not QgsProject.instance() or not QgsProject().fileInfo():
-        #     return
-        self.cache_code_layers()
-        self.initialize_libraries()
+    def get_missing_layers(self) -> list[str]:
+        """Returns the names of all required layers missing from the project."""
+        return layer_registry.missing_layer_names(layer.name for layer in code_layers + plan_layers)
 
     def check_required_layers(self):
-        missing_layers = []
-        for layer in code_layers + plan_layers:
-            if not layer.exists():
-                missing_layers.append(layer.name)  # noqa: PERF401
+        missing_layers = self.get_missing_layers()
         if len(missing_layers) > 0:  # noqa: SIM103
             # iface.messageBar().pushWarning("", f"Project is missing required layers: {', '.join(missing_layers)}")
             return False
         return True
 
-    def cache_code_layers(self):
-        # Cannot cache code layers if layers are not present
-        if not self.check_required_layers():
-            return
-
-        @use_wait_cursor
-        def _cache_code_layers():
-            PlanRegulationTypeLayer.build_cache()
-            AdditionalInformationTypeLayer.build_cache()
-
-        _cache_code_layers()
+    def initialize_libraries(self, templates: LibraryTemplates | None = None):
+        """
+        Initializes the regulation group and plan feature libraries from parsed library templates.
 
-    def initialize_libraries(self):
-        self._initialize_regulation_group_libraries()
-        self._initialize_plan_feature_libraries()
+        If templates are not given, the library files are parsed first.
+        """
+        if templates is None:
+            templates = LibraryTemplates.parse(*library_template_files())
+        templates.report_failures()
+        self._initialize_regulation_group_libraries(templates)
+        self._initialize_plan_feature_libraries(templates)
 
-    def _initialize_regulation_group_libraries(self):
+    def _initialize_regulation_group_libraries(self, templates: LibraryTemplates):
         # Cannot initialize regulation group librarires if regulation layer is not found
         if not self.check_required_layers():
             return
 
-        self.regulation_group_libraries: list[RegulationGroupLibrary] = []
-        self.regulation_group_libraries = [
-            RegulationGroupLibrary.from_template_dict(
-                data=TemplateManager.read_regulation_group_template_file(file_path),
-                library_type=RegulationGroupLibrary.LibraryType.DEFAULT,
-                file_path=str(file_path),
-            )
-            for file_path in get_default_regulation_group_library_config_files()
+        self.regulation_group_libraries: list[RegulationGroupLibrary] = [
+            RegulationGroupLibrary.from_template_dict(data=data, library_type=library_type, file_path=file_path)
+            for data, library_type, file_path in templates.regulation_group_templates
         ]
-        self.regulation_group_libraries.extend(
-            RegulationGroupLibrary.from_template_dict(
-                data=TemplateManager.read_regulation_group_template_file(file_path),
-                library_type=RegulationGroupLibrary.LibraryType.CUSTOM,
-                file_path=str(file_path),
-            )
-            for file_path in get_user_regulation_group_library_config_files()
-        )
 
-    def _initialize_plan_feature_libraries(self):
+    def _initialize_plan_feature_libraries(self, templates: LibraryTemplates):
         """Make sure regulation group libraries are updated before initializing plan feature libraries."""
+        group_index = RegulationGroupHeadingIndex(self.regulation_group_libraries)
         self.feature_template_libraries = [
             FeatureTemplateLibrary.from_template_dict(
-                data=TemplateManager.read_plan_feature_template_file(file_path),
+                data=data,
                 regulation_group_libraries=self.regulation_group_libraries,
+                group_index=group_index,
             )
-            for file_path in feature_template_library_config_files()
+            for data in templates.plan_feature_templates
         ]
+        self._report_template_group_headings(group_index)
         self.new_feature_dock.initialize_feature_template_libraries(self.feature_template_libraries)
 
+    def _report_template_group_headings(self, group_index: RegulationGroupHeadingIndex):
+        if group_index.unresolved_headings:
+            headings = ", ".join(sorted(group_index.unresolved_headings))
+            logger.warning("Regulation groups of feature templates not found: %s", headings)
+            iface.messageBar().pushWarning(
+                "", f"Kaavakohdepohjien kaavamääräysryhmiä ei löytynyt kaavamääräyskirjastoista: {headings}"
+            )
+        for heading, library_names in group_index.ambiguous_headings.items():
+            logger.warning(
+                "Regulation group heading '%s' of feature templates is in several groups (libraries: %s)",
+                heading,
+                ", ".join(library_names),
+            )
+        if group_index.ambiguous_headings:
+            headings = ", ".join(sorted(group_index.ambiguous_headings))
+            iface.messageBar().pushWarning(
+                "",
+                "Kaavakohdepohjien kaavamääräysryhmille löytyi useita samannimisiä ryhmiä, käytetään ensimmäistä: "
+                f"{headings}",
+            )
+
     def open_import_features_dialog(self):
         import_features_form = ImportFeaturesForm(self.active_plan_regulation_group_library)
         if import_features_form.exec_():
             pass
 
     def update_active_plan_regulation_group_library(self):
+        """Rebuilds the whole active plan regulation group library and the regulation groups dock."""
+        self._changed_regulation_group_ids.clear()
+        self._regulation_groups_removed = False
         self.active_plan_regulation_group_library = regulation_group_library_from_active_plan()
         self.regulation_groups_dock.update_regulation_groups(self.active_plan_regulation_group_library)
 
+    def refresh_active_plan_regulation_groups(self, group_ids: Iterable[str | None] = ()):
+        """
+        Updates only the changed groups of the active plan regulation group library.
+
+        Changed groups are the given group IDs together with the groups reported by the commit signals of the
+        regulation group layer since the last update. The dock list is patched in place.
+        """
+        changed_ids = self._changed_regulation_group_ids | {group_id for group_id in group_ids if group_id}
+        check_removed = self._regulation_groups_removed
+        self._changed_regulation_group_ids = set()
+        self._regulation_groups_removed = False
+
+        library = self.active_plan_regulation_group_library
+        removed_ids: set[str] = set()
+        if check_removed:
+            existing_ids = set(RegulationGroupLayer.get_group_ids())
+            removed_ids = {group.id_ for group in library.regulation_groups if group.id_ not in existing_ids}
+
+        updated_groups = {group.id_: group for group in regulation_groups_from_active_plan(changed_ids)}
+        removed_ids |= changed_ids - updated_groups.keys()
+
+        if removed_ids:
+            library.regulation_groups = [group for group in library.regulation_groups if group.id_ not in removed_ids]
+            for group_id in removed_ids:
+                self.regulation_groups_dock.remove_regulation_group(group_id)
+
+        group_indices = {group.id_: i for i, group in enumerate(library.regulation_groups)}
+        for group_id, group in updated_groups.items():
+            if group_id in group_indices:
+                library.regulation_groups[group_indices[group_id]] = group
+            else:
+                library.regulation_groups.append(group)
+            self.regulation_groups_dock.update_regulation_group(group)
+
+        if removed_ids or updated_groups:
+            PlanFeatureForm.invalidate_library_model(library)
+
+    def _connect_regulation_group_layer_signals(self):
+        self._disconnect_regulation_group_layer_signals()
+
+        layer = RegulationGroupLayer.get_from_project()
+        layer.committedFeaturesAdded.connect(self._on_regulation_groups_added)
+        layer.committedFeaturesRemoved.connect(self._on_regulation_groups_removed)
+        layer.committedAttributeValuesChanges.connect(self._on_regulation_group_attributes_changed)
+        self._regulation_group_layer = layer
+
+    def _disconnect_regulation_group_layer_signals(self):
+        layer = self._regulation_group_layer
+        self._regulation_group_layer = None
+        if layer is None:
+            return
+
+        # Layer might have been deleted together with the previous project
+        with suppress(TypeError, RuntimeError):
+            layer.committedFeaturesAdded.disconnect(self._on_regulation_groups_added)
+            layer.committedFeaturesRemoved.disconnect(self._on_regulation_groups_removed)
+            layer.committedAttributeValuesChanges.disconnect(self._on_regulation_group_attributes_changed)
+
+    def _on_regulation_groups_added(self, _layer_id: str, features: list[QgsFeature]):
+        self._changed_regulation_group_ids.update(feature["id"] for feature in features)
+
+    def _on_regulation_groups_removed(self, _layer_id: str, _feature_ids: list[int]):
+        # Removed features are reported only by their QGIS feature IDs, resolve removed groups on the next update
+        self._regulation_groups_removed = True
+
+    def _on_regulation_group_attributes_changed(self, _layer_id: str, changed_attributes: dict[int, dict]):
+        self._changed_regulation_group_ids.update(RegulationGroupLayer.get_group_ids(changed_attributes.keys()))
+
     def create_new_regulation_group(self):
         self._open_regulation_group_form(RegulationGroup())
 
@@ -249,6 +342,7 @@ class PlanManager(QObject):
                     library.into_template_dict(), Path(library.file_path), overwrite=True
                 )
         set_user_regulation_group_library_config_files(library.file_path for library in updated_libraries)
+        PlanFeatureForm.clear_library_models()
         self.initialize_libraries()
 
     def _open_regulation_group_form(self, regulation_group: RegulationGroup):
@@ -256,62 +350,33 @@ class PlanManager(QObject):
 
         if regulation_group_form.exec_():
             model = regulation_group_form.model
-            if save_regulation_group(model) is None:
+            group_id = save_regulation_group(model)
+            if group_id is None:
                 return None
-            # NOTE: Should we reinitialize regulation group dock even if saving failed?
-            self.update_active_plan_regulation_group_library()
+            self.refresh_active_plan_regulation_groups([group_id])
             return model
 
         return None
 
     def delete_regulation_groups(self, groups: Iterable[RegulationGroup]):
-        groups_changed = False
-        for group in groups:
-            if delete_regulation_group(group):
-                groups_changed = True
+        with edit_transaction("Kaavamääräysryhmien poistaminen") as transaction:
+            deleted_group_ids = [group.id_ for group in groups if delete_regulation_group(group)]
 
-        if groups_changed:
-            self.update_active_plan_regulation_group_library()
+        if deleted_group_ids and transaction.committed is not False:
+            self.refresh_active_plan_regulation_groups(deleted_group_ids)
 
     def remove_all_regulation_groups_from_features(self, features: list[tuple[str, Generator[str]]]):
-        for feat_layer_name, feat_ids in features:
-            for feat_id in feat_ids:
-                for association in RegulationGroupAssociationLayer.get_associations_for_feature(
-                    feat_id, feat_layer_name
-                ):
-                    if not _delete_feature(
-                        association,
-                        RegulationGroupAssociationLayer.get_from_project(),
-                        "Kaavamääräysryhmän assosiaation poisto",
-                    ):
-                        iface.messageBar().pushCritical("", "Kaavamääräysryhmän assosiaation poistaminen epäonnistui.")
+        update_regulation_group_associations(features, remove_all=True)
 
     def add_regulation_groups_to_features(
         self, groups: list[RegulationGroup], features: list[tuple[str, Generator[str]]]
     ):
-        for feat_layer_name, feat_ids in features:
-            for feat_id in feat_ids:
-                for group in groups:
-                    save_regulation_group_association(cast(str, group.id_), feat_layer_name, feat_id)
+        update_regulation_group_associations(features, add_group_ids=[cast(str, group.id_) for group in groups])
 
     def remove_selected_regulation_groups_from_features(
         self, groups: list[RegulationGroup], features: list[tuple[str, Generator[str]]]
     ):
-        group_ids = [cast(str, group.id_) for group in groups]
-        for feat_layer_name, feat_ids in features:
-            for feat_id in feat_ids:
-                for association in RegulationGroupAssociationLayer.get_associations_for_feature(
-                    feat_id, feat_layer_name
-                ):
-                    if association["plan_regulation_group_id"] in group_ids:  # noqa: SIM102
-                        if not _delete_feature(
-                            association,
-                            RegulationGroupAssociationLayer.get_from_project(),
-                            "Kaavamääräysryhmän assosiaation poisto",
-                        ):
-                            iface.messageBar().pushCritical(
-                                "", "Kaavamääräysryhmän assosiaation poistaminen epäonnistui."
-                            )
+        update_regulation_group_associations(features, remove_group_ids=[cast(str, group.id_) for group in groups])
 
     def toggle_identify_plan_features(self, activate: bool):  # noqa: FBT001
         if activate:
@@ -394,28 +459,44 @@ class PlanManager(QObject):
         if not plan_layer:
             return
 
-        feature = PlanLayer.get_feature_by_id(get_active_plan_id(), no_geometries=False)
-        if feature is None:
+        plan_model = self.get_active_plan_model()
+        if plan_model is None:
             iface.messageBar().pushWarning("", "Mikään kaava ei ole avattuna.")
             return
-        plan_model = PlanLayer.model_from_feature(feature)
 
         attribute_form = PlanAttributeForm(plan_model, self.regulation_group_libraries)
         if attribute_form.exec_():
             plan_id = save_plan(attribute_form.model)
             if plan_id is not None:
-                self.update_active_plan_regulation_group_library()
+                self.refresh_active_plan_regulation_groups()
                 self.new_feature_dock.set_plan(plan_id)  # Update feature dock in case plan type changed
 
+    @use_wait_cursor
+    def get_active_plan_model(self) -> Plan | None:
+        """
+        Builds the model of the active plan.
+
+        The plan is loaded with a single query to the database if possible. Otherwise, or if there are unsaved
+        changes the query would not see, the plan is loaded through the layers.
+        """
+        plan_id = get_active_plan_id()
+        if not plan_id:
+            return None
+        if not check_layer_changes():
+            plan_model = PlanTreeLoader.load(plan_id)
+            if plan_model is not None:
+                return plan_model
+        feature = PlanLayer.get_feature_by_id(plan_id, no_geometries=False)
+        return PlanLayer.model_from_feature(feature) if feature is not None else None
+
     def edit_lifecycles(self):
         plan_layer = PlanLayer.get_from_project()
         if not plan_layer:
             return
 
-        feature = PlanLayer.get_feature_by_id(get_active_plan_id(), no_geometries=False)
-        if feature is None:
+        plan_model = self.get_active_plan_model()
+        if plan_model is None:
             return
-        plan_model = PlanLayer.model_from_feature(feature)
 
         lifecycle_editor = LifecycleEditor(plan=plan_model)
 
@@ -492,7 +573,7 @@ class PlanManager(QObject):
             plan_feature, title, self.regulation_group_libraries, self.active_plan_regulation_group_library
         )
         if attribute_form.exec_() and save_plan_feature(attribute_form.model) is not None:
-            self.update_active_plan_regulation_group_library()
+            self.refresh_active_plan_regulation_groups(group.id_ for group in attribute_form.model.regulation_groups)
 
     def edit_plan_feature(self, feature: QgsFeature, layer_name: str):
         layer_class = FEATURE_LAYER_NAME_TO_CLASS_MAP[layer_name]
@@ -503,7 +584,7 @@ class PlanManager(QObject):
             plan_feature, title, self.regulation_group_libraries, self.active_plan_regulation_group_library
         )
         if attribute_form.exec_() and save_plan_feature(attribute_form.model) is not None:
-            self.update_active_plan_regulation_group_library()
+            self.refresh_active_plan_regulation_groups(group.id_ for group in attribute_form.model.regulation_groups)
 
     def set_active_plan(self, plan_id: str | None):
         """Update the project layers based on the selected land use plan.
@@ -527,8 +608,11 @@ class PlanManager(QObject):
         else:
             self.plan_unset.emit()
 
-        for layer in plan_layers:
-            layer.apply_filter(plan_id)
+        self._filter_plan_layers(plan_id)
+
+        model_identity_map.clear()
+        for layer in indexed_layers:
+            layer.build_index(plan_id)
 
         if previously_in_edit_mode:
             plan_layer.startEditing()
@@ -545,6 +629,26 @@ class PlanManager(QObject):
             self.set_permanent_identifier(identifier)
 
             self.zoom_to_active_plan()
+        else:
+            iface.mapCanvas().refresh()
+
+    def _filter_plan_layers(self, plan_id: str | None):
+        """Filters the plan layers without rendering the map canvas in between. Does not refresh the canvas."""
+        canvas = iface.mapCanvas()
+        canvas.freeze(True)
+        try:
+            timings = apply_plan_filters(plan_id)
+        finally:
+            canvas.freeze(False)
+
+        logger.info(
+            "Filtered plan layers in %.0f ms (%s)",
+            1000 * sum(timings.values()),
+            ", ".join(
+                f"{layer_name}: {1000 * seconds:.0f} ms"
+                for layer_name, seconds in sorted(timings.items(), key=lambda item: item[1], reverse=True)
+            ),
+        )
 
     def zoom_to_active_plan(self):
         """Zoom to the active plan layer."""
@@ -664,18 +768,43 @@ class PlanManager(QObject):
         iface.messageBar().pushSuccess("", "Kaava-asia tallennettu.")
 
     def on_project_loaded(self):
-        self.initialize_from_project()
+        """
+        Starts initializing the plugin for the loaded project.
+
+        Code layer caches are loaded and library files parsed in background tasks. The active plan is set when
+        the code layers are ready and the libraries are initialized when the parsed library files are ready.
+        """
+        self.project_initializer.cancel()
+        self.libraries_ready = False
 
         if self.check_required_layers():
+            self._connect_regulation_group_layer_signals()
             QgsProject.instance().cleared.connect(self.on_project_cleared)
             self.project_loaded.emit()
 
-            active_plan = next(PlanLayer.get_features(), None)
-            if active_plan:
-                self.set_active_plan(active_plan["id"])
+            self.project_initializer.start([PlanRegulationTypeLayer, AdditionalInformationTypeLayer])
+
+    def _on_code_layers_ready(self):
+        active_plan = next(PlanLayer.get_features(), None)
+        if active_plan:
+            self.set_active_plan(active_plan["id"])
+
+    def _on_library_templates_ready(self, templates: LibraryTemplates):
+        self.initialize_libraries(templates)
+        self.libraries_ready = True
+        self.libraries_loaded.emit()
 
     def on_project_cleared(self):
         QgsProject.instance().cleared.disconnect(self.on_project_cleared)
+        self._disconnect_regulation_group_layer_signals()
+        for layer in indexed_layers:
+            layer.clear_index()
+        model_identity_map.clear()
+        clear_attribute_filters()
+        PlanRegulationGroupForm.clear_regulation_type_model()
+        PlanFeatureForm.clear_library_models()
+        self.project_initializer.cancel()
+        self.libraries_ready = False
 
         self.project_cleared.emit()
 
@@ -683,6 +812,17 @@ class PlanManager(QObject):
         # Set pan map tool as active (to deactivate our custom tools to avoid errors)
         iface.actionPan().trigger()
 
+        # Project initialization stages
+        self.project_initializer.cancel()
+        disconnect_signal(self.project_initializer.code_layers_ready)
+        disconnect_signal(self.project_initializer.library_templates_ready)
+
+        # Association indexes, cached models and filter expressions
+        for layer in indexed_layers:
+            layer.clear_index()
+        model_identity_map.clear()
+        clear_attribute_filters()
+
         # Lambda service
         disconnect_signal(self.lambda_service.plan_jsons_received)
         disconnect_signal(self.lambda_service.plan_matter_json_received)
@@ -708,23 +848,43 @@ class PlanManager(QObject):
         self.new_feature_dock.deleteLater()
 
         # Regulation group dock
+        self._disconnect_regulation_group_layer_signals()
         self.regulation_groups_dock.unload()
         iface.removeDockWidget(self.regulation_groups_dock)
         self.regulation_groups_dock.deleteLater()
 
 
+def _get_general_regulation_group_type_id() -> str | None:
+    return PlanRegulationGroupTypeLayer.get_attribute_value_by_another_attribute_value(
+        "id", "value", "generalRegulations"
+    )
+
+
+def regulation_groups_from_active_plan(group_ids: Iterable[str]) -> list[RegulationGroup]:
+    """Returns models of the given non-general regulation groups of the active plan. Missing groups are skipped."""
+    group_ids = list(group_ids)
+    if not get_active_plan_id() or not group_ids:
+        return []
+
+    id_of_general_regulation_group_type = _get_general_regulation_group_type_id()
+    return [
+        group
+        for group in PlanModelLoader.regulation_groups_by_ids(group_ids, lazy_children=True)
+        if group.type_code_id != id_of_general_regulation_group_type
+    ]
+
+
 def regulation_group_library_from_active_plan() -> RegulationGroupLibrary:
     if get_active_plan_id():
-        id_of_general_regulation_group_type = (
-            PlanRegulationGroupTypeLayer.get_attribute_value_by_another_attribute_value(
-                "id", "value", "generalRegulations"
-            )
+        id_of_general_regulation_group_type = _get_general_regulation_group_type_id()
+        regulation_groups = PlanModelLoader.regulation_groups_from_features(
+            [
+                feat
+                for feat in RegulationGroupLayer.get_features()
+                if feat["type_of_plan_regulation_group_id"] != id_of_general_regulation_group_type
+            ],
+            lazy_children=True,
         )
-        regulation_groups = [
-            RegulationGroupLayer.model_from_feature(feat)
-            for feat in RegulationGroupLayer.get_features()
-            if feat["type_of_plan_regulation_group_id"] != id_of_general_regulation_group_type
-        ]
     else:
         regulation_groups = []
 
@@ -738,32 +898,77 @@ def regulation_group_library_from_active_plan() -> RegulationGroupLibrary:
     )
 
 
-def _save_feature(feature: QgsFeature, layer: QgsVectorLayer, id_: str | None, edit_text: str = "") -> bool:
-    if not layer.isEditable():
+def _start_editing(layer: QgsVectorLayer):
+    transaction = EditTransaction.active()
+    if transaction is not None:
+        # Join before editing, so a rollback of the transaction can undo back to the state before the edit
+        transaction.add_layer(layer)
+    elif not layer.isEditable():
         layer.startEditing()
+
+
+def _save_feature(feature: QgsFeature, layer: QgsVectorLayer, id_: str | None, edit_text: str = "") -> bool:
+    """Adds or updates the feature. Inside an edit transaction, the change is only buffered until commit."""
+    _start_editing(layer)
     layer.beginEditCommand(edit_text)
 
-    if id_ is None:
-        layer.addFeature(feature)
-    else:
-        layer.updateFeature(feature)
+    success = layer.addFeature(feature) if id_ is None else layer.updateFeature(feature)
 
     layer.endEditCommand()
+
+    transaction = EditTransaction.active()
+    if transaction is not None:
+        return transaction.record_edit(layer, success)
     return layer.commitChanges(stopEditing=False)
 
 
 def _delete_feature(feature: QgsFeature, layer: QgsVectorLayer, delete_text: str = "") -> bool:
-    if not layer.isEditable():
-        layer.startEditing()
+    """Deletes the feature. Inside an edit transaction, the change is only buffered until commit."""
+    _start_editing(layer)
+    layer.beginEditCommand(delete_text)
+
+    success = layer.deleteFeature(feature.id())
+
+    layer.endEditCommand()
+
+    transaction = EditTransaction.active()
+    if transaction is not None:
+        return transaction.record_edit(layer, success)
+    return layer.commitChanges(stopEditing=False)
+
+
+def _add_features(features: list[QgsFeature], layer: QgsVectorLayer, edit_text: str = "") -> bool:
+    """Adds the features in one edit command. Inside an edit transaction, the change is only buffered until commit."""
+    _start_editing(layer)
+    layer.beginEditCommand(edit_text)
+
+    success = layer.addFeatures(features)
+
+    layer.endEditCommand()
+
+    transaction = EditTransaction.active()
+    if transaction is not None:
+        return transaction.record_edit(layer, success)
+    return layer.commitChanges(stopEditing=False)
+
+
+def _delete_features(feature_ids: list[int], layer: QgsVectorLayer, delete_text: str = "") -> bool:
+    """Deletes the features in one edit command. Inside an edit transaction, the change is only buffered until commit."""
+    _start_editing(layer)
     layer.beginEditCommand(delete_text)
 
-    layer.deleteFeature(feature.id())
+    success = layer.deleteFeatures(feature_ids)
 
     layer.endEditCommand()
+
+    transaction = EditTransaction.active()
+    if transaction is not None:
+        return transaction.record_edit(layer, success)
     return layer.commitChanges(stopEditing=False)
 
 
 @use_wait_cursor
+@transactional("Kaavan tallentaminen")
 def save_plan(plan: Plan) -> str | None:
     plan_id = plan.id_
     editing = plan_id is not None
@@ -775,7 +980,7 @@ def save_plan(plan: Plan) -> str | None:
             id_=plan_id,
             edit_text="Kaavan muokkaus" if editing else "Kaavan luominen",
         ):
-            iface.messageBar().pushCritical("", "Kaavan tallentaminen epäonnistui")
+            report_edit_error("Kaavan tallentaminen epäonnistui")
             return None
         plan_id = cast(str, feature["id"])
 
@@ -789,7 +994,7 @@ def save_plan(plan: Plan) -> str | None:
                 RegulationGroupAssociationLayer.get_from_project(),
                 "Kaavamääräysryhmän assosiaation poisto",
             ):
-                iface.messageBar().pushCritical("", "Kaavamääräysryhmän assosiaation poistaminen epäonnistui.")
+                report_edit_error("Kaavamääräysryhmän assosiaation poistaminen epäonnistui.")
 
         # Check for deleted legal effects
         for association in LegalEffectAssociationLayer.get_dangling_associations(plan_id, plan.legal_effect_ids):
@@ -798,13 +1003,13 @@ def save_plan(plan: Plan) -> str | None:
                 LegalEffectAssociationLayer.get_from_project(),
                 "Oikeusvaikutuksen assosiaation poisto",
             ):
-                iface.messageBar().pushCritical("", "Oikeusvaikutuksen assosiaation poistaminen epäonnistui.")
+                report_edit_error("Oikeusvaikutuksen assosiaation poistaminen epäonnistui.")
 
         # Check for documents to be deleted
         doc_layer = DocumentLayer.get_from_project()
         for doc_feature in DocumentLayer.get_documents_to_delete(plan.documents, plan_id):
             if not _delete_feature(doc_feature, doc_layer, "Asiakirjan poisto"):
-                iface.messageBar().pushCritical("", "Asiakirjan poistaminen epäonnistui.")
+                report_edit_error("Asiakirjan poistaminen epäonnistui.")
 
     # Save general regulations
     if plan.general_regulations:
@@ -832,6 +1037,7 @@ def save_plan(plan: Plan) -> str | None:
 
 
 @use_wait_cursor
+@transactional("Kaavakohteen tallentaminen")
 def save_plan_feature(plan_feature: PlanFeature, plan_id: str | None = None) -> str | None:
     layer_name = plan_feature.layer_name
     if not layer_name:
@@ -852,7 +1058,7 @@ def save_plan_feature(plan_feature: PlanFeature, plan_id: str | None = None) ->
             id_=feat_id,
             edit_text="Kaavakohteen muokkaus" if editing else "Kaavakohteen lisäys",
         ):
-            iface.messageBar().pushCritical("", "Kaavakohteen tallentaminen epäonnistui.")
+            report_edit_error("Kaavakohteen tallentaminen epäonnistui.")
             return None
         feat_id = cast(str, feature["id"])
 
@@ -866,7 +1072,7 @@ def save_plan_feature(plan_feature: PlanFeature, plan_id: str | None = None) ->
                 RegulationGroupAssociationLayer.get_from_project(),
                 "Kaavamääräysryhmän assosiaation poisto",
             ):
-                iface.messageBar().pushCritical("", "Kaavamääräysryhmän assosiaation poistaminen epäonnistui.")
+                report_edit_error("Kaavamääräysryhmän assosiaation poistaminen epäonnistui.")
 
     # Save regulation groups
     for group in plan_feature.regulation_groups:
@@ -879,6 +1085,7 @@ def save_plan_feature(plan_feature: PlanFeature, plan_id: str | None = None) ->
 
 
 @use_wait_cursor
+@transactional("Kaavamääräysryhmän tallentaminen")
 def save_regulation_group(regulation_group: RegulationGroup, plan_id: str | None = None) -> str | None:
     group_id = regulation_group.id_
     editing = group_id is not None
@@ -890,7 +1097,7 @@ def save_regulation_group(regulation_group: RegulationGroup, plan_id: str | None
             id_=group_id,
             edit_text="Kaavamääräysryhmän muokkaus" if editing else "Kaavamääräysryhmän lisäys",
         ):
-            iface.messageBar().pushCritical("", "Kaavamääräysryhmän tallentaminen epäonnistui.")
+            report_edit_error("Kaavamääräysryhmän tallentaminen epäonnistui.")
             return None
         group_id = cast(str, feature["id"])
 
@@ -899,13 +1106,13 @@ def save_regulation_group(regulation_group: RegulationGroup, plan_id: str | None
         regulation_layer = PlanRegulationLayer.get_from_project()
         for reg_feature in PlanRegulationLayer.get_regulations_to_delete(regulation_group.regulations, group_id):
             if not _delete_feature(reg_feature, regulation_layer, "Kaavamääräyksen poisto"):
-                iface.messageBar().pushCritical("", "Kaavamääräyksen poistaminen epäonnistui.")
+                report_edit_error("Kaavamääräyksen poistaminen epäonnistui.")
 
         # Check for propositions to be deleted
         proposition_layer = PlanPropositionLayer.get_from_project()
         for prop_feature in PlanPropositionLayer.get_propositions_to_delete(regulation_group.propositions, group_id):
             if not _delete_feature(prop_feature, proposition_layer, "Kaavasuosituksen poisto"):
-                iface.messageBar().pushCritical("", "Kaavasuosituksen poistaminen epäonnistui.")
+                report_edit_error("Kaavasuosituksen poistaminen epäonnistui.")
 
     # Save regulations
     if regulation_group.regulations:
@@ -925,14 +1132,14 @@ def save_regulation_group(regulation_group: RegulationGroup, plan_id: str | None
 @use_wait_cursor
 def delete_regulation_group(regulation_group: RegulationGroup, plan_id: str | None = None) -> bool:
     if regulation_group.id_ is None:
-        iface.messageBar().pushCritical("", "Kaavamääräysryhmän poistaminen epäonnistui (ei IDtä).")
+        report_edit_error("Kaavamääräysryhmän poistaminen epäonnistui (ei IDtä).")
         return False
 
     feature = RegulationGroupLayer.feature_from_model(regulation_group, plan_id)
     layer = RegulationGroupLayer.get_from_project()
 
     if not _delete_feature(feature, layer, "Kaavamääräysryhmän poisto"):
-        iface.messageBar().pushCritical("", "Kaavamääräysryhmän poistaminen epäonnistui.")
+        report_edit_error("Kaavamääräysryhmän poistaminen epäonnistui.")
         return False
 
     return True
@@ -942,6 +1149,53 @@ def save_regulation_group_as_config(regulation_group: RegulationGroup):
     pass
 
 
+@use_wait_cursor
+@transactional("Kaavamääräysryhmien assosiaatioiden päivittäminen")
+def update_regulation_group_associations(
+    features: Iterable[tuple[str, Iterable[str]]],
+    add_group_ids: Iterable[str] = (),
+    remove_group_ids: Iterable[str] = (),
+    *,
+    remove_all: bool = False,
+) -> bool:
+    """
+    Adds and removes regulation group associations of the given features in one batched edit.
+
+    Existing associations are fetched with one request per feature layer and compared in memory, so only missing
+    associations are added. If `remove_all` is True, all associations of the features are removed.
+    """
+    add_group_ids = list(dict.fromkeys(add_group_ids))
+    remove_group_ids = set(remove_group_ids)
+
+    new_associations: list[QgsFeature] = []
+    removed_association_fids: list[int] = []
+    for layer_name, feature_ids in features:
+        unique_ids = list(dict.fromkeys(feature_ids))
+        attribute = RegulationGroupAssociationLayer.layer_name_to_attribute_map.get(layer_name)
+
+        existing_associations: set[tuple[str, str]] = set()
+        for association in RegulationGroupAssociationLayer.get_associations_for_features(unique_ids, layer_name):
+            group_id = association["plan_regulation_group_id"]
+            if remove_all or group_id in remove_group_ids:
+                removed_association_fids.append(association.id())
+            else:
+                existing_associations.add((group_id, association[attribute]))
+
+        new_associations.extend(
+            RegulationGroupAssociationLayer.feature_from(group_id, layer_name, feature_id)
+            for feature_id in unique_ids
+            for group_id in add_group_ids
+            if (group_id, feature_id) not in existing_associations
+        )
+
+    layer = RegulationGroupAssociationLayer.get_from_project()
+    if removed_association_fids and not _delete_features(
+        removed_association_fids, layer, "Kaavamääräysryhmien assosiaatioiden poisto"
+    ):
+        return False
+    return not new_associations or _add_features(new_associations, layer, "Kaavamääräysryhmien assosiaatioiden lisäys")
+
+
 def save_regulation_group_association(regulation_group_id: str, layer_name: str, feature_id: str) -> bool:
     if RegulationGroupAssociationLayer.association_exists(regulation_group_id, layer_name, feature_id):
         return True
@@ -949,7 +1203,7 @@ def save_regulation_group_association(regulation_group_id: str, layer_name: str,
     layer = RegulationGroupAssociationLayer.get_from_project()
 
     if not _save_feature(feature=feature, layer=layer, id_=None, edit_text="Kaavamääräysryhmän assosiaation lisäys"):
-        iface.messageBar().pushCritical("", "Kaavamääräysryhmän assosiaation tallentaminen epäonnistui.")
+        report_edit_error("Kaavamääräysryhmän assosiaation tallentaminen epäonnistui.")
         return False
 
     return True
@@ -966,7 +1220,7 @@ def save_regulation(regulation: Regulation) -> str | None:
             id_=reg_id,
             edit_text="Kaavamääräyksen muokkaus" if editing else "Kaavamääräyksen lisäys",
         ):
-            iface.messageBar().pushCritical("", "Kaavamääräyksen tallentaminen epäonnistui.")
+            report_edit_error("Kaavamääräyksen tallentaminen epäonnistui.")
             return None
         reg_id = cast(str, regulation_feature["id"])
 
@@ -977,7 +1231,7 @@ def save_regulation(regulation: Regulation) -> str | None:
             regulation.additional_information, reg_id
         ):
             if not _delete_feature(info_feature, info_layer, "Lisätiedon poisto"):
-                iface.messageBar().pushCritical("", "Liätiedon poistaminen epäonnistui.")
+                report_edit_error("Liätiedon poistaminen epäonnistui.")
 
         # Check for verbal regulation types to be deleted
         for association in TypeOfVerbalRegulationAssociationLayer.get_dangling_associations(
@@ -988,9 +1242,7 @@ def save_regulation(regulation: Regulation) -> str | None:
                 TypeOfVerbalRegulationAssociationLayer.get_from_project(),
                 "Sanallisen kaavamääräyksen lajin assosiaation poisto",
             ):
-                iface.messageBar().pushCritical(
-                    "", "Sanallisen kaavamääräyksen lajin assosiaation poistaminen epäonnistui."
-                )
+                report_edit_error("Sanallisen kaavamääräyksen lajin assosiaation poistaminen epäonnistui.")
 
         # Check for plan theme to be deleted
         for association in PlanThemeAssociationLayer.get_dangling_regulation_associations(reg_id, regulation.theme_ids):
@@ -999,7 +1251,7 @@ def save_regulation(regulation: Regulation) -> str | None:
                 PlanThemeAssociationLayer.get_from_project(),
                 "Kaavoitusteeman assosiaation poisto",
             ):
-                iface.messageBar().pushCritical("", "Kaavoitusteeman assosiaation poistaminen epäonnistui.")
+                report_edit_error("Kaavoitusteeman assosiaation poistaminen epäonnistui.")
 
     for additional_information in regulation.additional_information:
         additional_information.plan_regulation_id = reg_id
@@ -1032,7 +1284,7 @@ def save_plan_theme_association(
     layer = PlanThemeAssociationLayer.get_from_project()
 
     if not _save_feature(feature=feature, layer=layer, id_=None, edit_text="Kaavoitusteeman assosiaation lisäys"):
-        iface.messageBar().pushCritical("", "Kaavoitusteeman assosiaation tallentaminen epäonnistui.")
+        report_edit_error("Kaavoitusteeman assosiaation tallentaminen epäonnistui.")
         return False
 
     return True
@@ -1047,7 +1299,7 @@ def save_type_of_verbal_regulation_association(regulation_id: str, verbal_regula
     if not _save_feature(
         feature=feature, layer=layer, id_=None, edit_text="Sanallisen kaavamääräyksen lajin assosiaation lisäys"
     ):
-        iface.messageBar().pushCritical("", "Sanallisen kaavamääräyksen lajin assosiaation tallentaminen epäonnistui.")
+        report_edit_error("Sanallisen kaavamääräyksen lajin assosiaation tallentaminen epäonnistui.")
         return False
 
     return True
@@ -1060,7 +1312,7 @@ def save_legal_effect_association(plan_id: str, legal_effect_id: str) -> bool:
     layer = LegalEffectAssociationLayer.get_from_project()
 
     if not _save_feature(feature=feature, layer=layer, id_=None, edit_text="Oikeusvaikutuksen assosiaation lisäys"):
-        iface.messageBar().pushCritical("", "Oikeusvaikutuksen assosiaation tallentaminen epäonnistui.")
+        report_edit_error("Oikeusvaikutuksen assosiaation tallentaminen epäonnistui.")
         return False
 
     return True
@@ -1077,7 +1329,7 @@ def save_additional_information(additional_information: AdditionalInformation) -
         id_=additional_information.id_,
         edit_text="Lisätiedon lisäys" if additional_information.id_ is None else "Lisätiedon muokkaus",
     ):
-        iface.messageBar().pushCritical("", "Lisätiedon tallentaminen epäonnistui.")
+        report_edit_error("Lisätiedon tallentaminen epäonnistui.")
         return None
 
     return feature["id"]
@@ -1088,7 +1340,7 @@ def delete_additional_information(additional_information: AdditionalInformation)
     layer = AdditionalInformationLayer.get_from_project()
 
     if not _delete_feature(feature, layer, "Lisätiedon poisto"):
-        iface.messageBar().pushCritical("", "Lisätiedon poistaminen epäonnistui.")
+        report_edit_error("Lisätiedon poistaminen epäonnistui.")
         return False
 
     return True
@@ -1099,7 +1351,7 @@ def delete_regulation(regulation: Regulation) -> bool:
     layer = PlanRegulationLayer.get_from_project()
 
     if not _delete_feature(feature, layer, "Kaavamääräyksen poisto"):
-        iface.messageBar().pushCritical("", "Lisätiedon poistaminen epäonnistui.")
+        report_edit_error("Lisätiedon poistaminen epäonnistui.")
         return False
 
     return True
@@ -1118,7 +1370,7 @@ def save_proposition(proposition: Proposition) -> str | None:
         id_=prop_id,
         edit_text="Kaavasuosituksen lisäys" if prop_id is None else "Kaavasuosituksen muokkaus",
     ):
-        iface.messageBar().pushCritical("", "Kaavasuosituksen tallentaminen epäonnistui.")
+        report_edit_error("Kaavasuosituksen tallentaminen epäonnistui.")
         return None
     prop_id = cast(str, feature["id"])
 
@@ -1132,7 +1384,7 @@ def save_proposition(proposition: Proposition) -> str | None:
                 PlanThemeAssociationLayer.get_from_project(),
                 "Kaavoitusteeman assosiaation poisto",
             ):
-                iface.messageBar().pushCritical("", "Kaavoitusteeman assosiaation poistaminen epäonnistui.")
+                report_edit_error("Kaavoitusteeman assosiaation poistaminen epäonnistui.")
 
     for plan_theme_id in proposition.theme_ids:
         save_plan_theme_association(plan_theme_id=plan_theme_id, proposition_id=prop_id)
@@ -1145,7 +1397,7 @@ def delete_proposition(proposition: Proposition) -> bool:
     layer = PlanPropositionLayer.get_from_project()
 
     if not _delete_feature(feature, layer, "Kaavasuosituksen poisto"):
-        iface.messageBar().pushCritical("", "Kaavasuosituksen poistaminen epäonnistui.")
+        report_edit_error("Kaavasuosituksen poistaminen epäonnistui.")
         return False
 
     return True
@@ -1162,7 +1414,7 @@ def save_document(document: Document) -> str | None:
         id_=document.id_,
         edit_text="Asiakirjan lisäys" if document.id_ is None else "Asiakirjan muokkaus",
     ):
-        iface.messageBar().pushCritical("", "Asiakirjan tallentaminen epäonnistui.")
+        report_edit_error("Asiakirjan tallentaminen epäonnistui.")
         return None
 
     return feature["id"]
@@ -1179,7 +1431,7 @@ def save_lifecycle(lifecycle: LifeCycle) -> str | None:
         id_=lifecycle.id_,
         edit_text="Elinkaaren lisäys" if lifecycle.id_ is None else "Elinkaaren muokkaus",
     ):
-        iface.messageBar().pushCritical("", "Elinkaaren tallentaminen epäonnistui.")
+        report_edit_error("Elinkaaren tallentaminen epäonnistui.")
         return None
 
     return feature["id"]
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, cast
+
+from qgis.core import QgsDataSourceUri, QgsGeometry
+from qgis.PyQt.QtCore import QDate, QDateTime, Qt, QVariant
+
+from arho_feature_template.core.models import AdditionalInformation, Plan, Proposition, Regulation
+from arho_feature_template.project.layers.plan_layers import (
+    AdditionalInformationLayer,
+    DocumentLayer,
+    LegalEffectAssociationLayer,
+    LifeCycleLayer,
+    PlanLayer,
+    PlanPropositionLayer,
+    PlanRegulationLayer,
+    PlanThemeAssociationLayer,
+    RegulationGroupAssociationLayer,
+    RegulationGroupLayer,
+    TypeOfVerbalRegulationAssociationLayer,
+    proposition_model_from_feature,
+    regulation_group_model_from_feature,
+    regulation_group_order_key,
+    regulation_model_from_feature,
+)
+from arho_feature_template.utils.db_utils import database_connections, quote_identifier, quote_literal
+from arho_feature_template.utils.misc_utils import deserialize_localized_text
+
+if TYPE_CHECKING:
+    from qgis.core import QgsFeature, QgsFields
+
+    from arho_feature_template.project.layers.plan_layers import AbstractPlanLayer
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the plan tree query
+PLAN_TREE_QUERY_TIMEOUT = 10
+
+# Tables are substituted with the tables of the project layers. Keys of the result object match `TABLE_LAYERS`.
+PLAN_TREE_SQL = """
+    WITH
+        plan AS (
+            SELECT * FROM {plan} WHERE id = {plan_id}
+        ),
+        regulation_groups AS (
+            SELECT prg.*
+            FROM {regulation_group} prg
+            WHERE prg.id IN (
+                SELECT rga.plan_regulation_group_id
+                FROM {regulation_group_association} rga
+                WHERE rga.plan_id = {plan_id}
+            )
+        ),
+        regulations AS (
+            SELECT pr.*
+            FROM {regulation} pr
+            WHERE pr.plan_regulation_group_id IN (SELECT id FROM regulation_groups)
+        ),
+        propositions AS (
+            SELECT pp.*
+            FROM {proposition} pp
+            WHERE pp.plan_regulation_group_id IN (SELECT id FROM regulation_groups)
+        )
+    SELECT json_build_object(
+        'plan', (SELECT to_jsonb(plan) - {geometry_column_name} FROM plan),
+        'geometry', (SELECT encode(ST_AsBinary({geometry_column}), 'hex') FROM plan),
+        'regulation_group', (SELECT json_agg(to_jsonb(rg)) FROM regulation_groups rg),
+        'regulation', (SELECT json_agg(to_jsonb(r)) FROM regulations r),
+        'proposition', (SELECT json_agg(to_jsonb(p)) FROM propositions p),
+        'additional_information', (
+            SELECT json_agg(to_jsonb(ai))
+            FROM {additional_information} ai
+            WHERE ai.plan_regulation_id IN (SELECT id FROM regulations)
+        ),
+        'theme_association', (
+            SELECT json_agg(to_jsonb(ta))
+            FROM {theme_association} ta
+            WHERE
+                ta.plan_regulation_id IN (SELECT id FROM regulations)
+                OR ta.plan_proposition_id IN (SELECT id FROM propositions)
+        ),
+        'verbal_type_association', (
+            SELECT json_agg(to_jsonb(va))
+            FROM {verbal_type_association} va
+            WHERE va.plan_regulation_id IN (SELECT id FROM regulations)
+        ),
+        'legal_effect_association', (
+            SELECT json_agg(to_jsonb(lea)) FROM {legal_effect_association} lea WHERE lea.plan_id = {plan_id}
+        ),
+        'document', (SELECT json_agg(to_jsonb(d)) FROM {document} d WHERE d.plan_id = {plan_id}),
+        'lifecycle', (SELECT json_agg(to_jsonb(lc)) FROM {lifecycle} lc WHERE lc.plan_id = {plan_id})
+    )::text
+"""
+
+TABLE_LAYERS: dict[str, type[AbstractPlanLayer]] = {
+    "plan": PlanLayer,
+    "regulation_group": RegulationGroupLayer,
+    "regulation_group_association": RegulationGroupAssociationLayer,
+    "regulation": PlanRegulationLayer,
+    "proposition": PlanPropositionLayer,
+    "additional_information": AdditionalInformationLayer,
+    "theme_association": PlanThemeAssociationLayer,
+    "verbal_type_association": TypeOfVerbalRegulationAssociationLayer,
+    "legal_effect_association": LegalEffectAssociationLayer,
+    "document": DocumentLayer,
+    "lifecycle": LifeCycleLayer,
+}
+
+
+class _JsonRow:
+    """
+    Row of a table in JSON, read like a feature of the layer of the table.
+
+    Date and time values are converted into the Qt types the layer would return, so the `model_from_feature`
+    methods of the layer classes can be used for the row.
+    """
+
+    def __init__(self, data: dict[str, Any], fields: QgsFields):
+        self._data = data
+        self._fields = fields
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._data.get(name)
+        if not isinstance(value, str):
+            return value
+        field_index = self._fields.indexOf(name)
+        field_type = self._fields.at(field_index).type() if field_index != -1 else None
+        if field_type == QVariant.DateTime:
+            return QDateTime.fromString(value, Qt.ISODate)
+        if field_type == QVariant.Date:
+            return QDate.fromString(value[:10], Qt.ISODate)
+        return value
+
+
+class PlanTreeLoader:
+    """
+    Builds a plan model with all of its child models from a single SQL query.
+
+    The query aggregates the rows of the plan tree into JSON in the database, which saves the dozens of round
+    trips `PlanModelLoader` makes through the layers. It reads the tables of the project layers directly, so it
+    is only available when all of them are PostgreSQL layers of the same database, and it does not see
+    uncommitted changes in the layers.
+    """
+
+    @classmethod
+    def load(cls, plan_id: str) -> Plan | None:
+        """Returns the plan model, or None if the plan could not be loaded with the query."""
+        connection = database_connections.get_connection_for_layer(PlanLayer.get_from_project())
+        sql = cls._build_sql(plan_id)
+        if connection is None or sql is None:
+            return None
+
+        try:
+            rows = database_connections.execute_sql(connection, sql, timeout=PLAN_TREE_QUERY_TIMEOUT)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Loading plan %s in a single query failed: %s", plan_id, e)
+            return None
+        if not rows or not rows[0] or not rows[0][0]:
+            return None
+        data = json.loads(rows[0][0])
+        if data.get("plan") is None:
+            return None
+        return cls._plan_from_json(data)
+
+    @classmethod
+    def _build_sql(cls, plan_id: str) -> str | None:
+        plan_uri = QgsDataSourceUri(PlanLayer.get_from_project().source())
+        tables: dict[str, str] = {}
+        for key, layer_class in TABLE_LAYERS.items():
+            layer = layer_class.get_from_project()
+            uri = QgsDataSourceUri(layer.source())
+            if layer.providerType() != "postgres" or uri.connectionInfo(False) != plan_uri.connectionInfo(False):
+                return None
+            tables[key] = f"{quote_identifier(uri.schema())}.{quote_identifier(uri.table())}"
+
+        return PLAN_TREE_SQL.format(
+            plan_id=quote_literal(plan_id),
+            geometry_column=quote_identifier(plan_uri.geometryColumn()),
+            geometry_column_name=quote_literal(plan_uri.geometryColumn()),
+            **tables,
+        )
+
+    @classmethod
+    def _rows(cls, data: dict[str, Any], key: str) -> list[QgsFeature]:
+        fields = TABLE_LAYERS[key].get_from_project().fields()
+        # Rows are read like features of the layer
+        return [cast("QgsFeature", _JsonRow(row, fields)) for row in data.get(key) or []]
+
+    @classmethod
+    def _plan_from_json(cls, data: dict[str, Any]) -> Plan:
+        regulations_by_group = cls._regulations_by_group(data)
+
+        propositions_by_group: dict[str, list[Proposition]] = defaultdict(list)
+        theme_ids_by_proposition = _theme_ids_by_target(cls._rows(data, "theme_association"), "plan_proposition_id")
+        for row in cls._rows(data, "proposition"):
+            propositions_by_group[row["plan_regulation_group_id"]].append(
+                proposition_model_from_feature(row, theme_ids_by_proposition)
+            )
+
+        # Same order as the general regulations of plans loaded through the layers
+        regulation_groups = sorted(
+            (
+                regulation_group_model_from_feature(
+                    row, regulations_by_group.get(row["id"], []), propositions_by_group.get(row["id"], [])
+                )
+                for row in cls._rows(data, "regulation_group")
+            ),
+            key=regulation_group_order_key,
+        )
+
+        plan = cast("QgsFeature", _JsonRow(data["plan"], PlanLayer.get_from_project().fields()))
+        geometry = QgsGeometry()
+        if data.get("geometry"):
+            geometry.fromWkb(bytes.fromhex(data["geometry"]))
+
+        return Plan(
+            geom=geometry,
+            name=deserialize_localized_text(plan["name"]),
+            description=deserialize_localized_text(plan["description"]),
+            scale=plan["scale"],
+            permanent_plan_identifier=plan["permanent_plan_identifier"],
+            record_number=plan["record_number"],
+            producers_plan_identifier=plan["producers_plan_identifier"],
+            matter_management_identifier=plan["matter_management_identifier"],
+            plan_type_id=plan["plan_type_id"],
+            lifecycle_status_id=plan["lifecycle_status_id"],
+            organisation_id=plan["organisation_id"],
+            general_regulations=regulation_groups,
+            legal_effect_ids=[
+                row["legal_effects_of_master_plan_id"] for row in cls._rows(data, "legal_effect_association")
+            ],
+            documents=[DocumentLayer.model_from_feature(row) for row in cls._rows(data, "document")],
+            id_=plan["id"],
+            lifecycles=[LifeCycleLayer.model_from_feature(row) for row in cls._rows(data, "lifecycle")],
+            modified=False,
+        )
+
+    @classmethod
+    def _regulations_by_group(cls, data: dict[str, Any]) -> dict[str, list[Regulation]]:
+        additional_information_by_regulation: dict[str, list[AdditionalInformation]] = defaultdict(list)
+        for row in cls._rows(data, "additional_information"):
+            additional_information_by_regulation[row["plan_regulation_id"]].append(
+                AdditionalInformationLayer.model_from_feature(row)
+            )
+        theme_ids_by_regulation = _theme_ids_by_target(cls._rows(data, "theme_association"), "plan_regulation_id")
+        verbal_type_ids_by_regulation: dict[str, list[str]] = defaultdict(list)
+        for row in cls._rows(data, "verbal_type_association"):
+            verbal_type_ids_by_regulation[row["plan_regulation_id"]].append(row["type_of_verbal_plan_regulation_id"])
+
+        regulations_by_group: dict[str, list[Regulation]] = defaultdict(list)
+        for row in cls._rows(data, "regulation"):
+            regulations_by_group[row["plan_regulation_group_id"]].append(
+                regulation_model_from_feature(
+                    row, additional_information_by_regulation, theme_ids_by_regulation, verbal_type_ids_by_regulation
+                )
+            )
+        return regulations_by_group
+
+
+def _theme_ids_by_target(theme_associations: list[QgsFeature], target_attribute: str) -> dict[str, list[str]]:
+    """Returns the plan theme IDs associated with each regulation or proposition ID."""
+    theme_ids: dict[str, list[str]] = defaultdict(list)
+    for row in theme_associations:
+        if row[target_attribute] is not None:
+            theme_ids[row[target_attribute]].append(row["plan_theme_id"])
+    return theme_ids
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from qgis.core import QgsApplication, QgsFeedback, QgsTask, QgsVectorLayerFeatureSource
+from qgis.PyQt.QtCore import QObject, pyqtSignal
+
+from arho_feature_template.core.models import RegulationGroupLibrary
+from arho_feature_template.core.template_manager import TemplateManager
+from arho_feature_template.resources.libraries.feature_templates import feature_template_library_config_files
+from arho_feature_template.resources.libraries.regulation_groups import (
+    get_default_regulation_group_library_config_files,
+    get_user_regulation_group_library_config_files,
+)
+from arho_feature_template.utils.code_cache import PersistentCodeCache
+from arho_feature_template.utils.misc_utils import iface
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from arho_feature_template.project.layers.code_layers import AbstractCodeLayer
+
+logger = logging.getLogger(__name__)
+
+
+def library_template_files() -> tuple[list[tuple[Path, RegulationGroupLibrary.LibraryType]], list[Path]]:
+    """Returns the regulation group library files (with their library types) and the plan feature library files."""
+    regulation_group_files = [
+        (file_path, RegulationGroupLibrary.LibraryType.DEFAULT)
+        for file_path in get_default_regulation_group_library_config_files()
+    ]
+    regulation_group_files.extend(
+        (file_path, RegulationGroupLibrary.LibraryType.CUSTOM)
+        for file_path in get_user_regulation_group_library_config_files()
+    )
+    return regulation_group_files, list(feature_template_library_config_files())
+
+
+@dataclass
+class LibraryTemplates:
+    """Parsed template data of the regulation group and plan feature libraries."""
+
+    regulation_group_templates: list[tuple[dict, RegulationGroupLibrary.LibraryType, str]] = field(default_factory=list)
+    plan_feature_templates: list[dict] = field(default_factory=list)
+    fail_messages: list[str] = field(default_factory=list)
+
+    @classmethod
+    def parse(
+        cls,
+        regulation_group_files: list[tuple[Path, RegulationGroupLibrary.LibraryType]],
+        plan_feature_files: list[Path],
+        feedback: QgsFeedback | None = None,
+    ) -> LibraryTemplates:
+        """Parses the given library files. Does not access the GUI, so it can be run in a background task."""
+        templates = LibraryTemplates()
+        file_count = max(len(regulation_group_files) + len(plan_feature_files), 1)
+
+        for i, (file_path, library_type) in enumerate(regulation_group_files):
+            if feedback and feedback.isCanceled():
+                return templates
+            data = TemplateManager.parse_regulation_group_template_file(file_path)
+            if data is None:
+                templates.fail_messages.append(
+                    f"Kaavamääräyskirjastoa ei löytynyt määritellystä tiedostopolusta: {file_path}"
+                )
+                data = {}
+            templates.regulation_group_templates.append((data, library_type, str(file_path)))
+            if feedback:
+                feedback.setProgress(100 * (i + 1) / file_count)
+
+        for i, file_path in enumerate(plan_feature_files, start=len(regulation_group_files)):
+            if feedback and feedback.isCanceled():
+                return templates
+            data = TemplateManager.parse_plan_feature_template_file(file_path)
+            if data is None:
+                templates.fail_messages.append(
+                    f"Kaavakohdekirjastoa ei löytynyt määritellystä tiedostopolusta: {file_path}"
+                )
+                data = {}
+            templates.plan_feature_templates.append(data)
+            if feedback:
+                feedback.setProgress(100 * (i + 1) / file_count)
+
+        return templates
+
+    def report_failures(self):
+        for message in self.fail_messages:
+            iface.messageBar().pushCritical("", message)
+
+
+class CodeCacheTask(QgsTask):
+    """
+    Loads the caches of the given code layers in a background task.
+
+    Features are read through feature sources created in the main thread, and the caches of the layer classes
+    are filled in `finished`, which runs in the main thread again.
+    """
+
+    def __init__(self, layer_classes: list[type[AbstractCodeLayer]]):
+        super().__init__("ARHO: koodistojen lataus", QgsTask.CanCancel)
+        self._sources: list[
+            tuple[type[AbstractCodeLayer], list[str], PersistentCodeCache, QgsVectorLayerFeatureSource]
+        ] = []
+        for layer_class in layer_classes:
+            layer = layer_class.get_from_project()
+            feature_source = QgsVectorLayerFeatureSource(layer)
+            self._sources.append(
+                (layer_class, layer.fields().names(), PersistentCodeCache(layer, feature_source), feature_source)
+            )
+        self.features: dict[type[AbstractCodeLayer], dict[str, dict[str, Any]]] = {}
+        self.exception: Exception | None = None
+
+    def run(self) -> bool:
+        try:
+            for i, (layer_class, field_names, persistent_cache, feature_source) in enumerate(self._sources):
+                features = persistent_cache.load()
+                if features is None:
+                    features = {}
+                    for feat in feature_source.getFeatures():
+                        if self.isCanceled():
+                            return False
+                        features[feat["id"]] = layer_class.attributes_from_feature(feat, field_names)
+                    persistent_cache.store(features)
+                self.features[layer_class] = features
+                self.setProgress(100 * (i + 1) / len(self._sources))
+        except Exception as e:  # noqa: BLE001
+            self.exception = e
+            return False
+        return not self.isCanceled()
+
+    def finished(self, result: bool):  # noqa: FBT001
+        if not result:
+            if self.exception is not None:
+                logger.warning("Loading code layer caches failed: %s", self.exception)
+            return
+        for layer_class, features in self.features.items():
+            layer_class.set_cache(features)
+
+
+class LibraryTemplateTask(QgsTask):
+    """Parses the regulation group and plan feature library files in a background task."""
+
+    def __init__(self):
+        super().__init__("ARHO: kirjastojen lukeminen", QgsTask.CanCancel)
+        self._regulation_group_files, self._plan_feature_files = library_template_files()
+        self._feedback = QgsFeedback()
+        self._feedback.progressChanged.connect(self.setProgress)
+        self.templates: LibraryTemplates | None = None
+        self.exception: Exception | None = None
+
+    def cancel(self):
+        self._feedback.cancel()
+        super().cancel()
+
+    def run(self) -> bool:
+        try:
+            templates = LibraryTemplates.parse(self._regulation_group_files, self._plan_feature_files, self._feedback)
+        except Exception as e:  # noqa: BLE001
+            self.exception = e
+            return False
+        if self.isCanceled():
+            return False
+        self.templates = templates
+        return True
+
+    def finished(self, result: bool):  # noqa: FBT001
+        if not result and self.exception is not None:
+            logger.warning("Reading library files failed: %s", self.exception)
+
+
+class ProjectInitializer(QObject):
+    """
+    Initializes the plugin for a project in stages run as background tasks.
+
+    Code layer caches are loaded and library files parsed in parallel tasks shown in the QGIS task manager.
+    `code_layers_ready` is emitted when the code layer stage is done and `library_templates_ready` when the
+    parsed library templates can be turned into library models, which requires the code layer caches too.
+    """
+
+    code_layers_ready = pyqtSignal()
+    library_templates_ready = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._code_cache_task: CodeCacheTask | None = None
+        self._library_template_task: LibraryTemplateTask | None = None
+        self._code_layers_done = False
+        self._library_templates: LibraryTemplates | None = None
+
+    def start(self, code_layer_classes: list[type[AbstractCodeLayer]]):
+        self.cancel()
+
+        self._code_cache_task = CodeCacheTask(code_layer_classes)
+        self._code_cache_task.taskCompleted.connect(partial(self._on_code_cache_task_done, self._code_cache_task))
+        self._code_cache_task.taskTerminated.connect(partial(self._on_code_cache_task_done, self._code_cache_task))
+
+        self._library_template_task = LibraryTemplateTask()
+        self._library_template_task.taskCompleted.connect(
+            partial(self._on_library_template_task_done, self._library_template_task)
+        )
+        self._library_template_task.taskTerminated.connect(
+            partial(self._on_library_template_task_done, self._library_template_task)
+        )
+
+        task_manager = QgsApplication.taskManager()
+        task_manager.addTask(self._code_cache_task)
+        task_manager.addTask(self._library_template_task)
+
+    def cancel(self):
+        """Cancels the running stages. Signals of the cancelled stages are not emitted anymore."""
+        for task in (self._code_cache_task, self._library_template_task):
+            if task is not None and task.status() not in (QgsTask.Complete, QgsTask.Terminated):
+                task.cancel()
+        self._code_cache_task = None
+        self._library_template_task = None
+        self._code_layers_done = False
+        self._library_templates = None
+
+    def _on_code_cache_task_done(self, task: CodeCacheTask):
+        if task is not self._code_cache_task:
+            return
+        # If loading failed, code layer caches are built on demand instead
+        self._code_cache_task = None
+        self._code_layers_done = True
+        self.code_layers_ready.emit()
+        self._emit_library_templates_if_ready()
+
+    def _on_library_template_task_done(self, task: LibraryTemplateTask):
+        if task is not self._library_template_task:
+            return
+        self._library_template_task = None
+        # Fall back to parsing the files in the main thread if the task failed
+        self._library_templates = task.templates or LibraryTemplates.parse(*library_template_files())
+        self._emit_library_templates_if_ready()
+
+    def _emit_library_templates_if_ready(self):
+        if self._code_layers_done and self._library_templates is not None:
+            templates = self._library_templates
+            self._library_templates = None
+            self.library_templates_ready.emit(templates)
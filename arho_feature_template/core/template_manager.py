@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import os
+import pickle
 from pathlib import Path
+from typing import ClassVar
 
 import yaml
 
 from arho_feature_template.utils.misc_utils import iface
 
+try:
+    # Use the libyaml based loader if PyYAML has been built with it
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader  # type: ignore[assignment]
+
 
 class TemplateManager:
     # NOTE: Consider refactoring this class into utils
 
+    # Parsed template files: file path -> (modification time, size, pickled data)
+    _parsed_file_cache: ClassVar[dict[str, tuple[int, int, bytes]]] = {}
+
     @classmethod
     def _clean_data(cls, data: dict | list | str | float):
         """Recursively removes keys with None, empty string, or empty-list values from a dict or list."""
@@ -40,22 +51,49 @@ class TemplateManager:
 
         cleaned_data = cls._clean_data(config_data)
 
+        # Do not rely on the modification time alone in case the file is rewritten within its resolution
+        cls._parsed_file_cache.pop(str(file_path), None)
         with file_path.open("w", encoding="utf-8") as yaml_file:
             yaml.safe_dump(cleaned_data, yaml_file, sort_keys=False, allow_unicode=True, default_flow_style=False)
 
     @classmethod
     def _read_from_yaml_file(cls, file_path: Path, fail_msg: str) -> dict:
-        if file_path.exists():
-            try:
-                with file_path.open(encoding="utf-8") as f:
-                    template_data = yaml.safe_load(f)
-                    return template_data if template_data is not None else {}
-            except IsADirectoryError:
-                iface.messageBar().pushCritical("", fail_msg)
-                return {}
-        else:
+        template_data = cls._parse_yaml_file(file_path)
+        if template_data is None:
             iface.messageBar().pushCritical("", fail_msg)
             return {}
+        return template_data
+
+    @classmethod
+    def _parse_yaml_file(cls, file_path: Path) -> dict | None:
+        """
+        Returns the parsed data of the file or None if the file could not be read. Does not access the GUI.
+
+        Parsed data is cached by file path, modification time and size, so unchanged files are parsed only once.
+        The cached data is stored pickled, so each call returns a separate copy of it.
+        """
+        if not file_path.exists():
+            return None
+        try:
+            stat = file_path.stat()
+            cached = cls._parsed_file_cache.get(str(file_path))
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return pickle.loads(cached[2])  # noqa: S301
+
+            with file_path.open(encoding="utf-8") as f:
+                template_data = yaml.load(f, Loader=SafeLoader)
+                template_data = template_data if template_data is not None else {}
+        except IsADirectoryError:
+            return None
+
+        cls._parsed_file_cache[str(file_path)] = (stat.st_mtime_ns, stat.st_size, pickle.dumps(template_data))
+        return template_data
+
+    @classmethod
+    def _filter_library_type(cls, data: dict, library_type: str) -> dict:
+        if data.get("library_type") != library_type:
+            return {}
+        return data
 
     @classmethod
     def read_regulation_group_template_file(cls, file_path: Path | str) -> dict:
@@ -63,10 +101,7 @@ class TemplateManager:
             file_path=file_path if type(file_path) is Path else Path(file_path),
             fail_msg=f"Kaavamääräyskirjastoa ei löytynyt määritellystä tiedostopolusta: {file_path}",
         )
-        library_type = data.get("library_type")
-        if not library_type or library_type != "regulation_group":
-            return {}
-        return data
+        return cls._filter_library_type(data, "regulation_group")
 
     @classmethod
     def read_plan_feature_template_file(cls, file_path: Path | str) -> dict:
@@ -74,10 +109,27 @@ class TemplateManager:
             file_path=file_path if type(file_path) is Path else Path(file_path),
             fail_msg=f"Kaavakohdekirjastoa ei löytynyt määritellystä tiedostopolusta: {file_path}",
         )
-        library_type = data.get("library_type")
-        if not library_type or library_type != "plan_feature":
-            return {}
-        return data
+        return cls._filter_library_type(data, "plan_feature")
+
+    @classmethod
+    def parse_regulation_group_template_file(cls, file_path: Path | str) -> dict | None:
+        """
+        Like `read_regulation_group_template_file`, but returns None instead of reporting a missing file.
+
+        Safe to call from a background task.
+        """
+        data = cls._parse_yaml_file(file_path if type(file_path) is Path else Path(file_path))
+        return cls._filter_library_type(data, "regulation_group") if data is not None else None
+
+    @classmethod
+    def parse_plan_feature_template_file(cls, file_path: Path | str) -> dict | None:
+        """
+        Like `read_plan_feature_template_file`, but returns None instead of reporting a missing file.
+
+        Safe to call from a background task.
+        """
+        data = cls._parse_yaml_file(file_path if type(file_path) is Path else Path(file_path))
+        return cls._filter_library_type(data, "plan_feature") if data is not None else None
 
     @classmethod
     def write_regulation_group_template_file(
@@ -96,6 +148,7 @@ class TemplateManager:
     @classmethod
     def delete_template_file(cls, file_path: Path | str) -> bool:
         file_path = file_path if type(file_path) is Path else Path(file_path)
+        cls._parsed_file_cache.pop(str(file_path), None)
         if os.path.exists(file_path):
             os.remove(file_path)
             return True
@@ -36,5 +36,10 @@ class FeatureNotFoundError(Exception):
         super().__init__(f"Feature with ID '{id_}' not found for layer {layer_name}")
 
 
+class QueryTimeoutError(Exception):
+    def __init__(self, timeout: float):
+        super().__init__(f"Query did not finish in {timeout} seconds")
+
+
 class UnexpectedNoneError(Exception):
     """Internal QGIS errors that should not be happened"""
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 
-from qgis.PyQt.QtCore import Qt
-from qgis.PyQt.QtWidgets import QComboBox, QTreeWidget, QTreeWidgetItem
+from qgis.PyQt.QtCore import QModelIndex, QSortFilterProxyModel, Qt
+from qgis.PyQt.QtGui import QStandardItem, QStandardItemModel
+from qgis.PyQt.QtWidgets import QComboBox, QTreeView
 
 from arho_feature_template.utils.misc_utils import deserialize_localized_text
 
@@ -16,133 +17,207 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-class CodeComboBox(QComboBox):
-    def __init__(self, parent=None):
-        super().__init__(parent)
+class CodeItemModel(QStandardItemModel):
+    """
+    Item model of the codes of a code layer, with a NULL item as the first row.
 
-        self.addItem("NULL")
-        self.setItemData(0, None)
+    One model is built per code layer (and flat or hierarchical layout) when first needed and shared by all
+    code combo boxes. The model is rebuilt if the code layer cache has changed since. Shared models must not be
+    modified by the widgets using them.
+    """
 
-        self.setCurrentIndex(0)
+    _models: ClassVar[dict[tuple[type[AbstractCodeLayer], bool], tuple[int, CodeItemModel]]] = {}
 
-    def populate_from_code_layer(self, layer_type: type[AbstractCodeLayer]) -> None:
-        for id_, attributes in layer_type.get_attribute_dict().items():
-            text = attributes.get("name")
-            if isinstance(text, dict):
-                text = deserialize_localized_text(text)
-            self.addItem(text, id_)
+    def __init__(self, layer_type: type[AbstractCodeLayer], hierarchical: bool):  # noqa: FBT001
+        super().__init__()
+        self._items_by_id: dict[str, QStandardItem] = {}
 
-    def value(self) -> str:
-        return self.currentData()
-
-    def set_value(self, value: str | None) -> None:
-        if value is None:
-            self.setCurrentIndex(0)
-            return
-
-        index = self.findData(value)
-        if index != -1:
-            self.setCurrentIndex(index)
-
-    def remove_item_by_text(self, text: str):
-        index = self.findText(text)
-        if index != -1:
-            self.removeItem(index)
+        null_item = QStandardItem("NULL")
+        null_item.setData(None, Qt.UserRole)
+        self.appendRow(null_item)
 
+        if hierarchical:
+            self._add_hierarchical_items(layer_type)
+        else:
+            self._add_items(layer_type)
 
-class HierarchicalCodeComboBox(QComboBox):
-    def __init__(self, parent=None):
-        super().__init__(parent)
+    @classmethod
+    def for_code_layer(
+        cls,
+        layer_type: type[AbstractCodeLayer],
+        hierarchical: bool = False,  # noqa: FBT001, FBT002
+    ) -> CodeItemModel:
+        """Returns the shared item model of the code layer."""
+        # Builds the layer cache first if needed, so the version is up to date
+        layer_type.get_attribute_dict()
+        version = layer_type.cache_version()
 
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setColumnCount(1)
-        self.tree_widget.setHeaderHidden(True)
+        cached = cls._models.get((layer_type, hierarchical))
+        if cached is not None and cached[0] == version:
+            return cached[1]
 
-        self.setModel(self.tree_widget.model())
-        self.setView(self.tree_widget)
+        model = cls(layer_type, hierarchical)
+        cls._models[(layer_type, hierarchical)] = (version, model)
+        return model
 
-        self.tree_widget.viewport().installEventFilter(self)
+    @classmethod
+    def clear(cls):
+        cls._models.clear()
 
-        null_item = QTreeWidgetItem(["NULL"])
-        null_item.setData(0, Qt.UserRole, None)
-        self.tree_widget.addTopLevelItem(null_item)
-        self.null_index = self.tree_widget.indexFromItem(null_item)
-        self.tree_widget.setCurrentIndex(self.null_index)
+    def index_of(self, id_: str) -> QModelIndex:
+        """Returns the index of the code with the given ID, or an invalid index if the code is not in the model."""
+        item = self._items_by_id.get(id_)
+        return item.index() if item is not None else QModelIndex()
 
-    def populate_from_code_layer(self, layer_type: type[AbstractCodeLayer]) -> None:
-        items: dict[str, QTreeWidgetItem] = {}
+    def _add_items(self, layer_type: type[AbstractCodeLayer]):
+        for id_, attributes in layer_type.get_attribute_dict().items():
+            text = attributes.get("name")
+            if isinstance(text, dict):
+                text = deserialize_localized_text(text)
+            item = QStandardItem(text)
+            item.setData(id_, Qt.UserRole)
+            self._items_by_id[id_] = item
+            self.appendRow(item)
 
+    def _add_hierarchical_items(self, layer_type: type[AbstractCodeLayer]):
         for id_, attributes in sorted(layer_type.get_attribute_dict().items(), key=lambda item: item[1]["level"]):
-            item = QTreeWidgetItem()
-            items[id_] = item
-
             # Text
             name = attributes.get("name")
             if isinstance(name, dict):
                 name = deserialize_localized_text(name)
-            item.setText(0, name)
+            item = QStandardItem(name)
 
             # Tooltip
             description = attributes.get("description")
             if isinstance(description, dict):
                 description = deserialize_localized_text(description)
-            item.setToolTip(0, description if description else name)
+            item.setToolTip(description if description else name)
 
             # Data
-            item.setData(0, Qt.UserRole, id_)
+            item.setData(id_, Qt.UserRole)
+            item.setEditable(False)
 
             if attributes["value"] in layer_type.category_only_codes:
                 item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
 
             if attributes["level"] == 1:
-                self.tree_widget.addTopLevelItem(item)
+                self.appendRow(item)
             else:
-                parent = items[attributes["parent_id"]]
-                parent.addChild(item)
+                self._items_by_id[attributes["parent_id"]].appendRow(item)
+            self._items_by_id[id_] = item
+
+
+class _HiddenTextsProxyModel(QSortFilterProxyModel):
+    """Proxy model hiding the rows with the given texts, so a widget can leave out items of a shared model."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hidden_texts: set[str] = set()
+
+    def hide_text(self, text: str):
+        self.hidden_texts.add(text)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:  # noqa: N802
+        if not self.hidden_texts:
+            return True
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        return index.data(Qt.DisplayRole) not in self.hidden_texts
+
+
+class CodeComboBox(QComboBox):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.code_model: CodeItemModel | None = None
+        self.proxy_model = _HiddenTextsProxyModel(self)
+
+        # Only the NULL item until the combo box is populated
+        null_model = QStandardItemModel(self)
+        null_item = QStandardItem("NULL")
+        null_item.setData(None, Qt.UserRole)
+        null_model.appendRow(null_item)
+        self.proxy_model.setSourceModel(null_model)
+        self.setModel(self.proxy_model)
+
+        self.setCurrentIndex(0)
+
+    def populate_from_code_layer(self, layer_type: type[AbstractCodeLayer]) -> None:
+        self.code_model = CodeItemModel.for_code_layer(layer_type)
+        self.proxy_model.setSourceModel(self.code_model)
+        self.setCurrentIndex(0)
+
+    def value(self) -> str:
+        return self.currentData()
+
+    def set_value(self, value: str | None) -> None:
+        if value is None:
+            self.setCurrentIndex(0)
+            return
+
+        if self.code_model is None:
+            return
+        index = self.proxy_model.mapFromSource(self.code_model.index_of(value))
+        if index.isValid():
+            self.setCurrentIndex(index.row())
 
-        self.tree_widget.expandAll()
+    def remove_item_by_text(self, text: str):
+        self.proxy_model.hide_text(text)
+
+
+class HierarchicalCodeComboBox(QComboBox):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.code_model: CodeItemModel | None = None
+
+        self.tree_view = QTreeView()
+        self.tree_view.setHeaderHidden(True)
+        self.tree_view.setSelectionMode(QTreeView.SingleSelection)
+
+        # Only the NULL item until the combo box is populated
+        null_model = QStandardItemModel(self)
+        null_item = QStandardItem("NULL")
+        null_item.setData(None, Qt.UserRole)
+        null_model.appendRow(null_item)
+        self._set_tree_model(null_model)
+
+        self.setView(self.tree_view)
+
+        self.tree_view.viewport().installEventFilter(self)
+
+    def _set_tree_model(self, model: QStandardItemModel):
+        self.setModel(model)
+        self.tree_view.setModel(model)
+        self.null_index = model.index(0, 0)
+        self.tree_view.setCurrentIndex(self.null_index)
+
+    def populate_from_code_layer(self, layer_type: type[AbstractCodeLayer]) -> None:
+        self.code_model = CodeItemModel.for_code_layer(layer_type, hierarchical=True)
+        self._set_tree_model(self.code_model)
+        self.tree_view.expandAll()
 
     def value(self) -> str | None:
         """Return the value of the current item.
 
         Currently might be None, if the current item is not selectable."""
 
-        selected = self.tree_widget.selectedItems()  # TODO: Find a way to get the current item even if not selectable
+        # TODO: Find a way to get the current item even if not selectable
+        selected = self.tree_view.selectionModel().selectedIndexes()
         if selected:  # current item might not be selectable
-            item = selected[0]
-            return item.data(0, Qt.UserRole)
-        return None
-
-    def _find_item_recursive(self, item: QTreeWidgetItem, value: str) -> QTreeWidgetItem:
-        """Recursively try to find item with given value and return the item if found."""
-        # Found item, return it
-        if item.data(0, Qt.UserRole) == value:
-            return item
-
-        # Loop children
-        for i in range(item.childCount()):
-            found_item = self._find_item_recursive(item.child(i), value)
-            if found_item:
-                return found_item
-
+            return selected[0].data(Qt.UserRole)
         return None
 
     def set_value(self, value: str | None) -> None:
         # Set selection to NULL if `value` is None
-        if value is None:
+        if value is None or self.code_model is None:
             return
 
-        # Loop top level tree items
-        for i in range(self.count()):
-            # Handle child items recursively
-            found_item = self._find_item_recursive(self.tree_widget.topLevelItem(i), value)
-
-            # If matching item was found, set it as selected. Because of the hybrid TreeWidget + ComboBox
-            # nature of the widget, value setting is unintuitive and tricky
-            if found_item:
-                self.tree_widget.setCurrentItem(found_item)
-                idx = self.tree_widget.indexFromItem(found_item)
-                self.setRootModelIndex(idx.parent())
-                self.setCurrentIndex(idx.row())
-                self.setRootModelIndex(self.null_index.parent())
-                return
+        idx = self.code_model.index_of(value)
+        # If matching item was found, set it as selected. Because of the hybrid TreeView + ComboBox
+        # nature of the widget, value setting is unintuitive and tricky
+        if idx.isValid():
+            self.tree_view.setCurrentIndex(idx)
+            self.setRootModelIndex(idx.parent())
+            self.setCurrentIndex(idx.row())
+            self.setRootModelIndex(self.null_index.parent())
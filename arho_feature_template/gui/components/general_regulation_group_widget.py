@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from importlib import resources
 from typing import TYPE_CHECKING
 
@@ -42,8 +43,16 @@ class GeneralRegulationGroupWidget(QWidget, FormClass):  # type: ignore
         self.regulation_widgets: list[RegulationWidget] = []
         self.proposition_widgets: list[PropositionWidget] = []
 
-        regulation_group.type_code_id = PlanRegulationGroupTypeLayer.get_id_by_feature_layer_name(layer_name)
-        self.from_model(regulation_group)
+        # Groups can be shared by libraries and other features, so the type is set on a copy that has its own
+        # regulation and proposition lists
+        self.from_model(
+            replace(
+                regulation_group,
+                type_code_id=PlanRegulationGroupTypeLayer.get_id_by_feature_layer_name(layer_name),
+                regulations=list(regulation_group.regulations),
+                propositions=list(regulation_group.propositions),
+            )
+        )
 
         self.verbal_regulation_type_id = PlanRegulationTypeLayer.get_id_by_type("sanallinenMaarays")
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import replace
 from importlib import resources
 from typing import TYPE_CHECKING
 
@@ -55,8 +56,16 @@ class RegulationGroupWidget(QWidget, FormClass):  # type: ignore
             raise LayerNameNotFoundError(msg)
         self.layer_name = plan_feature.layer_name
 
-        self.from_model(regulation_group)
-        self.regulation_group.type_code_id = PlanRegulationGroupTypeLayer.get_id_by_feature_layer_name(self.layer_name)
+        # Groups can be shared by libraries and other features, so the type is set on a copy that has its own
+        # regulation and proposition lists
+        self.from_model(
+            replace(
+                regulation_group,
+                type_code_id=PlanRegulationGroupTypeLayer.get_id_by_feature_layer_name(self.layer_name),
+                regulations=list(regulation_group.regulations),
+                propositions=list(regulation_group.propositions),
+            )
+        )
 
         self.edit_btn.setIcon(QIcon(resources_path("icons", "settings.svg")))
         self.edit_btn.clicked.connect(lambda: self.open_as_form_signal.emit(self))
@@ -1,16 +1,161 @@
 from __future__ import annotations
 
-from typing import Any
+import unicodedata
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, NamedTuple, Tuple
 
 from qgis.gui import QgsFilterLineEdit
-from qgis.PyQt.QtCore import Qt
-from qgis.PyQt.QtWidgets import QSizePolicy, QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
+from qgis.PyQt.QtCore import QModelIndex, QSortFilterProxyModel, Qt, QTimer
+from qgis.PyQt.QtGui import QStandardItem, QStandardItemModel
+from qgis.PyQt.QtWidgets import QSizePolicy, QTreeView, QVBoxLayout, QWidget
 
 from arho_feature_template.utils.misc_utils import deserialize_localized_text
 
+if TYPE_CHECKING:
+    from qgis.PyQt.QtCore import QAbstractItemModel
+
+# Path of an item in the tree as row numbers from the top level
+ItemPath = Tuple[int, ...]
+
+
+def normalize_search_text(text: str) -> str:
+    """Returns the text casefolded, without diacritics and with whitespace collapsed, for comparing in searches."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+class _SearchEntry(NamedTuple):
+    # Normalized texts of the item and its descendants, separated by newlines so matches cannot span items
+    sub_tree_text: str
+    # Normalized text of the top-level ancestor of the item (or the item itself if it is top-level)
+    top_level_text: str
+
+
+class TreeSearchProxyModel(QSortFilterProxyModel):
+    """
+    Proxy model filtering a tree by search text.
+
+    A top-level item is shown if it or any of its descendants matches, and a matching top-level item shows
+    all of its descendants. Other items are shown if they or any of their descendants match. Texts are compared
+    casefolded and without diacritics.
+
+    The normalized texts of each item and its sub tree are indexed when the first search is made, and the set of
+    shown items is computed from the index once per search. The filter is invalidated only if the set changes.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search_text = ""
+        self._index: dict[ItemPath, _SearchEntry] | None = None
+        # Paths of the shown items, or None if all items are shown
+        self._visible: set[ItemPath] | None = None
+
+        # Changes to the source model are applied once after the changes, not for every added row
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self._refresh)
+
+    def setSourceModel(self, model: QAbstractItemModel):  # noqa: N802
+        old_model = self.sourceModel()
+        if old_model is not None:
+            with suppress(TypeError, RuntimeError):
+                old_model.rowsInserted.disconnect(self._on_source_changed)
+                old_model.rowsRemoved.disconnect(self._on_source_changed)
+                old_model.modelReset.disconnect(self._on_source_changed)
+                old_model.dataChanged.disconnect(self._on_source_changed)
+
+        self._index = None
+        self._visible = self._find_visible(model, self.search_text) if self.search_text else None
+        super().setSourceModel(model)
+
+        model.rowsInserted.connect(self._on_source_changed)
+        model.rowsRemoved.connect(self._on_source_changed)
+        model.modelReset.connect(self._on_source_changed)
+        model.dataChanged.connect(self._on_source_changed)
+
+    def set_search_text(self, search_text: str):
+        query = normalize_search_text(search_text)
+        if query == self.search_text:
+            return
+
+        if not query:
+            visible = None
+        elif self._index is not None and self._visible is not None and self.search_text in query:
+            # Items matching the new text are a subset of the items matching the previous text
+            visible = self._find_visible(self.sourceModel(), query, self._visible)
+        else:
+            visible = self._find_visible(self.sourceModel(), query)
+        self.search_text = query
+
+        if visible != self._visible:
+            self._visible = visible
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:  # noqa: N802
+        if self._visible is None:
+            return True
+        return _item_path(self.sourceModel().index(source_row, 0, source_parent)) in self._visible
+
+    def _find_visible(
+        self, model: QAbstractItemModel, query: str, candidates: set[ItemPath] | None = None
+    ) -> set[ItemPath]:
+        if self._index is None:
+            self._index = _build_search_index(model)
+        paths = candidates if candidates is not None else self._index.keys()
+        return {
+            path
+            for path in paths
+            if query in self._index[path].top_level_text or query in self._index[path].sub_tree_text
+        }
+
+    def _on_source_changed(self, *_args):
+        self._index = None
+        if self.search_text:
+            self._refresh_timer.start()
+
+    def _refresh(self):
+        if not self.search_text:
+            return
+        self._visible = self._find_visible(self.sourceModel(), self.search_text)
+        self.invalidateFilter()
+
+
+def _item_path(index: QModelIndex) -> ItemPath:
+    path = []
+    while index.isValid():
+        path.append(index.row())
+        index = index.parent()
+    return tuple(reversed(path))
+
+
+def _build_search_index(model: QAbstractItemModel) -> dict[ItemPath, _SearchEntry]:
+    index: dict[ItemPath, _SearchEntry] = {}
+
+    def add_sub_tree(parent: QModelIndex, parent_path: ItemPath, top_level_text: str | None) -> list[str]:
+        texts = []
+        for row in range(model.rowCount(parent)):
+            item_index = model.index(row, 0, parent)
+            path = (*parent_path, row)
+            text = normalize_search_text(item_index.data(Qt.DisplayRole) or "")
+            sub_tree_texts = [text, *add_sub_tree(item_index, path, top_level_text or text)]
+            index[path] = _SearchEntry("\n".join(sub_tree_texts), top_level_text or text)
+            texts.extend(sub_tree_texts)
+        return texts
+
+    add_sub_tree(QModelIndex(), (), None)
+    return index
+
 
 class TreeWithSearchWidget(QWidget):
-    """A widget combining a QTreeWidget and QgsFilterLineEdit."""
+    """
+    A widget combining a QTreeView and QgsFilterLineEdit.
+
+    The tree shows either the items added with `add_item_to_tree` or a shared model set with `set_source_model`.
+    Shared models are filtered through a proxy, so they are not modified by the widget.
+    """
+
+    SEARCH_DELAY_MS = 200
 
     def __init__(self):
         super().__init__()
@@ -18,11 +163,23 @@ class TreeWithSearchWidget(QWidget):
         self.search.setShowClearButton(True)
         self.search.setShowSearchIcon(True)
         self.search.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
-        self.search.valueChanged.connect(self.filter_tree_items)
+        self.search.valueChanged.connect(self._on_search_text_changed)
+
+        # Filter only after the user has stopped typing
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.filter_tree_items)
+
+        self.model = QStandardItemModel(self)
+        self.proxy_model = TreeSearchProxyModel(self)
+        self.proxy_model.setSourceModel(self.model)
 
-        self.tree = QTreeWidget(self)
+        self.tree = QTreeView(self)
         self.tree.setHeaderHidden(True)
+        self.tree.setEditTriggers(QTreeView.NoEditTriggers)
         self.tree.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Expanding)
+        self.tree.setModel(self.proxy_model)
 
         layout = QVBoxLayout()
         layout.addWidget(self.search)
@@ -32,62 +189,40 @@ class TreeWithSearchWidget(QWidget):
         self.setContentsMargins(0, 0, 0, 0)
         layout.setContentsMargins(0, 0, 0, 0)
 
+    def set_source_model(self, model: QStandardItemModel):
+        """Shows the given model in the tree instead of the own items of the widget."""
+        self.proxy_model.setSourceModel(model)
+
+    def clear(self):
+        """Removes the own items of the widget and shows them in the tree again if a shared model was set."""
+        self.model.clear()
+        self.proxy_model.setSourceModel(self.model)
+
     def add_item_to_tree(
-        self, text: str | None, data: Any | None = None, parent: QTreeWidgetItem | None = None
-    ) -> QTreeWidgetItem:
-        item = QTreeWidgetItem(parent)
+        self, text: str | None, data: Any | None = None, parent: QStandardItem | None = None
+    ) -> QStandardItem:
+        item = QStandardItem()
         if text:
             if isinstance(text, dict):
                 text = deserialize_localized_text(text)
-            item.setText(0, text)
-            item.setToolTip(0, text)  # Set text as tooltip in case the tree width is not enough to show item text
+            item.setText(text)
+            item.setToolTip(text)  # Set text as tooltip in case the tree width is not enough to show item text
         if data:
-            item.setData(0, Qt.UserRole, data)
-        if not parent:
-            self.tree.addTopLevelItem(item)
+            item.setData(data, Qt.UserRole)
+        if parent:
+            parent.appendRow(item)
+        else:
+            self.model.appendRow(item)
 
         return item
 
+    def _on_search_text_changed(self, text: str):
+        if text:
+            self.search_timer.start()
+        else:
+            # Show the whole tree right away when the search is cleared
+            self.search_timer.stop()
+            self.filter_tree_items()
+
     def filter_tree_items(self):
-        search_text = self.search.value().lower()
-
-        # Iterate over all group (top-level) items in the tree
-        for i in range(self.tree.topLevelItemCount()):
-            group_item = self.tree.topLevelItem(i)
-            group_item.setHidden(True)  # Initially hide the top-level item
-
-            matches_group = search_text in group_item.text(0).lower()
-            if matches_group:
-                # If group matches, show it and all its children
-                self.show_all_children(group_item)
-                group_item.setHidden(False)
-            else:
-                # Otherwise, recursively filter its children
-                matches_child = self.filter_children(group_item, search_text)
-                group_item.setHidden(not matches_child)
-
-    def filter_children(self, parent_item: QTreeWidgetItem, search_text: str) -> bool:
-        """Recursively filter children and return True if any child matches."""
-        parent_matches = False
-        if parent_item.parent() is not None:
-            parent_matches = search_text in parent_item.text(0).lower()
-        descendant_matches = False
-
-        for i in range(parent_item.childCount()):
-            child = parent_item.child(i)
-            sub_tree_matches = self.filter_children(child, search_text)
-            child.setHidden(not sub_tree_matches)
-
-            if sub_tree_matches:
-                descendant_matches = True
-
-        return parent_matches or descendant_matches
-
-    def show_all_children(self, parent_item: QTreeWidgetItem):
-        """Show the parent item and all its children recursively."""
-        parent_item.setHidden(False)
-        for i in range(parent_item.childCount()):
-            child = parent_item.child(i)
-            child.setHidden(False)
-            if child.childCount() > 0:
-                self.show_all_children(child)
+        self.proxy_model.set_search_text(self.search.value())
@@ -5,31 +5,23 @@ from typing import TYPE_CHECKING
 
 from qgis.core import (
     QgsCoordinateReferenceSystem,
-    QgsCoordinateTransform,
-    QgsFeature,
     QgsFieldProxyModel,
     QgsMapLayerProxyModel,
-    QgsProject,
     QgsVectorLayer,
     QgsWkbTypes,
 )
 from qgis.PyQt import uic
 from qgis.PyQt.QtWidgets import QCheckBox, QDialog, QDialogButtonBox, QProgressBar
 
-from arho_feature_template.core.models import PlanFeature, RegulationGroupLibrary
+from arho_feature_template.core.feature_importer import FeatureImporter, FeatureReadTask
 from arho_feature_template.project.layers.code_layers import UndergroundTypeLayer, code_layers
-from arho_feature_template.project.layers.plan_layers import (
-    FEATURE_LAYER_NAME_TO_CLASS_MAP,
-    PlanLayer,
-    RegulationGroupAssociationLayer,
-    plan_feature_layers,
-    plan_layers,
-)
-from arho_feature_template.utils.misc_utils import iface, use_wait_cursor
+from arho_feature_template.project.layers.plan_layers import PlanLayer, plan_feature_layers, plan_layers
+from arho_feature_template.utils.misc_utils import iface
 
 if TYPE_CHECKING:
     from qgis.gui import QgsCheckableComboBox, QgsFieldComboBox, QgsMapLayerComboBox
 
+    from arho_feature_template.core.models import RegulationGroupLibrary
     from arho_feature_template.gui.components.code_combobox import CodeComboBox
 
 
@@ -62,6 +54,7 @@ class ImportFeaturesForm(QDialog, FormClass):  # type: ignore
         self.process_button_box.rejected.connect(self.reject)
 
         self.target_crs: QgsCoordinateReferenceSystem | None = None
+        self.importer: FeatureImporter | None = None
 
         # Source layer initialization
         # Exclude all project layers from valid source layers
@@ -130,109 +123,49 @@ class ImportFeaturesForm(QDialog, FormClass):  # type: ignore
         target_type = QgsWkbTypes.geometryType(self.target_layer.wkbType())
         return source_type == target_type
 
-    @use_wait_cursor
     def import_features(self):
         self.progress_bar.setValue(0)
 
-        if not self.source_layer or not self.target_layer:
+        if not self.source_layer or not self.target_layer or self.importer is not None:
             return
 
         if not self.target_crs:
             self.target_crs = PlanLayer.get_from_project().crs()
 
-        source_features = list(self.get_source_features(self.source_layer))
-
-        if not source_features:
+        task = FeatureReadTask(
+            source_layer=self.source_layer,
+            target_crs=self.target_crs,
+            target_layer_name=self.target_layer_name,
+            type_of_underground_id=self.feature_type_of_underground_selection.value(),
+            name_field=self.name_selection.currentField() or None,
+            description_field=self.description_selection.currentField() or None,
+            selected_features_only=self.selected_features_only.isChecked(),
+        )
+        if task.total_count == 0:
             iface.messageBar().pushInfo("", "Yhtään kohdetta ei tuotu.")
             return
 
-        # Create and add new plan features
-        plan_features = self.create_plan_features(source_features)
-        total_count = len(plan_features)
-        failed_count = 0
-        success_count = 0
-        for i, feat in enumerate(plan_features):
-            self.progress_bar.setValue(int((i + 1) / total_count * 100))
-            if self._save_feature(feat, self.target_layer, None, "Kaavakohteen lisääminen"):
-                success_count += 1
-            else:
-                failed_count += 1
-
-        # If regulation groups are defined, associate them with the plan features
-        if len(self.regulation_groups_selection.checkedItems()) > 0:
-            associations = self.create_regulation_group_associations(plan_features)
-            associations_layer = RegulationGroupAssociationLayer.get_from_project()
-            for association in associations:
-                self._save_feature(association, associations_layer, None, "Kaavamääräysryhmän assosiaation lisääminen")
-
-        if failed_count == 0:
-            iface.messageBar().pushSuccess("", "Kaavakohteet tuotiin onnistuneesti.")
-        else:
-            iface.messageBar().pushInfo("", f"Osa kaavakohteista tuotiin epäonnistuneesti ({failed_count}).")
+        self.importer = FeatureImporter(self.target_layer, self.regulation_groups_selection.checkedItemsData())
+        self.importer.progress_changed.connect(lambda progress: self.progress_bar.setValue(int(progress)))
+        self.importer.finished.connect(self._on_import_finished)
+        self.process_button_box.button(QDialogButtonBox.Ok).setEnabled(False)
+        self.importer.start(task)
 
-        self.progress_bar.setValue(100)
+    def _on_import_finished(self, imported_count: int, failed_count: int, cancelled: bool):  # noqa: FBT001
+        self.importer = None
+        self.process_button_box.button(QDialogButtonBox.Ok).setEnabled(self.source_and_target_layer_types_match())
 
-    def get_source_features(self, source_layer: QgsVectorLayer) -> list[QgsFeature]:
-        return (
-            source_layer.selectedFeatures() if self.selected_features_only.isChecked() else source_layer.getFeatures()
-        )
-
-    def create_plan_features(self, source_features: list[QgsFeature]) -> list[QgsFeature]:
-        layer_class = FEATURE_LAYER_NAME_TO_CLASS_MAP.get(self.target_layer_name)
-        if not layer_class:
-            msg = f"Could not find plan feature layer class for layer name {self.target_layer_name}"
-            raise ValueError(msg)
-
-        crs_mismatch = self.source_layer.crs() != self.target_crs
-        transform = QgsCoordinateTransform(
-            self.source_layer.crs(), PlanLayer.get_from_project().crs(), QgsProject.instance()
-        )
-
-        type_of_underground_id = self.feature_type_of_underground_selection.value()
-        source_layer_name_field = self.name_selection.currentField()
-        source_layer_description_field = self.description_selection.currentField()
-
-        plan_features = []
-        for feature in source_features:
-            geom = feature.geometry()
-            if crs_mismatch:
-                geom.transform(transform)
-
-            if not geom.isMultipart():
-                geom.convertToMultiType()
-
-            plan_features.append(
-                layer_class.feature_from_model(
-                    PlanFeature(
-                        geom=geom,
-                        type_of_underground_id=type_of_underground_id,
-                        layer_name=self.target_layer_name,
-                        name=feature[source_layer_name_field] if source_layer_name_field else None,
-                        description=feature[source_layer_description_field] if source_layer_description_field else None,
-                    )
-                )
-            )
-        return plan_features
-
-    def create_regulation_group_associations(self, plan_features: list[QgsFeature]) -> list[QgsFeature]:
-        return [
-            RegulationGroupAssociationLayer.feature_from(
-                regulation_group_id, self.target_layer_name, plan_feature["id"]
-            )
-            for regulation_group_id in self.regulation_groups_selection.checkedItemsData()
-            for plan_feature in plan_features
-        ]
-
-    @staticmethod
-    def _save_feature(feature: QgsFeature, layer: QgsVectorLayer, id_: str | None, edit_text: str = "") -> bool:
-        if not layer.isEditable():
-            layer.startEditing()
-        layer.beginEditCommand(edit_text)
-
-        if id_ is None:
-            layer.addFeature(feature)
+        if cancelled:
+            iface.messageBar().pushInfo("", f"Kaavakohteiden tuonti keskeytettiin, {imported_count} kohdetta tuotiin.")
+        elif failed_count == 0:
+            iface.messageBar().pushSuccess("", "Kaavakohteet tuotiin onnistuneesti.")
+            self.progress_bar.setValue(100)
         else:
-            layer.updateFeature(feature)
+            iface.messageBar().pushInfo("", f"Osa kaavakohteista tuotiin epäonnistuneesti ({failed_count}).")
 
-        layer.endEditCommand()
-        return layer.commitChanges(stopEditing=False)
+    def reject(self):
+        # Cancel a running import first instead of closing the dialog
+        if self.importer is not None:
+            self.importer.cancel()
+            return
+        super().reject()
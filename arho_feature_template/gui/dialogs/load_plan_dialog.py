@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+from functools import partial
 from importlib import resources
-from typing import Sequence
+from typing import Any
 
-from qgis.core import QgsProviderRegistry
+from qgis.core import QgsApplication
 from qgis.PyQt import uic
-from qgis.PyQt.QtCore import QRegularExpression, QSortFilterProxyModel, Qt
-from qgis.PyQt.QtGui import QStandardItem, QStandardItemModel
+from qgis.PyQt.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, pyqtSignal
 from qgis.PyQt.QtWidgets import (
     QComboBox,
     QDialog,
@@ -18,7 +19,7 @@ from qgis.PyQt.QtWidgets import (
     QTableView,
 )
 
-from arho_feature_template.exceptions import UnexpectedNoneError
+from arho_feature_template.utils.db_utils import SqlQueryTask, quote_literal
 from arho_feature_template.utils.misc_utils import get_active_plan_id
 
 ui_path = resources.files(__package__) / "load_plan_dialog.ui"
@@ -26,28 +27,219 @@ ui_path = resources.files(__package__) / "load_plan_dialog.ui"
 LoadPlanDialogBase, _ = uic.loadUiType(ui_path)
 
 
-class PlanFilterProxyModel(QSortFilterProxyModel):
-    def __init__(self, model: QStandardItemModel):
-        super().__init__()
-        self.setSourceModel(model)
-        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+# Number of plans fetched from the database at a time
+PLAN_LIST_PAGE_SIZE = 200
+
+PLAN_LIST_SQL = """
+    SELECT
+        p.id,
+        p.producers_plan_identifier,
+        p.name ->> 'fin' AS name_fin,
+        l.name ->> 'fin' AS lifecycle_status_fin,
+        pt.name ->> 'fin' AS plan_type_fin
+    FROM
+        hame.plan p
+    LEFT JOIN
+        codes.lifecycle_status l
+    ON
+        p.lifecycle_status_id = l.id
+    LEFT JOIN
+        codes.plan_type pt
+    ON
+        p.plan_type_id = pt.id
+    {where}
+    ORDER BY {first_plan}{order_by} {direction} NULLS LAST, p.id
+    LIMIT {limit} OFFSET {offset}
+"""
+
+# SQL expressions of the plan list columns, in the order the columns are shown
+PLAN_LIST_COLUMNS = [
+    ("Nimi", "p.name ->> 'fin'"),
+    ("Kaavalaji", "pt.name ->> 'fin'"),
+    ("Kaavan elinkaaren tila", "l.name ->> 'fin'"),
+    ("Tuottajan kaavatunnus", "p.producers_plan_identifier"),
+]
+
+# Indexes of the plan list columns in the query results
+ID_INDEX = 0
+PLAN_LIST_RESULT_INDEXES = [2, 4, 3, 1]
+
+
+def _search_condition(search_text: str) -> str:
+    """Returns a condition matching plans with the search text in any of the plan list columns."""
+    escaped = search_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = quote_literal(f"%{escaped}%")
+    return " OR ".join(f"{expression} ILIKE {pattern}" for _, expression in PLAN_LIST_COLUMNS)
+
+
+class PlanListQueryTask(SqlQueryTask):
+    """
+    Fetches one page of the plan list from the database in a background task.
+
+    If `first_plan_id` is given, that plan is sorted before the others, so it is on the first page.
+    """
+
+    def __init__(
+        self,
+        connection_name: str,
+        search_text: str,
+        sort_column: int,
+        sort_order: Qt.SortOrder,
+        offset: int,
+        first_plan_id: str | None = None,
+    ):
+        sql = PLAN_LIST_SQL.format(
+            where=f"WHERE {_search_condition(search_text)}" if search_text else "",
+            first_plan=f"p.id = {quote_literal(first_plan_id)} DESC, " if first_plan_id else "",
+            order_by=PLAN_LIST_COLUMNS[sort_column][1],
+            direction="DESC" if sort_order == Qt.DescendingOrder else "ASC",
+            # Fetch one extra row to know whether there are more pages
+            limit=PLAN_LIST_PAGE_SIZE + 1,
+            offset=offset,
+        )
+        super().__init__("ARHO: kaavojen haku", connection_name, sql)
+
+
+@dataclass
+class _PlanList:
+    rows: list[list[Any]] = field(default_factory=list)
+    has_more: bool = True
+
 
-    def filterAcceptsRow(self, source_row, source_parent):  # noqa: N802
-        model = self.sourceModel()
-        if not model:
-            return False
+class PlanTableModel(QAbstractTableModel):
+    """
+    Table model of the plans in a database.
 
-        filter_text = self.filterRegularExpression().pattern()
-        if not filter_text:
-            return True
+    Plans are fetched in pages with `PlanListQueryTask` as the view scrolls. Searching and sorting are done in
+    the database. Fetched plans are cached by the connection, search text and sorting while the model exists.
+    The plan with `first_plan_id` (like the active plan) is listed first, so it can be selected without paging.
+    """
 
-        for column in range(5):
-            index = model.index(source_row, column, source_parent)
-            data = model.data(index)
-            if data and filter_text.lower() in data.lower():
-                return True
+    loading_failed = pyqtSignal(str)
+    rows_loaded = pyqtSignal()
+
+    def __init__(self, first_plan_id: str | None = None):
+        super().__init__()
+        self.first_plan_id = first_plan_id
+        self.connection_name: str | None = None
+        self.search_text = ""
+        self.sort_column = 0
+        self.sort_order = Qt.AscendingOrder
+
+        self._cache: dict[tuple[str, str, int, Qt.SortOrder], _PlanList] = {}
+        self._plans = _PlanList(has_more=False)
+        self._task: PlanListQueryTask | None = None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802, B008
+        return 0 if parent.isValid() else len(self._plans.rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802, B008
+        return 0 if parent.isValid() else len(PLAN_LIST_COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):  # noqa: N802
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return PLAN_LIST_COLUMNS[section][0]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._plans.rows[index.row()]
+        if role == Qt.DisplayRole:
+            value = row[PLAN_LIST_RESULT_INDEXES[index.column()]]
+            return value if isinstance(value, str) else ""
+        if role == Qt.UserRole:
+            return row[ID_INDEX]
+        return None
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:  # noqa: N802
+        return not parent.isValid() and self._plans.has_more and self._task is None and bool(self.connection_name)
+
+    def fetchMore(self, parent: QModelIndex):  # noqa: N802
+        if self.canFetchMore(parent):
+            self._start_query()
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder):
+        if column < 0 or (column, order) == (self.sort_column, self.sort_order):
+            return
+        self.sort_column = column
+        self.sort_order = order
+        self._reload()
+
+    def set_connection(self, connection_name: str, refresh: bool = False):  # noqa: FBT001, FBT002
+        """Shows the plans of the connection. Cached plans of the connection are dropped if `refresh` is True."""
+        if refresh:
+            self._cache = {key: plans for key, plans in self._cache.items() if key[0] != connection_name}
+        self.connection_name = connection_name
+        self._reload()
+
+    def set_search_text(self, search_text: str):
+        search_text = search_text.strip()
+        if search_text == self.search_text:
+            return
+        self.search_text = search_text
+        self._reload()
+
+    def row_of_plan(self, plan_id: str) -> int | None:
+        return next((i for i, row in enumerate(self._plans.rows) if row[ID_INDEX] == plan_id), None)
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _reload(self):
+        self.cancel()
+        self.beginResetModel()
+        if self.connection_name:
+            key = (self.connection_name, self.search_text, self.sort_column, self.sort_order)
+            self._plans = self._cache.setdefault(key, _PlanList())
+        else:
+            self._plans = _PlanList(has_more=False)
+        self.endResetModel()
+        if self._plans.rows:
+            self.rows_loaded.emit()
+        self.fetchMore(QModelIndex())
+
+    def _start_query(self):
+        if not self.connection_name:
+            return
+        try:
+            task = PlanListQueryTask(
+                self.connection_name,
+                self.search_text,
+                self.sort_column,
+                self.sort_order,
+                len(self._plans.rows),
+                self.first_plan_id,
+            )
+        except Exception as e:  # noqa: BLE001
+            self._plans.has_more = False
+            self.loading_failed.emit(str(e))
+            return
+        task.taskCompleted.connect(partial(self._on_query_done, task, self._plans))
+        task.taskTerminated.connect(partial(self._on_query_done, task, self._plans))
+        self._task = task
+        QgsApplication.taskManager().addTask(task)
+
+    def _on_query_done(self, task: PlanListQueryTask, plans: _PlanList):
+        if task is not self._task:
+            return
+        self._task = None
+        if task.exception is not None:
+            plans.has_more = False
+            self.loading_failed.emit(str(task.exception))
+            return
+        if task.isCanceled():
+            return
 
-        return False
+        rows = task.rows[:PLAN_LIST_PAGE_SIZE]
+        plans.has_more = len(task.rows) > PLAN_LIST_PAGE_SIZE
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(plans.rows), len(plans.rows) + len(rows) - 1)
+            plans.rows.extend(rows)
+            self.endInsertRows()
+        self.rows_loaded.emit()
 
 
 class LoadPlanDialog(QDialog, LoadPlanDialogBase):  # type: ignore
@@ -57,7 +249,7 @@ class LoadPlanDialog(QDialog, LoadPlanDialogBase):  # type: ignore
     search_line_edit: QLineEdit
     button_box: QDialogButtonBox
 
-    # ID_COLUMN = 4
+    SEARCH_DELAY_MS = 300
 
     def __init__(self, parent, connection_names: list[str]):
         super().__init__(parent)
@@ -65,125 +257,71 @@ class LoadPlanDialog(QDialog, LoadPlanDialogBase):  # type: ignore
 
         self._selected_plan_id = None
         self._selected_plan_name = None
+        # Active plan is selected when it gets loaded, unless the user has selected a plan already
+        self._active_plan_id = get_active_plan_id()
 
         self.button_box.rejected.connect(self.reject)
         self.button_box.accepted.connect(self.accept)
         self.button_box.button(QDialogButtonBox.Ok).setEnabled(False)
 
         self.load_btn.clicked.connect(self.load_plans)
-        self.search_line_edit.textChanged.connect(self.filter_plans)
+
+        # Search only after the user has stopped typing
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.filter_plans)
+        self.search_line_edit.textChanged.connect(self.search_timer.start)
 
         self.connections_selection.addItems(connection_names)
 
         self.plan_table_view: QTableView
         self.plan_table_view.setSelectionMode(QTableView.SingleSelection)
         self.plan_table_view.setSelectionBehavior(QTableView.SelectRows)
-        self.plan_table_view.setSortingEnabled(True)
 
-        self.model = QStandardItemModel()
-        self.model.setColumnCount(4)
-        self.model.setHorizontalHeaderLabels(
-            [
-                "Nimi",
-                "Kaavalaji",
-                "Kaavan elinkaaren tila",
-                "Tuottajan kaavatunnus",
-                # "ID",
-            ]
-        )
+        self.model = PlanTableModel(first_plan_id=self._active_plan_id)
+        self.model.loading_failed.connect(self.on_loading_failed)
+        self.model.rows_loaded.connect(self.select_active_plan)
+        self.model.modelReset.connect(self.on_selection_changed)
 
-        self.filterProxyModel = PlanFilterProxyModel(self.model)
-
-        self.plan_table_view.setModel(self.filterProxyModel)
+        self.plan_table_view.setModel(self.model)
         self.plan_table_view.selectionModel().selectionChanged.connect(self.on_selection_changed)
-        # self.plan_table_view.setSortingEnabled(True)
+        self.plan_table_view.setSortingEnabled(True)
+        self.plan_table_view.sortByColumn(self.model.sort_column, self.model.sort_order)
 
         header = self.plan_table_view.horizontalHeader()
         for i in range(3):
             header.setSectionResizeMode(i, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.Stretch)
 
+        self.finished.connect(lambda _result: self.model.cancel())
+
         # Show plans for the first connections by default
         # NOTE: Could be changed to the previously used connection if/when plugin can remember it
         if len(connection_names) > 0:
             self.load_plans()
 
-    def clear_table(self):
-        self.model.removeRows(0, self.model.rowCount())
-
     def load_plans(self):
-        self.clear_table()
-
         selected_connection = self.connections_selection.currentText()
         if not selected_connection:
             return
 
-        active_plan_id = get_active_plan_id()
-        row_to_select = None
-        plans = self.get_plans_from_db(selected_connection)
-        for i, plan in enumerate(plans):
-            id_, producers_plan_identifier, name, lifecycle_status, plan_type = plan
-            self.model.appendRow(
-                [
-                    QStandardItem(name or ""),
-                    QStandardItem(plan_type or ""),
-                    QStandardItem(lifecycle_status or ""),
-                    QStandardItem(producers_plan_identifier or ""),
-                    # QStandardItem(id_ or ""),
-                ]
-            )
-            self.model.item(i, 0).setData(id_, Qt.UserRole)
-            if active_plan_id == id_:
-                row_to_select = i
-
-        if row_to_select is not None:
-            self.plan_table_view.selectRow(row_to_select)
+        # Loading the shown connection again fetches its plans from the database instead of the cache
+        self.model.set_connection(selected_connection, refresh=selected_connection == self.model.connection_name)
 
-    def get_plans_from_db(self, selected_connection: str) -> Sequence[str]:
-        """
-        Loads plans from the selected DB connection.
-
-        Returns plan information in the format [ID, producers_plan_identifier, name, lifecycle_status, plan_type].
-        """
-        provider_registry = QgsProviderRegistry.instance()
-        if provider_registry is None:
-            raise UnexpectedNoneError
-        postgres_provider_metadata = provider_registry.providerMetadata("postgres")
-        if postgres_provider_metadata is None:
-            raise UnexpectedNoneError
+    def filter_plans(self):
+        self.search_timer.stop()
+        self.model.set_search_text(self.search_line_edit.text())
 
-        try:
-            connection = postgres_provider_metadata.createConnection(selected_connection)
-            plans = connection.executeSql("""
-                SELECT
-                    p.id,
-                    p.producers_plan_identifier,
-                    p.name ->> 'fin' AS name_fin,
-                    l.name ->> 'fin' AS lifecycle_status_fin,
-                    pt.name ->> 'fin' AS plan_type_fin
-                FROM
-                    hame.plan p
-                LEFT JOIN
-                    codes.lifecycle_status l
-                ON
-                    p.lifecycle_status_id = l.id
-                LEFT JOIN
-                    codes.plan_type pt
-                ON
-                    p.plan_type_id = pt.id;
-            """)
-        except Exception as e:  # noqa: BLE001
-            QMessageBox.critical(self, "Error", f"Failed to load plans: {e}")
-            self.clear_table()
-        return plans
+    def select_active_plan(self):
+        if not self._active_plan_id or self.plan_table_view.selectionModel().hasSelection():
+            return
+        row = self.model.row_of_plan(self._active_plan_id)
+        if row is not None:
+            self.plan_table_view.selectRow(row)
 
-    def filter_plans(self):
-        search_text = self.search_line_edit.text()
-        if search_text:
-            search_regex = QRegularExpression(search_text)
-            self.filterProxyModel.setFilterRegularExpression(search_regex)
-        else:
-            self.filterProxyModel.setFilterRegularExpression("")
+    def on_loading_failed(self, message: str):
+        QMessageBox.critical(self, "Error", f"Failed to load plans: {message}")
 
     def on_selection_changed(self):
         """
@@ -197,6 +335,7 @@ class LoadPlanDialog(QDialog, LoadPlanDialogBase):  # type: ignore
             self._selected_plan_id = self.plan_table_view.model().index(selected_row, 0).data(Qt.UserRole)
             self._selected_plan_name = self.plan_table_view.model().index(selected_row, 0)
             self.button_box.button(QDialogButtonBox.Ok).setEnabled(True)
+            self._active_plan_id = None
         else:
             self._selected_plan_id = None
             self._selected_plan_name = None
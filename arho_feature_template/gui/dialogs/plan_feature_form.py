@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import weakref
 from importlib import resources
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable, ClassVar
 
 from qgis.PyQt import uic
-from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtCore import QModelIndex, Qt
+from qgis.PyQt.QtGui import QStandardItem, QStandardItemModel
 from qgis.PyQt.QtWidgets import (
     QComboBox,
     QDialog,
@@ -18,7 +20,6 @@ from qgis.PyQt.QtWidgets import (
     QSplitter,
     QTextEdit,
     QTreeWidget,
-    QTreeWidgetItem,
 )
 
 from arho_feature_template.core.models import PlanFeature, RegulationGroup
@@ -48,6 +49,11 @@ FormClass, _ = uic.loadUiType(ui_path)
 class PlanFeatureForm(QDialog, FormClass):  # type: ignore
     """Parent class for feature forms for adding and modifying feature attribute data."""
 
+    # Regulation group tree models by library ID: library reference, signature of the groups when built and the model
+    _library_models: ClassVar[
+        dict[int, tuple[Callable[[], RegulationGroupLibrary | None], tuple[Any, ...], QStandardItemModel]]
+    ] = {}
+
     def __init__(
         self,
         plan_feature: PlanFeature,
@@ -83,7 +89,6 @@ class PlanFeatureForm(QDialog, FormClass):  # type: ignore
         splitter.setSizes([300, 550])
         self.regulation_groups_groupbox.layout().addWidget(splitter)
 
-        self.template_categories: dict[str, QTreeWidgetItem] = {}
         self.existing_group_letter_codes = active_plan_regulation_groups_library.get_letter_codes()
         self.active_plan_regulation_groups_library = active_plan_regulation_groups_library
         self.regulation_group_libraries = [
@@ -101,7 +106,7 @@ class PlanFeatureForm(QDialog, FormClass):  # type: ignore
 
         self.regulation_groups_selection_widget = TreeWithSearchWidget()
         self.libraries_widget.layout().insertWidget(2, self.regulation_groups_selection_widget)
-        self.regulation_groups_selection_widget.tree.itemDoubleClicked.connect(self.add_selected_plan_regulation_group)
+        self.regulation_groups_selection_widget.tree.doubleClicked.connect(self.add_selected_plan_regulation_group)
         self.select_library_by_active_plan_type()
 
         self.show_regulation_group_library(self.plan_regulation_group_libraries_combobox.currentIndex())
@@ -216,10 +221,10 @@ class PlanFeatureForm(QDialog, FormClass):  # type: ignore
 
         return True
 
-    def add_selected_plan_regulation_group(self, item: QTreeWidgetItem, column: int):
-        if not item.parent():
+    def add_selected_plan_regulation_group(self, index: QModelIndex):
+        if not index.parent().isValid():
             return
-        regulation_group: RegulationGroup = item.data(column, Qt.UserRole)
+        regulation_group: RegulationGroup = index.data(Qt.UserRole)
         self.add_plan_regulation_group(regulation_group)
 
     def add_plan_regulation_group(self, definition: RegulationGroup):
@@ -246,30 +251,75 @@ class PlanFeatureForm(QDialog, FormClass):  # type: ignore
         regulation_group_widget.deleteLater()
 
     def show_regulation_group_library(self, i: int):
-        self.regulation_groups_selection_widget.tree.clear()
-        self.template_categories.clear()
-
         library = self.regulation_group_libraries[i]
+        self.regulation_groups_selection_widget.set_source_model(self.get_library_model(library))
+
+    @classmethod
+    def clear_library_models(cls):
+        cls._library_models.clear()
+
+    @classmethod
+    def invalidate_library_model(cls, library: RegulationGroupLibrary):
+        """Drops the model of the library, so it is rebuilt when next shown."""
+        cls._library_models.pop(id(library), None)
+
+    @classmethod
+    def get_library_model(cls, library: RegulationGroupLibrary) -> QStandardItemModel:
+        """
+        Returns the category and regulation group tree model of the library.
+
+        Models are built once per library and shared by the forms. A model is rebuilt if it has been invalidated
+        or if the groups of the library or their texts or categories have changed since it was built.
+        """
+        signature = tuple(
+            (id(group), str(group), group.category, group.type_code_id) for group in library.regulation_groups
+        )
+        cached = cls._library_models.get(id(library))
+        if cached is not None and cached[0]() is library and cached[1] == signature:
+            return cached[2]
+
+        # Drop models of libraries that no longer exist
+        for key in [key for key, (library_ref, _, _) in cls._library_models.items() if library_ref() is None]:
+            del cls._library_models[key]
+
+        model = cls._build_library_model(library)
+        cls._library_models[id(library)] = (weakref.ref(library), signature, model)
+        return model
+
+    @classmethod
+    def _build_library_model(cls, library: RegulationGroupLibrary) -> QStandardItemModel:
+        model = QStandardItemModel()
+        category_items: dict[str, QStandardItem] = {}
+        group_type_categories: dict[str, str] = {}
+
         for group in library.regulation_groups:
             category = group.category
 
             # Fallback strategies when category not saved in model
             if category is None:
                 if group.type_code_id is not None:
-                    group_type = PlanRegulationGroupTypeLayer.get_attribute_by_id("name", group.type_code_id)
-                    category = group_type[LANGUAGE] if group_type else "Muut"
+                    if group.type_code_id not in group_type_categories:
+                        group_type = PlanRegulationGroupTypeLayer.get_attribute_by_id("name", group.type_code_id)
+                        group_type_categories[group.type_code_id] = group_type[LANGUAGE] if group_type else "Muut"
+                    category = group_type_categories[group.type_code_id]
                 else:
                     category = "Muut"
 
-            if category not in self.template_categories:
+            if category not in category_items:
                 # Create category item
-                category_item = self.regulation_groups_selection_widget.add_item_to_tree(category)
-                self.template_categories[category] = category_item
+                category_item = QStandardItem(category)
+                category_item.setToolTip(category)
+                model.appendRow(category_item)
+                category_items[category] = category_item
 
             # Add group item to tree
-            _ = self.regulation_groups_selection_widget.add_item_to_tree(
-                str(group), group, self.template_categories[category]
-            )
+            text = str(group)
+            group_item = QStandardItem(text)
+            group_item.setToolTip(text)  # Set text as tooltip in case the tree width is not enough to show item text
+            group_item.setData(group, Qt.UserRole)
+            category_items[category].appendRow(group_item)
+
+        return model
 
     def into_model(self) -> PlanFeature:
         model = PlanFeature(
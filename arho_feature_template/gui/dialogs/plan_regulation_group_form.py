@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 from importlib import resources
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 
 from qgis.core import QgsApplication
 from qgis.PyQt import uic
-from qgis.PyQt.QtCore import Qt
-from qgis.PyQt.QtGui import QPixmap
+from qgis.PyQt.QtCore import QModelIndex, Qt
+from qgis.PyQt.QtGui import QPixmap, QStandardItem, QStandardItemModel
 from qgis.PyQt.QtWidgets import (
     QDialog,
     QDialogButtonBox,
@@ -17,7 +17,6 @@ from qgis.PyQt.QtWidgets import (
     QSizePolicy,
     QSplitter,
     QTextBrowser,
-    QTreeWidgetItem,
     QVBoxLayout,
 )
 
@@ -48,6 +47,9 @@ FormClass, _ = uic.loadUiType(ui_path)
 class PlanRegulationGroupForm(QDialog, FormClass):  # type: ignore
     """Form to create a new plan regulation group."""
 
+    # Tree model of the regulation types shared by all forms, and the code cache version it was built from
+    _regulation_type_model: ClassVar[tuple[int, QStandardItemModel] | None] = None
+
     def __init__(
         self,
         regulation_group: RegulationGroup,
@@ -100,8 +102,8 @@ class PlanRegulationGroupForm(QDialog, FormClass):  # type: ignore
         # Initialize regulation library
         self.regulations_selection_widget = TreeWithSearchWidget()
         self.libraries_widget.layout().insertWidget(1, self.regulations_selection_widget)
-        self.regulations_selection_widget.tree.itemDoubleClicked.connect(self.add_selected_regulation)
-        self.regulations_selection_widget.tree.itemClicked.connect(self.update_selected_regulation)
+        self.regulations_selection_widget.tree.doubleClicked.connect(self.add_selected_regulation)
+        self.regulations_selection_widget.tree.clicked.connect(self.update_selected_regulation)
 
         self.initialize_regulation_library()
 
@@ -156,22 +158,47 @@ class PlanRegulationGroupForm(QDialog, FormClass):  # type: ignore
 
     def initialize_regulation_library(self):
         """Initializes the tree menu for regulations."""
-        # Map ID to widget to be able to assign parent widgets
-        regulation_type_widgets: dict[str, QWidget] = {}
-
-        # Construct tree widget one level at a time by traversing sorted dict
-        # NOTE: Assumes PlanRegulationTypeLayer cache exists
-        # NOTE: This could be encapsulated as it's own widget, i.e. 'RegulationTreeWidget', which this
-        # form will create at start
-        for id_, attributes in sorted(
-            PlanRegulationTypeLayer.get_attribute_dict().items(), key=lambda item: item[1]["level"]
-        ):
-            tree_widget_item = self.regulations_selection_widget.add_item_to_tree(
-                text=attributes["name"],
-                data=(id_, attributes),
-                parent=regulation_type_widgets.get(attributes["parent_id"]),
-            )
-            regulation_type_widgets[id_] = tree_widget_item
+        self.regulations_selection_widget.set_source_model(self.get_regulation_type_model())
+
+    @classmethod
+    def clear_regulation_type_model(cls):
+        cls._regulation_type_model = None
+
+    @classmethod
+    def get_regulation_type_model(cls) -> QStandardItemModel:
+        """
+        Returns the tree model of the regulation types.
+
+        The model is built once and shared by the forms, and rebuilt only if the regulation type cache changes.
+        """
+        # NOTE: Builds PlanRegulationTypeLayer cache if it does not exist yet
+        attribute_dict = PlanRegulationTypeLayer.get_attribute_dict()
+        version = PlanRegulationTypeLayer.cache_version()
+        if cls._regulation_type_model is not None and cls._regulation_type_model[0] == version:
+            return cls._regulation_type_model[1]
+
+        model = QStandardItemModel()
+        # Map ID to item to be able to assign parent items
+        regulation_type_items: dict[str, QStandardItem] = {}
+
+        # Construct tree one level at a time by traversing sorted dict
+        for id_, attributes in sorted(attribute_dict.items(), key=lambda item: item[1]["level"]):
+            name = attributes["name"]
+            if isinstance(name, dict):
+                name = deserialize_localized_text(name)
+            item = QStandardItem(name or "")
+            item.setToolTip(name or "")  # Set text as tooltip in case the tree width is not enough to show item text
+            item.setData((id_, attributes), Qt.UserRole)
+
+            parent = regulation_type_items.get(attributes["parent_id"])
+            if parent is not None:
+                parent.appendRow(item)
+            else:
+                model.appendRow(item)
+            regulation_type_items[id_] = item
+
+        cls._regulation_type_model = (version, model)
+        return model
 
     def _check_letter_code(self) -> bool:
         letter_code = self.letter_code.text()
@@ -190,15 +217,15 @@ class PlanRegulationGroupForm(QDialog, FormClass):  # type: ignore
             return False
         return True
 
-    def update_selected_regulation(self, item: QTreeWidgetItem, column: int):
-        _, regulation_type_attributes = item.data(column, Qt.UserRole)
+    def update_selected_regulation(self, index: QModelIndex):
+        _, regulation_type_attributes = index.data(Qt.UserRole)
         text = regulation_type_attributes["description"]
         if isinstance(text, dict):
             text = deserialize_localized_text(text)
         self.regulation_info.setText(text)
 
-    def add_selected_regulation(self, item: QTreeWidgetItem, column: int):
-        regulation_type_id, regulation_type_attributes = item.data(column, Qt.UserRole)
+    def add_selected_regulation(self, index: QModelIndex):
+        regulation_type_id, regulation_type_attributes = index.data(Qt.UserRole)
         if regulation_type_attributes["category_only"]:
             return
         self.add_regulation(Regulation(regulation_type_id))
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from importlib import resources
-from typing import TYPE_CHECKING, Generator
+from typing import TYPE_CHECKING, Generator, Iterable, cast
 
 from qgis.core import QgsApplication
 from qgis.gui import QgsDockWidget
 from qgis.PyQt import uic
-from qgis.PyQt.QtCore import Qt, pyqtSignal
-from qgis.PyQt.QtWidgets import QListWidget, QListWidgetItem, QMenu, QMessageBox, QPushButton
+from qgis.PyQt.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt, QTimer, pyqtSignal
+from qgis.PyQt.QtWidgets import QListView, QMenu, QMessageBox, QPushButton
 
 from arho_feature_template.core.models import RegulationGroup, RegulationGroupLibrary
 from arho_feature_template.project.layers.plan_layers import plan_feature_layers
@@ -22,6 +23,72 @@ ui_path = resources.files(__package__) / "regulation_groups_dock.ui"
 DockClass, _ = uic.loadUiType(ui_path)
 
 
+@dataclass
+class _RegulationGroupRow:
+    group: RegulationGroup
+    text: str
+
+
+class RegulationGroupListModel(QAbstractListModel):
+    """
+    List model of regulation groups.
+
+    Each row keeps the group and its display text, so the text is not rebuilt when the view is painted or
+    filtered. Single groups can be updated, added and removed without resetting the model, which keeps the
+    scroll position and selection of the view.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[_RegulationGroupRow] = []
+        self._row_indices: dict[str, int] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # noqa: N802, B008
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return row.text
+        if role == Qt.UserRole:
+            return row.group
+        return None
+
+    def set_regulation_groups(self, groups: Iterable[RegulationGroup]):
+        self.beginResetModel()
+        self._rows = [_RegulationGroupRow(group, str(group)) for group in groups]
+        self._update_row_indices()
+        self.endResetModel()
+
+    def update_regulation_group(self, group: RegulationGroup):
+        """Updates the row of the group, or appends a row if the group is not in the model yet."""
+        row = self._row_indices.get(cast(str, group.id_))
+        if row is None:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows))
+            self._rows.append(_RegulationGroupRow(group, str(group)))
+            self._row_indices[cast(str, group.id_)] = len(self._rows) - 1
+            self.endInsertRows()
+            return
+
+        self._rows[row] = _RegulationGroupRow(group, str(group))
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.ToolTipRole, Qt.UserRole])
+
+    def remove_regulation_group(self, group_id: str):
+        row = self._row_indices.get(group_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self._update_row_indices()
+        self.endRemoveRows()
+
+    def _update_row_indices(self):
+        self._row_indices = {row.group.id_: i for i, row in enumerate(self._rows) if row.group.id_ is not None}
+
+
 class RegulationGroupsDock(QgsDockWidget, DockClass):  # type: ignore
     request_new_regulation_group = pyqtSignal()
     request_edit_regulation_group = pyqtSignal(RegulationGroup)
@@ -34,6 +101,8 @@ class RegulationGroupsDock(QgsDockWidget, DockClass):  # type: ignore
         object, object
     )  # Types: list[RegulationGroup],  list[tuple[str, Generator[str]]
 
+    SEARCH_DELAY_MS = 200
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setupUi(self)
@@ -41,7 +110,7 @@ class RegulationGroupsDock(QgsDockWidget, DockClass):  # type: ignore
         # TYPES
         self.search_box: QgsFilterLineEdit
         self.dockWidgetContents: QWidget
-        self.regulation_group_list: QListWidget
+        self.regulation_group_list: QListView
 
         self.new_btn: QPushButton
         self.delete_btn: QPushButton
@@ -53,8 +122,20 @@ class RegulationGroupsDock(QgsDockWidget, DockClass):  # type: ignore
         self.delete_btn.setIcon(QgsApplication.getThemeIcon("mActionDeleteSelected.svg"))
         self.edit_btn.setIcon(QgsApplication.getThemeIcon("mActionEditTable.svg"))
 
+        self.regulation_group_model = RegulationGroupListModel(self)
+        self.proxy_model = QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.regulation_group_model)
+        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.regulation_group_list.setModel(self.proxy_model)
         self.regulation_group_list.setSelectionMode(self.regulation_group_list.ExtendedSelection)
-        self.search_box.valueChanged.connect(self.filter_regulation_groups)
+        self.regulation_group_list.setUniformItemSizes(True)
+
+        # Filter only after the user has stopped typing
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.filter_regulation_groups)
+        self.search_box.valueChanged.connect(self.search_timer.start)
 
         menu = QMenu()
         self.add_selected_action = menu.addAction("Lisää valitut ryhmät valituille kohteille")
@@ -83,24 +164,21 @@ class RegulationGroupsDock(QgsDockWidget, DockClass):  # type: ignore
         self.add_selected_action.triggered.connect(self.on_add_selected_btn_clicked)
 
     def update_regulation_groups(self, regulation_group_library: RegulationGroupLibrary):
-        self.regulation_group_list.clear()
+        self.regulation_group_model.set_regulation_groups(regulation_group_library.regulation_groups)
 
-        for group in regulation_group_library.regulation_groups:
-            self.add_regulation_group_to_list(group)
+    def update_regulation_group(self, group: RegulationGroup):
+        """Updates the list row of the group in place, or adds the group to the list if it is not listed yet."""
+        self.regulation_group_model.update_regulation_group(group)
 
-    def add_regulation_group_to_list(self, group: RegulationGroup):
-        text = str(group)
-        item = QListWidgetItem(text)
-        item.setToolTip(text)
-        item.setData(Qt.UserRole, group)
-        self.regulation_group_list.addItem(item)
+    def remove_regulation_group(self, group_id: str):
+        self.regulation_group_model.remove_regulation_group(group_id)
 
     def get_selected_feat_ids(self) -> list[tuple[str, Generator[str]]]:
         """Returns selected plan feature IDs for each plan feature layer (name)."""
         return [(layer_class.name, layer_class.get_selected_feature_ids()) for layer_class in plan_feature_layers]
 
     def get_selected_regulation_groups(self) -> list[RegulationGroup]:
-        return [item.data(Qt.UserRole) for item in self.regulation_group_list.selectedItems()]
+        return [index.data(Qt.UserRole) for index in self.regulation_group_list.selectionModel().selectedRows()]
 
     def on_edit_btn_clicked(self):
         selected = self.get_selected_regulation_groups()
@@ -137,13 +215,11 @@ class RegulationGroupsDock(QgsDockWidget, DockClass):  # type: ignore
             self.request_add_groups_to_features.emit(selected_groups, self.get_selected_feat_ids())
 
     def filter_regulation_groups(self) -> None:
-        search_text = self.search_box.value().lower()
-        for index in range(self.regulation_group_list.count()):
-            item = self.regulation_group_list.item(index)
-            item.setHidden(search_text not in item.text().lower())
+        self.proxy_model.setFilterFixedString(self.search_box.value())
 
     def unload(self):
         self._disconnect_signals()
+        self.search_timer.stop()
 
         disconnect_signal(self.request_new_regulation_group)
         disconnect_signal(self.request_edit_regulation_group)
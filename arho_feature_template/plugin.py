@@ -10,13 +10,17 @@ from qgis.PyQt.QtWidgets import QAction, QMenu, QToolButton, QWidget
 
 from arho_feature_template.core.geotiff_creator import GeoTiffCreator
 from arho_feature_template.core.plan_manager import PlanManager
+from arho_feature_template.gui.components.code_combobox import CodeItemModel
+from arho_feature_template.gui.dialogs.plan_feature_form import PlanFeatureForm
+from arho_feature_template.gui.dialogs.plan_regulation_group_form import PlanRegulationGroupForm
 from arho_feature_template.gui.dialogs.plugin_settings import PluginSettings
 from arho_feature_template.gui.dialogs.post_plan import PostPlanDialog
 from arho_feature_template.gui.docks.validation_dock import ValidationDock
 from arho_feature_template.qgis_plugin_tools.tools.custom_logging import setup_logger, teardown_logger
 from arho_feature_template.qgis_plugin_tools.tools.i18n import setup_translation
 from arho_feature_template.qgis_plugin_tools.tools.resources import plugin_name, resources_path
-from arho_feature_template.utils.misc_utils import disconnect_signal, iface
+from arho_feature_template.utils.db_utils import database_connections
+from arho_feature_template.utils.misc_utils import disconnect_signal, get_active_plan_id, iface
 
 if TYPE_CHECKING:
     from qgis.gui import QgsDockWidget
@@ -362,9 +366,16 @@ class Plugin:
             self.get_permanent_identifier_action,
             self.post_plan_matter_action,
         ]
+        # Actions that need the regulation group and plan feature libraries, which are initialized in the background
+        self.library_depending_actions = [
+            self.new_feature_dock_action,
+            self.identify_plan_features_action,
+            self.manage_libraries_action,
+        ]
 
-        # Initially actions are disabled because no plan is selected
+        # Initially actions are disabled because no plan is selected and libraries are not initialized
         self.on_active_plan_unset()
+        self.update_library_depending_actions()
         # Check if project opened and if not disable actions
         if not self.plan_manager.check_required_layers():
             self.on_project_cleared()
@@ -377,6 +388,7 @@ class Plugin:
         self.plan_manager.plan_unset.connect(self.on_active_plan_unset)
         self.plan_manager.project_loaded.connect(self.on_project_loaded)
         self.plan_manager.project_cleared.connect(self.on_project_cleared)
+        self.plan_manager.libraries_loaded.connect(self.update_library_depending_actions)
         self.plan_manager.plan_identifier_set.connect(self.update_ryhti_buttons)
         self.plan_manager.plan_identifier_set.connect(self.validation_dock.on_permanent_identifier_set)
 
@@ -444,20 +456,30 @@ class Plugin:
     def on_active_plan_set(self):
         for action in self.plan_depending_actions:
             action.setEnabled(True)
+        self.update_library_depending_actions()
 
     def on_active_plan_unset(self):
         for action in self.plan_depending_actions:
             action.setEnabled(False)
 
+    def update_library_depending_actions(self):
+        """Keeps library depending actions disabled until the libraries have been initialized for the project."""
+        plan_set = bool(get_active_plan_id())
+        for action in self.library_depending_actions:
+            needs_plan = action in self.plan_depending_actions
+            action.setEnabled(self.plan_manager.libraries_ready and (plan_set or not needs_plan))
+
     def on_project_loaded(self):
         for action in self.project_depending_actions:
             action.setEnabled(True)
+        self.update_library_depending_actions()
 
     def on_project_cleared(self):
         for action in self.project_depending_actions:
             action.setEnabled(False)
         for action in self.plan_depending_actions:
             action.setEnabled(False)
+        self.update_library_depending_actions()
 
     def unload(self) -> None:
         """Removes the plugin menu item and icon from QGIS GUI."""
@@ -479,6 +501,10 @@ class Plugin:
 
         # Handle plan manager
         self.plan_manager.unload()
+        database_connections.clear()
+        CodeItemModel.clear()
+        PlanRegulationGroupForm.clear_regulation_type_model()
+        PlanFeatureForm.clear_library_models()
 
         # Handle validation dock
         iface.removeDockWidget(self.validation_dock)
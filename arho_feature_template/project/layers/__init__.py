@@ -1,30 +1,80 @@
 from __future__ import annotations
 
 from abc import ABC
-from typing import TYPE_CHECKING, Any, ClassVar, Generator, cast
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, ClassVar, Generator, Iterable, cast
 
-from qgis.core import QgsFeatureRequest, QgsProject, QgsVectorLayer
+from qgis.core import QgsExpression, QgsFeatureRequest, QgsVectorLayer
+from qgis.PyQt.QtCore import QVariant
 
-from arho_feature_template.utils.project_utils import get_vector_layer_from_project
+from arho_feature_template.utils.project_utils import get_vector_layer_from_project, layer_registry
 
 if TYPE_CHECKING:
     from qgis.core import QgsFeature
 
+# Number of parsed filter expressions kept per layer attribute
+MAX_CACHED_EXPRESSIONS = 256
+
+
+class _AttributeFilter:
+    """
+    Builds filter expressions comparing one attribute of a layer to given values.
+
+    Values are quoted according to the type of the field, so they can contain any characters and are compared
+    without casts on the provider side. Parsed expressions are cached by the values, since the same lookups
+    (like fetching a feature by ID) are typically repeated.
+    """
+
+    _filters: ClassVar[dict[tuple[str, str], _AttributeFilter]] = {}
+
+    def __init__(self, layer: QgsVectorLayer, attribute: str):
+        self.column = QgsExpression.quotedColumnRef(attribute)
+        field_index = layer.fields().indexOf(attribute)
+        self.field_type = layer.fields().at(field_index).type() if field_index != -1 else QVariant.String
+        self._expressions: OrderedDict[tuple[Any, ...], QgsExpression] = OrderedDict()
+
+    @classmethod
+    def get(cls, layer: QgsVectorLayer, attribute: str) -> _AttributeFilter:
+        key = (layer.id(), attribute)
+        attribute_filter = cls._filters.get(key)
+        if attribute_filter is None:
+            attribute_filter = cls._filters[key] = _AttributeFilter(layer, attribute)
+        return attribute_filter
+
+    @classmethod
+    def clear(cls):
+        cls._filters.clear()
+
+    def expression(self, values: tuple[Any, ...]) -> QgsExpression:
+        expression = self._expressions.get(values)
+        if expression is not None:
+            self._expressions.move_to_end(values)
+            return expression
+
+        if len(values) == 1:
+            text = f"{self.column} = {QgsExpression.quotedValue(values[0], self.field_type)}"
+        else:
+            quoted_values = ", ".join(QgsExpression.quotedValue(value, self.field_type) for value in values)
+            text = f"{self.column} IN ({quoted_values})"
+
+        expression = QgsExpression(text)
+        self._expressions[values] = expression
+        if len(self._expressions) > MAX_CACHED_EXPRESSIONS:
+            self._expressions.popitem(last=False)
+        return expression
+
+
+def clear_attribute_filters():
+    """Drops the filter expressions of all layers, for example when the layers are removed with the project."""
+    _AttributeFilter.clear()
+
 
 class AbstractLayer(ABC):
     name: ClassVar[str]
 
     @classmethod
     def exists(cls) -> bool:
-        project = QgsProject.instance()
-        if not project:
-            return False
-
-        layers = project.mapLayersByName(cls.name)
-        if not layers:
-            return False
-
-        return bool([layer for layer in layers if isinstance(layer, QgsVectorLayer)])
+        return layer_registry.exists(cls.name)
 
     @classmethod
     def get_from_project(cls) -> QgsVectorLayer:
@@ -51,18 +101,54 @@ class AbstractLayer(ABC):
         for feature in layer.getSelectedFeatures(request):
             yield feature["id"]
 
+    @classmethod
+    def build_request(
+        cls,
+        layer: QgsVectorLayer,
+        attribute: str,
+        values: Iterable[Any],
+        attributes: list[str] | None = None,
+        no_geometries: bool = True,  # noqa: FBT001, FBT002
+    ) -> QgsFeatureRequest:
+        """
+        Builds a request for the features whose `attribute` has any of the given values.
+
+        Only the given `attributes` are fetched if they are given. The filter is a plain comparison of a column
+        with literals, so providers like PostgreSQL can compile it into SQL.
+        """
+        attribute_filter = _AttributeFilter.get(layer, attribute)
+        request = QgsFeatureRequest(attribute_filter.expression(tuple(values)))
+        if attributes is not None:
+            request.setSubsetOfAttributes(attributes, layer.fields())
+        if no_geometries:
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+        return request
+
     @classmethod
     def get_features_by_attribute_value(
         cls,
         attribute: str,
         value: str,
         no_geometries: bool = True,  # noqa: FBT001, FBT002
+        attributes: list[str] | None = None,
     ) -> Generator[QgsFeature]:
         layer = cls.get_from_project()
-        request = QgsFeatureRequest().setFilterExpression(f"\"{attribute}\"='{value}'")
-        if no_geometries:
-            request.setFlags(QgsFeatureRequest.NoGeometry)
-        yield from layer.getFeatures(request)
+        yield from layer.getFeatures(cls.build_request(layer, attribute, [value], attributes, no_geometries))
+
+    @classmethod
+    def get_features_by_attribute_values(
+        cls,
+        attribute: str,
+        values: Iterable[str],
+        no_geometries: bool = True,  # noqa: FBT001, FBT002
+        attributes: list[str] | None = None,
+    ) -> Generator[QgsFeature]:
+        """Fetches features with any of the given attribute values in a single request."""
+        values = list(dict.fromkeys(value for value in values if value is not None))
+        if not values:
+            return
+        layer = cls.get_from_project()
+        yield from layer.getFeatures(cls.build_request(layer, attribute, values, attributes, no_geometries))
 
     @classmethod
     def get_feature_by_attribute_value(
@@ -78,11 +164,9 @@ class AbstractLayer(ABC):
     def get_attribute_values_by_another_attribute_value(
         cls, target_attribute: str, filter_attribute: str, filter_value: str
     ) -> Generator[Any]:
-        layer = cls.get_from_project()
-        request = QgsFeatureRequest().setFilterExpression(f"\"{filter_attribute}\"='{filter_value}'")
-        request.setSubsetOfAttributes([target_attribute], layer.fields())
-        request.setFlags(QgsFeatureRequest.NoGeometry)
-        for feature in layer.getFeatures(request):
+        for feature in cls.get_features_by_attribute_value(
+            filter_attribute, filter_value, attributes=[target_attribute]
+        ):
             yield feature[target_attribute]
 
     @classmethod
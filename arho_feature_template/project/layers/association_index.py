@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Tuple
+
+from qgis.PyQt.QtCore import NULL
+
+if TYPE_CHECKING:
+    from qgis.core import QgsFeature
+
+# Other end of an association: name of the attribute referencing it and the referenced ID
+AssociationTarget = Tuple[str, Any]
+
+
+class AssociationIndex:
+    """
+    Bidirectional in-memory index of the rows of a many-to-many association table.
+
+    Each association row (identified by its QGIS feature ID) links the value of `source_attribute` to a target,
+    which is the first non-NULL value of `target_attributes` together with the name of that attribute. This way
+    association tables that reference several tables (like regulation group associations) fit the same index.
+
+    The same source and target can be linked by several rows, so each pair maps to the feature IDs of all of its
+    rows, and the pair is dropped only when its last row is removed.
+    """
+
+    def __init__(self, source_attribute: str, target_attributes: list[str]):
+        self.source_attribute = source_attribute
+        self.target_attributes = target_attributes
+        self._rows: dict[int, tuple[Any, AssociationTarget]] = {}
+        self._by_source: dict[Any, dict[AssociationTarget, set[int]]] = {}
+        self._by_target: dict[AssociationTarget, dict[Any, set[int]]] = {}
+
+    @property
+    def attributes(self) -> list[str]:
+        return [self.source_attribute, *self.target_attributes]
+
+    def clear(self):
+        self._rows.clear()
+        self._by_source.clear()
+        self._by_target.clear()
+
+    def add_feature(self, feature: QgsFeature):
+        source = feature[self.source_attribute]
+        target = next(
+            ((attribute, feature[attribute]) for attribute in self.target_attributes if feature[attribute] != NULL),
+            None,
+        )
+        if source == NULL or target is None:
+            return
+
+        self.remove_feature(feature.id())
+        self._rows[feature.id()] = (source, target)
+        self._by_source.setdefault(source, {}).setdefault(target, set()).add(feature.id())
+        self._by_target.setdefault(target, {}).setdefault(source, set()).add(feature.id())
+
+    def remove_feature(self, fid: int):
+        row = self._rows.pop(fid, None)
+        if row is None:
+            return
+        source, target = row
+        _discard_fid(self._by_source, source, target, fid)
+        _discard_fid(self._by_target, target, source, fid)
+
+    def exists(self, source: Any, target: AssociationTarget) -> bool:
+        return target in self._by_source.get(source, {})
+
+    def targets(self, source: Any) -> dict[AssociationTarget, set[int]]:
+        """Returns the targets associated with the source and the feature IDs of the associations."""
+        return self._by_source.get(source, {})
+
+    def sources(self, target: AssociationTarget) -> dict[Any, set[int]]:
+        """Returns the sources associated with the target and the feature IDs of the associations."""
+        return self._by_target.get(target, {})
+
+
+def _discard_fid(pairs: dict[Any, dict[Any, set[int]]], key: Any, other: Any, fid: int):
+    fids = pairs.get(key, {}).get(other)
+    if fids is None:
+        return
+    fids.discard(fid)
+    if not fids:
+        del pairs[key][other]
+        if not pairs[key]:
+            del pairs[key]
@@ -3,6 +3,7 @@ from __future__ import annotations
 import enum
 import logging
 import os
+from collections.abc import Hashable
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, ClassVar, cast
 
@@ -11,6 +12,7 @@ import yaml
 from arho_feature_template.exceptions import ConfigSyntaxError, LayerNameNotFoundError
 from arho_feature_template.project.layers import AbstractLayer
 from arho_feature_template.qgis_plugin_tools.tools.resources import resources_path
+from arho_feature_template.utils.code_cache import PersistentCodeCache
 
 if TYPE_CHECKING:
     from qgis.core import QgsFeature
@@ -29,14 +31,23 @@ class PlanType(str, enum.Enum):
 
 class AbstractCodeLayer(AbstractLayer):
     _cache: ClassVar[dict[str, dict[str, Any]]] = {}
+    # Reverse indexes of the cache: attribute name -> attribute value -> code feature ID
+    _indexes: ClassVar[dict[str, dict[Any, str]]] = {}
+    # (attribute name, attribute value) pairs known to match no feature in the layer
+    _missing_lookups: ClassVar[set[tuple[str, Any]]] = set()
     _attributes_to_leave_out_from_cache: ClassVar[list[str]] = ["created_at", "modified_at"]
     _field_names: ClassVar[list[str]] = []
+    # Incremented whenever the cache changes, so views built from the cache know to rebuild
+    _cache_version: ClassVar[int] = 0
     category_only_codes: ClassVar[list[str]] = []
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
         cls._cache = {}
+        cls._indexes = {}
+        cls._missing_lookups = set()
         cls._field_names = []
+        cls._cache_version = 0
 
     @classmethod
     def build_cache(cls):
@@ -46,29 +57,89 @@ class AbstractCodeLayer(AbstractLayer):
         Iterates features of the layer and stores found attributes to `_cache` class var dictionary (keys are
         code feature IDs, values are dictionaries where keys are attribute names and values are attribute values).
 
-        The built cache dictionary can be accessed with method `get_attribute_dict`.
+        The built cache dictionary can be accessed with method `get_attribute_dict`. The features are also
+        stored persistently and read from there on later builds if the code table has not changed since.
         """
-        cls._field_names = cls.get_from_project().fields().names()
-        for feat in cls.get_from_project().getFeatures():
-            cls._cache_feature(feat)
+        layer = cls.get_from_project()
+        cls._field_names = layer.fields().names()
+
+        persistent_cache = PersistentCodeCache(layer)
+        features = persistent_cache.load()
+        if features is None:
+            features = {feat["id"]: cls.attributes_from_feature(feat, cls._field_names) for feat in layer.getFeatures()}
+            persistent_cache.store(features)
+        cls.set_cache(features)
+
+    @classmethod
+    def set_cache(cls, features: dict[str, dict[str, Any]]):
+        """Fills the cache with the given features (keys are code feature IDs, values are attribute dictionaries)."""
+        for id_, attribute_dict in features.items():
+            cls._set_cached_attributes(id_, attribute_dict)
+        cls._cache_changed()
+
+    @classmethod
+    def attributes_from_feature(cls, feat: QgsFeature, field_names: list[str]) -> dict[str, Any]:
+        # NOTE: 'feat.attribute(attribute)' returns None if attribute is not found
+        return {
+            attribute: feat[attribute]
+            for attribute in field_names
+            if attribute not in cls._attributes_to_leave_out_from_cache
+        }
 
     @classmethod
     def _cache_feature(cls, feat: QgsFeature):
         if len(cls._field_names) == 0:
             cls._field_names = cls.get_from_project().fields().names()
 
-        attribute_dict = {}
-        for attribute in cls._field_names:
-            if attribute in cls._attributes_to_leave_out_from_cache:
-                continue
-            # NOTE: 'feat.attribute(attribute)' returns None if attribute is not found
-            attribute_value_to_cache = feat[attribute]
-            attribute_dict[attribute] = attribute_value_to_cache
+        cls._set_cached_attributes(feat["id"], cls.attributes_from_feature(feat, cls._field_names))
+        cls._cache_changed()
 
-        id_ = feat["id"]
-        if cls._cache.get(id_):
-            logger.info("Resaving feature (ID %s) to cache for layer %s", id_, cls.name)
+    @classmethod
+    def _cache_changed(cls):
+        cls._missing_lookups.clear()
+        cls._cache_version += 1
+
+    @classmethod
+    def _set_cached_attributes(cls, id_: str, attribute_dict: dict[str, Any]):
+        old_attribute_dict = cls._cache.get(id_)
         cls._cache[id_] = attribute_dict
+        if old_attribute_dict:
+            logger.info("Resaving feature (ID %s) to cache for layer %s", id_, cls.name)
+            cls._unindex_feature(id_, old_attribute_dict)
+        cls._index_feature(id_, attribute_dict)
+
+    @classmethod
+    def _index_feature(cls, id_: str, attribute_dict: dict[str, Any]):
+        for attribute, value in attribute_dict.items():
+            if isinstance(value, Hashable):
+                # Keep the first feature found for a value, like a linear scan of the cache would
+                cls._indexes.setdefault(attribute, {}).setdefault(value, id_)
+
+    @classmethod
+    def _unindex_feature(cls, id_: str, attribute_dict: dict[str, Any]):
+        """
+        Removes the index entries of the old attributes of the feature.
+
+        Entries of values that other cached features also have are pointed to the first of those features.
+        """
+        for attribute, value in attribute_dict.items():
+            index = cls._indexes.get(attribute, {})
+            if not isinstance(value, Hashable) or index.get(value) != id_:
+                continue
+            other_id = next(
+                (other_id for other_id, other in cls._cache.items() if other.get(attribute) == value),
+                None,
+            )
+            if other_id is None:
+                del index[value]
+            else:
+                index[value] = other_id
+
+    @classmethod
+    def _lookup_id(cls, attribute: str, attribute_value: Any) -> str | None:
+        if not isinstance(attribute_value, Hashable):
+            return None
+        return cls._indexes.get(attribute, {}).get(attribute_value)
 
     @classmethod
     def get_attribute_dict(cls) -> dict[str, dict[str, Any]]:
@@ -87,14 +158,25 @@ class AbstractCodeLayer(AbstractLayer):
     def cache_exists(cls) -> bool:
         return bool(cls._cache)
 
+    @classmethod
+    def cache_version(cls) -> int:
+        return cls._cache_version
+
     @classmethod
     def get_id_by_attribute(cls, attribute: str, attribute_value: str) -> str | None:
         """Tries to retrieve ID by attribute from cache, accesses DB if attribute not cachced."""
-        for _id, attribute_data in cls._cache.items():
-            if attribute_data[attribute] == attribute_value:
-                return _id
+        id_ = cls._lookup_id(attribute, attribute_value)
+        if id_ is not None:
+            return id_
+        if (attribute, attribute_value) in cls._missing_lookups:
+            return None
 
-        return super().get_id_by_attribute(attribute, attribute_value)
+        id_ = cls._query_attribute_value("id", attribute, attribute_value)
+        if not id_:
+            if isinstance(attribute_value, Hashable):
+                cls._missing_lookups.add((attribute, attribute_value))
+            return None
+        return cast(str, id_)
 
     @classmethod
     def get_attribute_by_id(cls, target_attribute: str, id_: str) -> Any | None:
@@ -104,7 +186,7 @@ class AbstractCodeLayer(AbstractLayer):
         if attribute_value != "not_found":
             return attribute_value
 
-        return super().get_attribute_by_id(target_attribute, id_)
+        return cls._query_attribute_value(target_attribute, "id", id_)
 
     @classmethod
     def get_attributes_by_id(cls, id_: str) -> dict[str, Any]:
@@ -119,15 +201,21 @@ class AbstractCodeLayer(AbstractLayer):
         cls._cache_feature(feat)
         return cls._cache[id_]
 
+    @classmethod
+    def _query_attribute_value(cls, target_attribute: str, filter_attribute: str, filter_value: Any) -> Any | None:
+        """Fetches the attribute value from DB without the cache, which the overridden lookups would consult."""
+        gen = cls.get_attribute_values_by_another_attribute_value(target_attribute, filter_attribute, filter_value)
+        return next(gen, None)
+
     @classmethod
     def get_attribute_value_by_another_attribute_value(
         cls, target_attribute: str, filter_attribute: str, filter_value: str
     ) -> Any | None:
-        for attribute_data in cls._cache.values():
-            if attribute_data[filter_attribute] == filter_value:
-                return attribute_data[target_attribute]
-
-        return super().get_attribute_value_by_another_attribute_value(target_attribute, filter_attribute, filter_value)
+        # Misses are recorded by `get_id_by_attribute`, so repeated misses do not access DB again
+        id_ = cls.get_id_by_attribute(filter_attribute, filter_value)
+        if id_ is None:
+            return None
+        return cls.get_attribute_by_id(target_attribute, id_)
 
 
 class PlanTypeLayer(AbstractCodeLayer):
@@ -199,8 +287,8 @@ class AdditionalInformationTypeLayer(AbstractCodeLayer):
     ]
 
     @classmethod
-    def build_cache(cls):
-        super().build_cache()
+    def set_cache(cls, features: dict[str, dict[str, Any]]):
+        super().set_cache(features)
         configs = cls.read_additional_information_configs()
         cls.initialize_from_additional_information_config(configs)
 
@@ -293,8 +381,8 @@ class PlanRegulationTypeLayer(AbstractCodeLayer):
     ]
 
     @classmethod
-    def build_cache(cls):
-        super().build_cache()
+    def set_cache(cls, features: dict[str, dict[str, Any]]):
+        super().set_cache(features)
         configs = cls.read_regulation_configs()
         cls.initialize_from_regulation_config(configs)
 
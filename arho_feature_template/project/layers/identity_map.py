@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List, Tuple
+
+from qgis.core import QgsFeatureRequest
+from qgis.PyQt.QtCore import QObject
+
+from arho_feature_template.exceptions import LayerNotFoundError
+
+if TYPE_CHECKING:
+    from qgis.core import QgsFeature, QgsVectorLayer
+
+    from arho_feature_template.project.layers import AbstractLayer
+
+# Returns the IDs of the models built from the given features of a layer
+ModelIdResolver = Callable[[List["QgsFeature"]], Iterable[Any]]
+# Model layer name and model ID
+ModelKey = Tuple[str, Any]
+
+
+class ModelIdentityMap(QObject):
+    """
+    Session cache of plan models keyed by the layer and ID of the feature each model was built from.
+
+    Loading the same feature again returns the same model object. Each layer the models are built from has a
+    resolver returning the IDs of the models built from given features of the layer, and when changes are
+    committed to the layer, only the models of the changed features are dropped. Deleted and changed features
+    are resolved already when they are edited, since their committed values are gone after the commit.
+
+    The cache is bypassed while any of the layers has uncommitted changes, since the edit buffer might still be
+    rolled back. Cached models are shared, so they must not be modified in place.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._models: dict[str, dict[Any, Any]] = {}
+        self._dependencies: dict[str, dict[type[AbstractLayer], ModelIdResolver]] = {}
+        # Layers whose signals are connected, and the resolvers of the model layers depending on them
+        self._connected_layers: dict[str, tuple[QgsVectorLayer, dict[str, ModelIdResolver]]] = {}
+        # Models affected by the uncommitted changes of each layer, and the features they were resolved from
+        self._pending_keys: dict[str, set[ModelKey]] = {}
+        self._resolved_fids: dict[str, set[int]] = {}
+
+    def register(self, layer_class: type[AbstractLayer], dependencies: dict[type[AbstractLayer], ModelIdResolver]):
+        """
+        Enables caching the models of the layer.
+
+        `dependencies` are the layers the models are built from, including the layer itself, with their resolvers.
+        """
+        self._dependencies[layer_class.name] = dependencies
+
+    def is_usable(self, layer_class: type[AbstractLayer]) -> bool:
+        """Returns whether models of the layer can be read from and stored into the cache."""
+        dependencies = self._dependencies.get(layer_class.name)
+        if dependencies is None:
+            return False
+        try:
+            layers = [(dependency.get_from_project(), resolver) for dependency, resolver in dependencies.items()]
+        except LayerNotFoundError:
+            return False
+        if any(layer.isModified() for layer, _ in layers):
+            return False
+
+        for layer, resolver in layers:
+            self._connect_layer(layer, layer_class.name, resolver)
+        return True
+
+    def get(self, layer_class: type[AbstractLayer], id_: Any) -> Any | None:
+        return self._models.get(layer_class.name, {}).get(id_)
+
+    def put(self, layer_class: type[AbstractLayer], id_: Any, model: Any):
+        self._models.setdefault(layer_class.name, {})[id_] = model
+
+    def clear(self):
+        self._models.clear()
+        for layer, _ in self._connected_layers.values():
+            # Layer might have been deleted together with the previous project
+            with suppress(TypeError, RuntimeError):
+                layer.featuresDeleted.disconnect(self._on_features_deleted)
+                layer.attributeValueChanged.disconnect(self._on_attribute_value_changed)
+                layer.afterRollBack.disconnect(self._on_rolled_back)
+                layer.committedFeaturesAdded.disconnect(self._on_committed_features_added)
+                layer.committedFeaturesRemoved.disconnect(self._on_committed_features_removed)
+                layer.committedAttributeValuesChanges.disconnect(self._on_committed_attribute_values_changes)
+        self._connected_layers.clear()
+        self._pending_keys.clear()
+        self._resolved_fids.clear()
+
+    def _connect_layer(self, layer: QgsVectorLayer, model_layer_name: str, resolver: ModelIdResolver):
+        connected = self._connected_layers.get(layer.id())
+        if connected is not None:
+            connected[1][model_layer_name] = resolver
+            return
+        layer.featuresDeleted.connect(self._on_features_deleted)
+        layer.attributeValueChanged.connect(self._on_attribute_value_changed)
+        layer.afterRollBack.connect(self._on_rolled_back)
+        layer.committedFeaturesAdded.connect(self._on_committed_features_added)
+        layer.committedFeaturesRemoved.connect(self._on_committed_features_removed)
+        layer.committedAttributeValuesChanges.connect(self._on_committed_attribute_values_changes)
+        self._connected_layers[layer.id()] = (layer, {model_layer_name: resolver})
+
+    def _model_keys(self, layer_id: str, features: list[QgsFeature]) -> set[ModelKey]:
+        connected = self._connected_layers.get(layer_id)
+        if connected is None or not features:
+            return set()
+        return {
+            (model_layer_name, model_id)
+            for model_layer_name, resolver in connected[1].items()
+            for model_id in resolver(features)
+        }
+
+    def _resolve_committed_features(self, fids: Iterable[int]):
+        """Records the models built from the committed values of the edited features of the sending layer."""
+        layer = self.sender()
+        connected = self._connected_layers.get(layer.id()) if layer is not None else None
+        if connected is None:
+            return
+        resolved_fids = self._resolved_fids.setdefault(layer.id(), set())
+        # Features added in the edit buffer have negative IDs and no committed values
+        fids = [fid for fid in fids if fid >= 0 and fid not in resolved_fids]
+        if not fids:
+            return
+        resolved_fids.update(fids)
+        features = list(connected[0].dataProvider().getFeatures(QgsFeatureRequest().setFilterFids(fids)))
+        self._pending_keys.setdefault(layer.id(), set()).update(self._model_keys(layer.id(), features))
+
+    def _drop_models(self, layer_id: str, features: list[QgsFeature]):
+        keys = self._pending_keys.pop(layer_id, set()) | self._model_keys(layer_id, features)
+        self._resolved_fids.pop(layer_id, None)
+        for model_layer_name, model_id in keys:
+            self._models.get(model_layer_name, {}).pop(model_id, None)
+
+    def _on_features_deleted(self, fids: Iterable[int]):
+        self._resolve_committed_features(fids)
+
+    def _on_attribute_value_changed(self, fid: int, *_args):
+        self._resolve_committed_features([fid])
+
+    def _on_rolled_back(self):
+        layer = self.sender()
+        if layer is not None:
+            self._pending_keys.pop(layer.id(), None)
+            self._resolved_fids.pop(layer.id(), None)
+
+    def _on_committed_features_added(self, layer_id: str, features: list[QgsFeature]):
+        self._drop_models(layer_id, features)
+
+    def _on_committed_features_removed(self, layer_id: str, _fids: Any):
+        self._drop_models(layer_id, [])
+
+    def _on_committed_attribute_values_changes(self, layer_id: str, changes: dict[int, Any]):
+        connected = self._connected_layers.get(layer_id)
+        if connected is None:
+            return
+        request = QgsFeatureRequest().setFilterFids(list(changes.keys()))
+        self._drop_models(layer_id, list(connected[0].getFeatures(request)))
+
+
+model_identity_map = ModelIdentityMap()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Tuple
+
+from qgis.PyQt.QtCore import NULL
+
+if TYPE_CHECKING:
+    from qgis.core import QgsFeature
+
+# Object a row belongs to: name of the attribute referencing it and the referenced ID
+Owner = Tuple[str, Any]
+
+
+class OwnerIndex:
+    """
+    In-memory index of the rows of a table by the object each row belongs to.
+
+    A row (identified by its QGIS feature ID) belongs to the object referenced by the first non-NULL value of
+    `owner_attributes`, so tables with a reference column per owner type (like lifecycle dates) fit the index.
+    """
+
+    def __init__(self, owner_attributes: list[str]):
+        self.owner_attributes = owner_attributes
+        self._owners: dict[int, Owner] = {}
+        self._rows: dict[Owner, set[int]] = {}
+
+    @property
+    def attributes(self) -> list[str]:
+        return self.owner_attributes
+
+    def clear(self):
+        self._owners.clear()
+        self._rows.clear()
+
+    def add_feature(self, feature: QgsFeature):
+        owner = next(
+            ((attribute, feature[attribute]) for attribute in self.owner_attributes if feature[attribute] != NULL),
+            None,
+        )
+        self.remove_feature(feature.id())
+        if owner is None:
+            return
+
+        self._owners[feature.id()] = owner
+        self._rows.setdefault(owner, set()).add(feature.id())
+
+    def remove_feature(self, fid: int):
+        owner = self._owners.pop(fid, None)
+        if owner is None:
+            return
+        fids = self._rows[owner]
+        fids.discard(fid)
+        if not fids:
+            del self._rows[owner]
+
+    def rows(self, owner: Owner) -> set[int]:
+        """Returns the feature IDs of the rows belonging to the owner."""
+        return self._rows.get(owner, set())
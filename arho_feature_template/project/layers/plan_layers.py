@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 import logging
+import time
 from abc import abstractmethod
+from collections import defaultdict
+from contextlib import suppress
+from functools import partial
 from string import Template
 from textwrap import dedent
-from typing import Any, ClassVar, Generator, cast
+from typing import Any, ClassVar, Generator, Iterable, MutableSequence, cast
 
-from qgis.core import QgsFeature, QgsVectorLayerUtils
+from qgis.core import QgsExpression, QgsFeature, QgsFeatureRequest, QgsVectorLayer, QgsVectorLayerUtils
+from qgis.PyQt.QtCore import NULL
 
 from arho_feature_template.core.models import (
     AdditionalInformation,
     AttributeValue,
     Document,
+    LazyModelList,
     LifeCycle,
     Plan,
     PlanFeature,
@@ -21,7 +27,10 @@ from arho_feature_template.core.models import (
 )
 from arho_feature_template.exceptions import FeatureNotFoundError, LayerEditableError, LayerNotFoundError
 from arho_feature_template.project.layers import AbstractLayer
+from arho_feature_template.project.layers.association_index import AssociationIndex, AssociationTarget
 from arho_feature_template.project.layers.code_layers import PlanTypeLayer
+from arho_feature_template.project.layers.identity_map import model_identity_map
+from arho_feature_template.project.layers.owner_index import OwnerIndex
 from arho_feature_template.utils.misc_utils import (
     deserialize_localized_text,
     get_active_plan_id,
@@ -33,14 +42,33 @@ logger = logging.getLogger(__name__)
 
 
 class AbstractPlanLayer(AbstractLayer):
+    # Subset string template filtering the layer by `$plan_id`. Layers not referencing the plan directly filter
+    # with uncorrelated `IN (SELECT ...)` subqueries instead of literal ID lists resolved when the plan is set, since
+    # literal lists would grow with the plan and leave out rows added to the plan until the filter is set again.
     filter_template: ClassVar[Template | None]
 
+    @classmethod
+    def get_filter_expression(cls, plan_id: str | None) -> str | None:
+        """Returns the subset string filtering the layer by the plan, or None if the layer is not filtered."""
+        if cls.filter_template is None:
+            return None
+        return cls.filter_template.substitute(plan_id=plan_id) if plan_id else ""
+
+    @classmethod
+    def get_features_by_fids(cls, feature_ids: Iterable[int]) -> list[QgsFeature]:
+        feature_ids = list(feature_ids)
+        if not feature_ids:
+            return []
+        request = QgsFeatureRequest().setFilterFids(feature_ids)
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        return list(cls.get_from_project().getFeatures(request))
+
     @classmethod
     def apply_filter(cls, plan_id: str | None) -> None:
         """Apply a filter to the layer based on the plan_id."""
-        if cls.filter_template is None:
+        filter_expression = cls.get_filter_expression(plan_id)
+        if filter_expression is None:
             return
-        filter_expression = cls.filter_template.substitute(plan_id=plan_id) if plan_id else ""
         layer = cls.get_from_project()
         if layer.isEditable():
             raise LayerEditableError(cls.name)
@@ -48,6 +76,9 @@ class AbstractPlanLayer(AbstractLayer):
         if not layer:
             logger.warning("Layer %s not found", cls.name)
             return None
+        if layer.subsetString() == filter_expression:
+            # Setting the same subset string would still reload the layer
+            return None
         result = layer.setSubsetString(filter_expression)
         if result is False:
             iface.messageBar().pushMessage(
@@ -99,40 +130,7 @@ class PlanLayer(AbstractPlanLayer):
 
     @classmethod
     def model_from_feature(cls, feature: QgsFeature) -> Plan:
-        general_regulation_features = [
-            RegulationGroupLayer.get_feature_by_id(group_id)
-            for group_id in RegulationGroupAssociationLayer.get_group_ids_for_feature(feature["id"], cls.name)
-        ]
-        return Plan(
-            geom=feature.geometry(),
-            name=deserialize_localized_text(feature["name"]),
-            description=deserialize_localized_text(feature["description"]),
-            scale=feature["scale"],
-            permanent_plan_identifier=feature["permanent_plan_identifier"],
-            record_number=feature["record_number"],
-            producers_plan_identifier=feature["producers_plan_identifier"],
-            matter_management_identifier=feature["matter_management_identifier"],
-            plan_type_id=feature["plan_type_id"],
-            lifecycle_status_id=feature["lifecycle_status_id"],
-            organisation_id=feature["organisation_id"],
-            general_regulations=[
-                RegulationGroupLayer.model_from_feature(feat)
-                for feat in general_regulation_features
-                if feat is not None
-            ],
-            legal_effect_ids=list(LegalEffectAssociationLayer.get_legal_effect_ids_for_plan(feature["id"])),
-            documents=[
-                DocumentLayer.model_from_feature(feat)
-                for feat in DocumentLayer.get_features_by_attribute_value("plan_id", feature["id"])
-            ],
-            id_=feature["id"],
-            lifecycles=[
-                LifeCycleLayer.model_from_feature(feat)
-                for feat in LifeCycleLayer.get_features_by_plan_id(feature["id"])
-                if feat is not None
-            ],
-            modified=False,
-        )
+        return PlanModelLoader.plan_from_feature(feature)
 
     @classmethod
     def get_plan_name(cls, plan_id: str) -> str:
@@ -175,24 +173,7 @@ class PlanFeatureLayer(AbstractPlanLayer):
 
     @classmethod
     def model_from_feature(cls, feature: QgsFeature) -> PlanFeature:
-        regulation_group_features = [
-            RegulationGroupLayer.get_feature_by_id(group_id)
-            for group_id in RegulationGroupAssociationLayer.get_group_ids_for_feature(feature["id"], cls.name)
-        ]
-
-        return PlanFeature(
-            geom=feature.geometry(),
-            type_of_underground_id=feature["type_of_underground_id"],
-            layer_name=cls.get_from_project().name(),
-            name=deserialize_localized_text(feature["name"]),
-            description=deserialize_localized_text(feature["description"]),
-            regulation_groups=[
-                RegulationGroupLayer.model_from_feature(feat) for feat in regulation_group_features if feat is not None
-            ],
-            plan_id=feature["plan_id"],
-            modified=False,
-            id_=feature["id"],
-        )
+        return PlanModelLoader.plan_features_from_features(cls, [feature])[0]
 
 
 class LandUsePointLayer(PlanFeatureLayer):
@@ -240,36 +221,154 @@ class RegulationGroupLayer(AbstractPlanLayer):
 
     @classmethod
     def model_from_feature(cls, feature: QgsFeature) -> RegulationGroup:
-        return RegulationGroup(
-            type_code_id=feature["type_of_plan_regulation_group_id"],
-            heading=deserialize_localized_text(feature["name"]),
-            letter_code=feature["short_name"],
-            color_code=None,
-            group_number=feature["ordering"],
-            regulations=[
-                PlanRegulationLayer.model_from_feature(feat)
-                for feat in PlanRegulationLayer.regulations_with_group_id(feature["id"])
-            ],
-            propositions=[
-                PlanPropositionLayer.model_from_feature(feat)
-                for feat in PlanPropositionLayer.propositions_with_group_id(feature["id"])
-            ],
-            modified=False,
-            id_=feature["id"],
-        )
+        return PlanModelLoader.regulation_groups_from_features([feature])[0]
+
+    @classmethod
+    def get_group_ids(cls, feature_ids: Iterable[int] | None = None) -> Generator[str]:
+        """Returns IDs of all regulation groups in the layer, or of the groups with the given QGIS feature IDs."""
+        layer = cls.get_from_project()
+        request = QgsFeatureRequest()
+        if feature_ids is not None:
+            request.setFilterFids(list(feature_ids))
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(["id"], layer.fields())
+        for feature in layer.getFeatures(request):
+            yield feature["id"]
+
+
+class AbstractAssociationLayer(AbstractPlanLayer):
+    """
+    Plan layer of a many-to-many association table.
+
+    The associations of the active plan are held in an `AssociationIndex` that is loaded with `build_index` and
+    kept up to date from the commit signals of the layer. Lookups query the layer instead when the index has not
+    been loaded or the layer has uncommitted changes, because the index does not see the edit buffer.
+    """
+
+    index_source_attribute: ClassVar[str]
+    index_target_attributes: ClassVar[list[str]]
+
+    _index: ClassVar[AssociationIndex]
+    _indexed_layer: ClassVar[QgsVectorLayer | None] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._index = AssociationIndex(cls.index_source_attribute, cls.index_target_attributes)
+        cls._indexed_layer = None
+
+    @classmethod
+    def build_index(cls, plan_id: str | None):
+        """Loads the associations of the plan into the index. Expects the layer to be filtered by the plan."""
+        cls.clear_index()
+        if not plan_id:
+            return
+
+        layer = cls.get_from_project()
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(cls._index.attributes, layer.fields())
+        for feature in layer.getFeatures(request):
+            cls._index.add_feature(feature)
+
+        layer.committedFeaturesAdded.connect(cls._on_committed_features_added)
+        layer.committedFeaturesRemoved.connect(cls._on_committed_features_removed)
+        layer.committedAttributeValuesChanges.connect(cls._on_committed_attribute_values_changes)
+        cls._indexed_layer = layer
+
+    @classmethod
+    def clear_index(cls):
+        layer = cls._indexed_layer
+        cls._indexed_layer = None
+        cls._index.clear()
+        if layer is None:
+            return
+
+        # Layer might have been deleted together with the previous project
+        with suppress(TypeError, RuntimeError):
+            layer.committedFeaturesAdded.disconnect(cls._on_committed_features_added)
+            layer.committedFeaturesRemoved.disconnect(cls._on_committed_features_removed)
+            layer.committedAttributeValuesChanges.disconnect(cls._on_committed_attribute_values_changes)
+
+    @classmethod
+    def get_index(cls) -> AssociationIndex | None:
+        """Returns the index if it can answer lookups, otherwise None."""
+        layer = cls._indexed_layer
+        if layer is None:
+            return None
+        try:
+            if layer.isModified():
+                return None
+        except RuntimeError:
+            return None
+        return cls._index
 
+    @classmethod
+    def _on_committed_features_added(cls, _layer_id: str, features: list[QgsFeature]):
+        for feature in features:
+            cls._index.add_feature(feature)
+
+    @classmethod
+    def _on_committed_features_removed(cls, _layer_id: str, feature_ids: list[int]):
+        for fid in feature_ids:
+            cls._index.remove_feature(fid)
+
+    @classmethod
+    def _on_committed_attribute_values_changes(cls, _layer_id: str, changed_attributes: dict[int, dict]):
+        if cls._indexed_layer is None:
+            return
+        request = QgsFeatureRequest().setFilterFids(list(changed_attributes.keys()))
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(cls._index.attributes, cls._indexed_layer.fields())
+        for feature in cls._indexed_layer.getFeatures(request):
+            cls._index.add_feature(feature)
+
+    @classmethod
+    def get_source_ids_by_target_ids(cls, target_attribute: str, target_ids: Iterable[str]) -> dict[str, list[str]]:
+        """Returns the associated source IDs of each target ID, targets being referenced by `target_attribute`."""
+        index = cls.get_index()
+        if index is None:
+            return _group_values_by(
+                cls.get_features_by_attribute_values(
+                    target_attribute, target_ids, attributes=[target_attribute, cls.index_source_attribute]
+                ),
+                target_attribute,
+                cls.index_source_attribute,
+            )
+        return {
+            target_id: list(sources)
+            for target_id in target_ids
+            if (sources := index.sources((target_attribute, target_id)))
+        }
 
-class RegulationGroupAssociationLayer(AbstractPlanLayer):
+    @classmethod
+    def get_target_ids_by_source_ids(cls, source_ids: Iterable[str]) -> dict[str, list[str]]:
+        """Returns the associated target IDs of each source ID."""
+        index = cls.get_index()
+        if index is None:
+            target_attribute = cls.index_target_attributes[0]
+            return _group_values_by(
+                cls.get_features_by_attribute_values(
+                    cls.index_source_attribute, source_ids, attributes=[cls.index_source_attribute, target_attribute]
+                ),
+                cls.index_source_attribute,
+                target_attribute,
+            )
+        return {
+            source_id: [target_id for _, target_id in targets]
+            for source_id in source_ids
+            if (targets := index.targets(source_id))
+        }
+
+
+class RegulationGroupAssociationLayer(AbstractAssociationLayer):
     name = "Kaavamääräysryhmien assosiaatiot"
     filter_template = Template(
         dedent(
             """\
-            EXISTS (
-                SELECT 1
+            plan_regulation_group_id IN (
+                SELECT prg.id
                 FROM hame.plan_regulation_group prg
-                WHERE
-                    hame.regulation_group_association.plan_regulation_group_id = prg.id
-                    AND prg.plan_id = '$plan_id'
+                WHERE prg.plan_id = '$plan_id'
             )"""
         )
     )
@@ -283,6 +382,9 @@ class RegulationGroupAssociationLayer(AbstractPlanLayer):
         PlanLayer.name: "plan_id",
     }
 
+    index_source_attribute = "plan_regulation_group_id"
+    index_target_attributes: ClassVar[list[str]] = list(layer_name_to_attribute_map.values())
+
     @classmethod
     def feature_from(cls, regulation_group_id: str, layer_name: str, feature_id: str) -> QgsFeature | None:
         layer = cls.get_from_project()
@@ -301,18 +403,42 @@ class RegulationGroupAssociationLayer(AbstractPlanLayer):
     @classmethod
     def association_exists(cls, regulation_group_id: str, layer_name: str, feature_id: str):
         attribute = cls.layer_name_to_attribute_map.get(layer_name)
-        for feature in cls.get_features_by_attribute_value("plan_regulation_group_id", regulation_group_id):
-            if feature[attribute] == feature_id:
-                return True
-        return False
+        if not attribute:
+            raise LayerNotFoundError(layer_name)
+        index = cls.get_index()
+        if index is not None:
+            return index.exists(regulation_group_id, (attribute, feature_id))
+
+        request = QgsFeatureRequest().setFilterExpression(
+            f"{QgsExpression.quotedColumnRef('plan_regulation_group_id')} = "
+            f"{QgsExpression.quotedValue(regulation_group_id)} AND "
+            f"{QgsExpression.quotedColumnRef(attribute)} = {QgsExpression.quotedValue(feature_id)}"
+        )
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setNoAttributes()
+        request.setLimit(1)
+        return next(iter(cls.get_from_project().getFeatures(request)), None) is not None
 
     @classmethod
-    def get_associations_for_feature(cls, feature_id: str, layer_name: str) -> Generator[QgsFeature]:
+    def get_associations_for_feature(cls, feature_id: str, layer_name: str) -> Iterable[QgsFeature]:
         attribute = cls.layer_name_to_attribute_map.get(layer_name)
         if not attribute:
             raise LayerNotFoundError(layer_name)
+        index = cls.get_index()
+        if index is not None:
+            return cls.get_features_by_fids(
+                fid for fids in index.sources((attribute, feature_id)).values() for fid in fids
+            )
         return cls.get_features_by_attribute_value(attribute, feature_id)
 
+    @classmethod
+    def get_associations_for_features(cls, feature_ids: Iterable[str], layer_name: str) -> Generator[QgsFeature]:
+        """Fetches the associations of all given features of the layer in a single request."""
+        attribute = cls.layer_name_to_attribute_map.get(layer_name)
+        if not attribute:
+            raise LayerNotFoundError(layer_name)
+        return cls.get_features_by_attribute_values(attribute, feature_ids)
+
     @classmethod
     def get_associations_for_regulation_group(cls, group_id: str) -> Generator[QgsFeature]:
         return cls.get_features_by_attribute_value("plan_regulation_group_id", group_id)
@@ -329,18 +455,41 @@ class RegulationGroupAssociationLayer(AbstractPlanLayer):
         ]
 
     @classmethod
-    def get_group_ids_for_feature(cls, feature_id: str, layer_name: str) -> Generator[str]:
+    def get_group_ids_for_feature(cls, feature_id: str, layer_name: str) -> Iterable[str]:
         attribute = cls.layer_name_to_attribute_map.get(layer_name)
         if not attribute:
             raise LayerNotFoundError(layer_name)
+        index = cls.get_index()
+        if index is not None:
+            return list(index.sources((attribute, feature_id)))
         return cls.get_attribute_values_by_another_attribute_value("plan_regulation_group_id", attribute, feature_id)
 
+    @classmethod
+    def get_group_ids_for_features(cls, feature_ids: Iterable[str], layer_name: str) -> dict[str, list[str]]:
+        attribute = cls.layer_name_to_attribute_map.get(layer_name)
+        if not attribute:
+            raise LayerNotFoundError(layer_name)
+        return cls.get_source_ids_by_target_ids(attribute, feature_ids)
+
     @classmethod
     def get_dangling_associations(  # by_feature
         cls, groups: list[RegulationGroup], feature_id: str, layer_name: str
     ) -> list[QgsFeature]:
-        associations = RegulationGroupAssociationLayer.get_associations_for_feature(feature_id, layer_name)
         updated_group_ids = [group.id_ for group in groups]
+        attribute = cls.layer_name_to_attribute_map.get(layer_name)
+        if not attribute:
+            raise LayerNotFoundError(layer_name)
+        index = cls.get_index()
+        if index is not None:
+            return cls.get_features_by_fids(
+                fid
+                for group_id, fids in index.sources((attribute, feature_id)).items()
+                if group_id not in updated_group_ids
+                for fid in fids
+            )
+        associations = cls.get_features_by_attribute_value(
+            attribute, feature_id, attributes=["plan_regulation_group_id"]
+        )
         return [assoc for assoc in associations if assoc["plan_regulation_group_id"] not in updated_group_ids]
 
 
@@ -360,6 +509,61 @@ def attribute_value_model_from_feature(feature: QgsFeature) -> AttributeValue:
     )
 
 
+def regulation_model_from_feature(
+    feature: QgsFeature,
+    additional_information_by_regulation: dict[str, list[AdditionalInformation]],
+    theme_ids_by_regulation: dict[str, list[str]],
+    verbal_type_ids_by_regulation: dict[str, list[str]],
+) -> Regulation:
+    """Returns the regulation model of the feature with the children found from the given maps by regulation ID."""
+    return Regulation(
+        regulation_type_id=feature["type_of_plan_regulation_id"],
+        value=attribute_value_model_from_feature(feature),
+        additional_information=additional_information_by_regulation.get(feature["id"], []),
+        regulation_number=None,
+        files=[],
+        theme_ids=theme_ids_by_regulation.get(feature["id"], []),
+        subject_identifiers=feature["subject_identifiers"],
+        regulation_group_id=feature["plan_regulation_group_id"],
+        verbal_regulation_type_ids=verbal_type_ids_by_regulation.get(feature["id"], []),
+        modified=False,
+        id_=feature["id"],
+    )
+
+
+def proposition_model_from_feature(feature: QgsFeature, theme_ids_by_proposition: dict[str, list[str]]) -> Proposition:
+    """Returns the proposition model of the feature with the theme IDs found from the map by proposition ID."""
+    return Proposition(
+        value=deserialize_localized_text(feature["text_value"]),
+        regulation_group_id=feature["plan_regulation_group_id"],
+        proposition_number=feature["ordering"],
+        theme_ids=theme_ids_by_proposition.get(feature["id"], []),
+        modified=False,
+        id_=feature["id"],
+    )
+
+
+def regulation_group_model_from_feature(
+    feature: QgsFeature, regulations: MutableSequence[Regulation], propositions: MutableSequence[Proposition]
+) -> RegulationGroup:
+    return RegulationGroup(
+        type_code_id=feature["type_of_plan_regulation_group_id"],
+        heading=deserialize_localized_text(feature["name"]),
+        letter_code=feature["short_name"],
+        color_code=None,
+        group_number=feature["ordering"],
+        regulations=regulations,
+        propositions=propositions,
+        modified=False,
+        id_=feature["id"],
+    )
+
+
+def regulation_group_order_key(group: RegulationGroup) -> tuple[bool, int, str]:
+    """Sort key ordering regulation groups by group number, groups without a number last, and then by ID."""
+    return (group.group_number is None, group.group_number or 0, group.id_ or "")
+
+
 def update_feature_from_attribute_value_model(value: AttributeValue | None, feature: QgsFeature):
     if value is None:
         return
@@ -381,12 +585,10 @@ class PlanRegulationLayer(AbstractPlanLayer):
     filter_template = Template(
         dedent(
             """\
-            EXISTS (
-                SELECT 1
+            plan_regulation_group_id IN (
+                SELECT prg.id
                 FROM hame.plan_regulation_group prg
-                WHERE
-                    hame.plan_regulation.plan_regulation_group_id = prg.id
-                    AND prg.plan_id = '$plan_id'
+                WHERE prg.plan_id = '$plan_id'
             )"""
         )
     )
@@ -405,26 +607,7 @@ class PlanRegulationLayer(AbstractPlanLayer):
 
     @classmethod
     def model_from_feature(cls, feature: QgsFeature) -> Regulation:
-        return Regulation(
-            regulation_type_id=feature["type_of_plan_regulation_id"],
-            value=attribute_value_model_from_feature(feature),
-            additional_information=[
-                AdditionalInformationLayer.model_from_feature(ai_feat)
-                for ai_feat in AdditionalInformationLayer.get_features_by_attribute_value(
-                    "plan_regulation_id", feature["id"]
-                )
-            ],
-            regulation_number=None,
-            files=[],
-            theme_ids=(list(PlanThemeAssociationLayer.get_plan_theme_id_for_plan_regulation(feature["id"]))),
-            subject_identifiers=feature["subject_identifiers"],
-            regulation_group_id=feature["plan_regulation_group_id"],
-            verbal_regulation_type_ids=(
-                list(TypeOfVerbalRegulationAssociationLayer.get_verbal_type_ids_for_regulation(feature["id"]))
-            ),
-            modified=False,
-            id_=feature["id"],
-        )
+        return PlanModelLoader.regulations_from_features([feature])[0]
 
     @classmethod
     def regulations_with_group_id(cls, group_id: str) -> Generator[QgsFeature]:
@@ -435,29 +618,30 @@ class PlanRegulationLayer(AbstractPlanLayer):
         updated_regulation_ids = [regulation.id_ for regulation in regulations]
         return [
             reg
-            for reg in cls.get_features_by_attribute_value("plan_regulation_group_id", group_id)
+            for reg in cls.get_features_by_attribute_value("plan_regulation_group_id", group_id, attributes=["id"])
             if reg["id"] not in updated_regulation_ids
         ]
 
 
-class TypeOfVerbalRegulationAssociationLayer(AbstractPlanLayer):
+class TypeOfVerbalRegulationAssociationLayer(AbstractAssociationLayer):
     name = "Sanallisten kaavamääräyksien lajien assosiaatiot"
     filter_template = Template(
         dedent(
             """\
-            EXISTS (
-                SELECT 1
+            plan_regulation_id IN (
+                SELECT pr.id
                 FROM
-                    hame.plan_regulation_group prg
-                    JOIN hame.plan_regulation pr
+                    hame.plan_regulation pr
+                    JOIN hame.plan_regulation_group prg
                         ON (prg.id = pr.plan_regulation_group_id)
-                WHERE
-                    hame.type_of_verbal_regulation_association.plan_regulation_id = pr.id
-                    AND prg.plan_id = '$plan_id'
+                WHERE prg.plan_id = '$plan_id'
             )"""
         )
     )
 
+    index_source_attribute = "plan_regulation_id"
+    index_target_attributes: ClassVar[list[str]] = ["type_of_verbal_plan_regulation_id"]
+
     @classmethod
     def feature_from(cls, regulation_id: str, type_of_verbal_regulation_id: str) -> QgsFeature | None:
         layer = cls.get_from_project()
@@ -469,30 +653,48 @@ class TypeOfVerbalRegulationAssociationLayer(AbstractPlanLayer):
 
     @classmethod
     def association_exists(cls, regulation_id: str, type_of_verbal_regulation_id: str) -> bool:
-        for feature in cls.get_features_by_attribute_value("plan_regulation_id", regulation_id):
-            if feature["type_of_verbal_plan_regulation_id"] == type_of_verbal_regulation_id:
-                return True
-        return False
+        index = cls.get_index()
+        if index is not None:
+            return index.exists(regulation_id, ("type_of_verbal_plan_regulation_id", type_of_verbal_regulation_id))
+        return type_of_verbal_regulation_id in cls.get_attribute_values_by_another_attribute_value(
+            "type_of_verbal_plan_regulation_id", "plan_regulation_id", regulation_id
+        )
 
     @classmethod
     def get_associations_for_regulation(cls, regulation_id: str) -> Generator[QgsFeature]:
         return cls.get_features_by_attribute_value("plan_regulation_id", regulation_id)
 
     @classmethod
-    def get_verbal_type_ids_for_regulation(cls, regulation_id: str) -> Generator[QgsFeature]:
+    def get_verbal_type_ids_for_regulation(cls, regulation_id: str) -> Iterable[str]:
+        index = cls.get_index()
+        if index is not None:
+            return [type_id for _, type_id in index.targets(regulation_id)]
         return cls.get_attribute_values_by_another_attribute_value(
             "type_of_verbal_plan_regulation_id", "plan_regulation_id", regulation_id
         )
 
     @classmethod
     def get_dangling_associations(cls, regulation_id: str, updated_type_ids: list[str]) -> list[QgsFeature]:
-        associations = cls.get_associations_for_regulation(regulation_id)
+        index = cls.get_index()
+        if index is not None:
+            return cls.get_features_by_fids(
+                fid
+                for (_, type_id), fids in index.targets(regulation_id).items()
+                if type_id not in updated_type_ids
+                for fid in fids
+            )
+        associations = cls.get_features_by_attribute_value(
+            "plan_regulation_id", regulation_id, attributes=["type_of_verbal_plan_regulation_id"]
+        )
         return [assoc for assoc in associations if assoc["type_of_verbal_plan_regulation_id"] not in updated_type_ids]
 
 
-class LegalEffectAssociationLayer(AbstractPlanLayer):
+class LegalEffectAssociationLayer(AbstractAssociationLayer):
     name = "Yleiskaavan oikeusvaikutusten assosiaatiot"
-    filter_template = None
+    filter_template = Template("plan_id = '$plan_id'")
+
+    index_source_attribute = "plan_id"
+    index_target_attributes: ClassVar[list[str]] = ["legal_effects_of_master_plan_id"]
 
     @classmethod
     def feature_from(cls, plan_id: str, legal_effect_id: str) -> QgsFeature | None:
@@ -505,24 +707,39 @@ class LegalEffectAssociationLayer(AbstractPlanLayer):
 
     @classmethod
     def association_exists(cls, plan_id: str, legal_effect_id: str) -> bool:
-        for feature in cls.get_features_by_attribute_value("plan_id", plan_id):
-            if feature["legal_effects_of_master_plan_id"] == legal_effect_id:
-                return True
-        return False
+        index = cls.get_index()
+        if index is not None:
+            return index.exists(plan_id, ("legal_effects_of_master_plan_id", legal_effect_id))
+        return legal_effect_id in cls.get_attribute_values_by_another_attribute_value(
+            "legal_effects_of_master_plan_id", "plan_id", plan_id
+        )
 
     @classmethod
     def get_associations_for_plan(cls, plan_id: str) -> Generator[QgsFeature]:
         return cls.get_features_by_attribute_value("plan_id", plan_id)
 
     @classmethod
-    def get_legal_effect_ids_for_plan(cls, plan_id: str) -> Generator[QgsFeature]:
+    def get_legal_effect_ids_for_plan(cls, plan_id: str) -> Iterable[str]:
+        index = cls.get_index()
+        if index is not None:
+            return [legal_effect_id for _, legal_effect_id in index.targets(plan_id)]
         return cls.get_attribute_values_by_another_attribute_value(
             "legal_effects_of_master_plan_id", "plan_id", plan_id
         )
 
     @classmethod
     def get_dangling_associations(cls, plan_id: str, updated_legal_effect_ids: list[str]) -> list[QgsFeature]:
-        associations = cls.get_associations_for_plan(plan_id)
+        index = cls.get_index()
+        if index is not None:
+            return cls.get_features_by_fids(
+                fid
+                for (_, legal_effect_id), fids in index.targets(plan_id).items()
+                if legal_effect_id not in updated_legal_effect_ids
+                for fid in fids
+            )
+        associations = cls.get_features_by_attribute_value(
+            "plan_id", plan_id, attributes=["legal_effects_of_master_plan_id"]
+        )
         return [
             assoc for assoc in associations if assoc["legal_effects_of_master_plan_id"] not in updated_legal_effect_ids
         ]
@@ -533,12 +750,10 @@ class PlanPropositionLayer(AbstractPlanLayer):
     filter_template = Template(
         dedent(
             """\
-            EXISTS (
-                SELECT 1
-                FROM hame.plan_regulation_group rg
-                WHERE
-                    hame.plan_proposition.plan_regulation_group_id = rg.id
-                    AND rg.plan_id = '$plan_id'
+            plan_regulation_group_id IN (
+                SELECT prg.id
+                FROM hame.plan_regulation_group prg
+                WHERE prg.plan_id = '$plan_id'
             )"""
         )
     )
@@ -556,15 +771,7 @@ class PlanPropositionLayer(AbstractPlanLayer):
 
     @classmethod
     def model_from_feature(cls, feature: QgsFeature) -> Proposition:
-        proposition_value = deserialize_localized_text(feature["text_value"])
-        return Proposition(
-            value=proposition_value,
-            regulation_group_id=feature["plan_regulation_group_id"],
-            proposition_number=feature["ordering"],
-            theme_ids=(list(PlanThemeAssociationLayer.get_plan_theme_id_for_plan_proposition(feature["id"]))),
-            modified=False,
-            id_=feature["id"],
-        )
+        return PlanModelLoader.propositions_from_features([feature])[0]
 
     @classmethod
     def propositions_with_group_id(cls, group_id: str) -> Generator[QgsFeature]:
@@ -575,34 +782,38 @@ class PlanPropositionLayer(AbstractPlanLayer):
         updated_proposition_ids = [proposition.id_ for proposition in propositions]
         return [
             prop
-            for prop in cls.get_features_by_attribute_value("plan_regulation_group_id", group_id)
+            for prop in cls.get_features_by_attribute_value("plan_regulation_group_id", group_id, attributes=["id"])
             if prop["id"] not in updated_proposition_ids
         ]
 
 
-class PlanThemeAssociationLayer(AbstractPlanLayer):
+class PlanThemeAssociationLayer(AbstractAssociationLayer):
     name = "Kaavoitusteemojen assosiaatiot"
     filter_template = Template(
         dedent(
             """\
-            EXISTS (
-                SELECT 1
+            plan_regulation_id IN (
+                SELECT pr.id
+                FROM
+                    hame.plan_regulation pr
+                    JOIN hame.plan_regulation_group prg
+                        ON (prg.id = pr.plan_regulation_group_id)
+                WHERE prg.plan_id = '$plan_id'
+            )
+            OR plan_proposition_id IN (
+                SELECT pp.id
                 FROM
-                    hame.plan_regulation_group prg
-                    LEFT JOIN hame.plan_regulation pr
-                        ON prg.id = pr.plan_regulation_group_id
-                    LEFT JOIN hame.plan_proposition pp
-                        ON prg.id = pp.plan_regulation_group_id
-                WHERE
-                    prg.plan_id = '$plan_id'
-                    AND (
-                    hame.plan_theme_association.plan_regulation_id = pr.id
-                        OR hame.plan_theme_association.plan_proposition_id = pp.id
-                )
+                    hame.plan_proposition pp
+                    JOIN hame.plan_regulation_group prg
+                        ON (prg.id = pp.plan_regulation_group_id)
+                WHERE prg.plan_id = '$plan_id'
             )"""
         )
     )
 
+    index_source_attribute = "plan_theme_id"
+    index_target_attributes: ClassVar[list[str]] = ["plan_regulation_id", "plan_proposition_id"]
+
     @classmethod
     def feature_from(
         cls, plan_theme_id: str, plan_regulation_id: str | None = None, plan_proposition_id: str | None = None
@@ -617,19 +828,23 @@ class PlanThemeAssociationLayer(AbstractPlanLayer):
 
     @classmethod
     def regulation_association_exists(cls, plan_theme_id: str, plan_regulation_id: str | None = None) -> bool:
-        if plan_regulation_id:
-            for feature in cls.get_features_by_attribute_value("plan_regulation_id", plan_regulation_id):
-                if feature["plan_theme_id"] == plan_theme_id:
-                    return True
-        return False
+        index = cls.get_index()
+        if index is not None:
+            return bool(plan_regulation_id) and index.exists(plan_theme_id, ("plan_regulation_id", plan_regulation_id))
+        return bool(plan_regulation_id) and plan_theme_id in cls.get_attribute_values_by_another_attribute_value(
+            "plan_theme_id", "plan_regulation_id", plan_regulation_id
+        )
 
     @classmethod
     def proposition_association_exists(cls, plan_theme_id: str, plan_proposition_id: str | None = None) -> bool:
-        if plan_proposition_id:
-            for feature in cls.get_features_by_attribute_value("plan_proposition_id", plan_proposition_id):
-                if feature["plan_theme_id"] == plan_theme_id:
-                    return True
-        return False
+        index = cls.get_index()
+        if index is not None:
+            return bool(plan_proposition_id) and index.exists(
+                plan_theme_id, ("plan_proposition_id", plan_proposition_id)
+            )
+        return bool(plan_proposition_id) and plan_theme_id in cls.get_attribute_values_by_another_attribute_value(
+            "plan_theme_id", "plan_proposition_id", plan_proposition_id
+        )
 
     @classmethod
     def get_associations_for_plan_regulation(cls, plan_regulation_id: str) -> Generator[QgsFeature]:
@@ -640,13 +855,19 @@ class PlanThemeAssociationLayer(AbstractPlanLayer):
         return cls.get_features_by_attribute_value("plan_proposition_id", plan_proposition_id)
 
     @classmethod
-    def get_plan_theme_id_for_plan_regulation(cls, plan_regulation_id: str) -> Generator[QgsFeature]:
+    def get_plan_theme_id_for_plan_regulation(cls, plan_regulation_id: str) -> Iterable[str]:
+        index = cls.get_index()
+        if index is not None:
+            return list(index.sources(("plan_regulation_id", plan_regulation_id)))
         return cls.get_attribute_values_by_another_attribute_value(
             "plan_theme_id", "plan_regulation_id", plan_regulation_id
         )
 
     @classmethod
-    def get_plan_theme_id_for_plan_proposition(cls, plan_proposition_id: str) -> Generator[QgsFeature]:
+    def get_plan_theme_id_for_plan_proposition(cls, plan_proposition_id: str) -> Iterable[str]:
+        index = cls.get_index()
+        if index is not None:
+            return list(index.sources(("plan_proposition_id", plan_proposition_id)))
         return cls.get_attribute_values_by_another_attribute_value(
             "plan_theme_id", "plan_proposition_id", plan_proposition_id
         )
@@ -655,16 +876,41 @@ class PlanThemeAssociationLayer(AbstractPlanLayer):
     def get_dangling_regulation_associations(
         cls, plan_regulation_id: str, updated_plan_theme_ids: list[str]
     ) -> list[QgsFeature]:
-        associations = cls.get_associations_for_plan_regulation(plan_regulation_id)
+        index = cls.get_index()
+        if index is not None:
+            return cls._get_dangling_associations_from_index(
+                index, ("plan_regulation_id", plan_regulation_id), updated_plan_theme_ids
+            )
+        associations = cls.get_features_by_attribute_value(
+            "plan_regulation_id", plan_regulation_id, attributes=["plan_theme_id"]
+        )
         return [assoc for assoc in associations if assoc["plan_theme_id"] not in updated_plan_theme_ids]
 
     @classmethod
     def get_dangling_proposition_associations(
         cls, plan_proposition_id: str, updated_plan_theme_ids: list[str]
     ) -> list[QgsFeature]:
-        associations = cls.get_associations_for_plan_proposition(plan_proposition_id)
+        index = cls.get_index()
+        if index is not None:
+            return cls._get_dangling_associations_from_index(
+                index, ("plan_proposition_id", plan_proposition_id), updated_plan_theme_ids
+            )
+        associations = cls.get_features_by_attribute_value(
+            "plan_proposition_id", plan_proposition_id, attributes=["plan_theme_id"]
+        )
         return [assoc for assoc in associations if assoc["plan_theme_id"] not in updated_plan_theme_ids]
 
+    @classmethod
+    def _get_dangling_associations_from_index(
+        cls, index: AssociationIndex, target: AssociationTarget, updated_plan_theme_ids: list[str]
+    ) -> list[QgsFeature]:
+        return cls.get_features_by_fids(
+            fid
+            for theme_id, fids in index.sources(target).items()
+            if theme_id not in updated_plan_theme_ids
+            for fid in fids
+        )
+
 
 class DocumentLayer(AbstractPlanLayer):
     name = "Asiakirjat"
@@ -716,7 +962,7 @@ class DocumentLayer(AbstractPlanLayer):
         updated_document_ids = [doc.id_ for doc in documents]
         return [
             doc
-            for doc in cls.get_features_by_attribute_value("plan_id", plan_id)
+            for doc in cls.get_features_by_attribute_value("plan_id", plan_id, attributes=["id"])
             if doc["id"] not in updated_document_ids
         ]
 
@@ -731,15 +977,13 @@ class AdditionalInformationLayer(AbstractPlanLayer):
     filter_template = Template(
         dedent(
             """\
-            EXISTS (
-                SELECT 1
+            plan_regulation_id IN (
+                SELECT pr.id
                 FROM
-                    hame.plan_regulation_group prg
-                    JOIN hame.plan_regulation pr
+                    hame.plan_regulation pr
+                    JOIN hame.plan_regulation_group prg
                         ON (prg.id = pr.plan_regulation_group_id)
-                WHERE
-                    hame.additional_information.plan_regulation_id = pr.id
-                    AND prg.plan_id = '$plan_id'
+                WHERE prg.plan_id = '$plan_id'
             )"""
         )
     )
@@ -772,14 +1016,128 @@ class AdditionalInformationLayer(AbstractPlanLayer):
         updated_info_ids = [info.id_ for info in additional_infos]
         return [
             info
-            for info in cls.get_features_by_attribute_value("plan_regulation_id", regulation_id)
+            for info in cls.get_features_by_attribute_value("plan_regulation_id", regulation_id, attributes=["id"])
             if info["id"] not in updated_info_ids
         ]
 
 
 class LifeCycleLayer(AbstractPlanLayer):
+    """
+    Lifecycle dates of the plan, its plan features, regulations and propositions.
+
+    The lifecycle dates of the active plan are held in an `OwnerIndex` by the object each date belongs to. The
+    index is loaded with `build_index` and kept up to date from the commit signals of the layer like the indexes of
+    association layers.
+    """
+
     name = "Elinkaaren päiväykset"
-    filter_template = None
+    filter_template = Template(
+        dedent(
+            """\
+            plan_id = '$plan_id'
+            OR land_use_area_id IN (SELECT id FROM hame.land_use_area WHERE plan_id = '$plan_id')
+            OR other_area_id IN (SELECT id FROM hame.other_area WHERE plan_id = '$plan_id')
+            OR line_id IN (SELECT id FROM hame.line WHERE plan_id = '$plan_id')
+            OR land_use_point_id IN (SELECT id FROM hame.land_use_point WHERE plan_id = '$plan_id')
+            OR other_point_id IN (SELECT id FROM hame.other_point WHERE plan_id = '$plan_id')
+            OR plan_regulation_id IN (
+                SELECT pr.id
+                FROM
+                    hame.plan_regulation pr
+                    JOIN hame.plan_regulation_group prg
+                        ON (prg.id = pr.plan_regulation_group_id)
+                WHERE prg.plan_id = '$plan_id'
+            )
+            OR plan_proposition_id IN (
+                SELECT pp.id
+                FROM
+                    hame.plan_proposition pp
+                    JOIN hame.plan_regulation_group prg
+                        ON (prg.id = pp.plan_regulation_group_id)
+                WHERE prg.plan_id = '$plan_id'
+            )"""
+        )
+    )
+
+    owner_attributes: ClassVar[list[str]] = [
+        "plan_id",
+        "land_use_area_id",
+        "other_area_id",
+        "line_id",
+        "land_use_point_id",
+        "other_point_id",
+        "plan_regulation_id",
+        "plan_proposition_id",
+    ]
+
+    _index: ClassVar[OwnerIndex] = OwnerIndex(owner_attributes)
+    _indexed_layer: ClassVar[QgsVectorLayer | None] = None
+
+    @classmethod
+    def build_index(cls, plan_id: str | None):
+        """Loads the lifecycle dates of the plan into the index. Expects the layer to be filtered by the plan."""
+        cls.clear_index()
+        if not plan_id:
+            return
+
+        layer = cls.get_from_project()
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(cls._index.attributes, layer.fields())
+        for feature in layer.getFeatures(request):
+            cls._index.add_feature(feature)
+
+        layer.committedFeaturesAdded.connect(cls._on_committed_features_added)
+        layer.committedFeaturesRemoved.connect(cls._on_committed_features_removed)
+        layer.committedAttributeValuesChanges.connect(cls._on_committed_attribute_values_changes)
+        cls._indexed_layer = layer
+
+    @classmethod
+    def clear_index(cls):
+        layer = cls._indexed_layer
+        cls._indexed_layer = None
+        cls._index.clear()
+        if layer is None:
+            return
+
+        # Layer might have been deleted together with the previous project
+        with suppress(TypeError, RuntimeError):
+            layer.committedFeaturesAdded.disconnect(cls._on_committed_features_added)
+            layer.committedFeaturesRemoved.disconnect(cls._on_committed_features_removed)
+            layer.committedAttributeValuesChanges.disconnect(cls._on_committed_attribute_values_changes)
+
+    @classmethod
+    def get_index(cls) -> OwnerIndex | None:
+        """Returns the index if it can answer lookups, otherwise None."""
+        layer = cls._indexed_layer
+        if layer is None:
+            return None
+        try:
+            if layer.isModified():
+                return None
+        except RuntimeError:
+            return None
+        return cls._index
+
+    @classmethod
+    def _on_committed_features_added(cls, _layer_id: str, features: list[QgsFeature]):
+        for feature in features:
+            cls._index.add_feature(feature)
+
+    @classmethod
+    def _on_committed_features_removed(cls, _layer_id: str, feature_ids: list[int]):
+        for fid in feature_ids:
+            cls._index.remove_feature(fid)
+
+    @classmethod
+    def _on_committed_attribute_values_changes(cls, _layer_id: str, changed_attributes: dict[int, dict]):
+        if cls._indexed_layer is None:
+            return
+        request = QgsFeatureRequest().setFilterFids(list(changed_attributes.keys()))
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(cls._index.attributes, cls._indexed_layer.fields())
+        for feature in cls._indexed_layer.getFeatures(request):
+            cls._index.add_feature(feature)
 
     @classmethod
     def feature_from_model(cls, model: LifeCycle) -> QgsFeature:
@@ -820,7 +1178,251 @@ class LifeCycleLayer(AbstractPlanLayer):
 
     @classmethod
     def get_features_by_plan_id(cls, plan_id: str) -> list[QgsFeature]:
-        return list(cls.get_features_by_attribute_value("plan_id", plan_id))
+        return cls.get_features_by_owner("plan_id", plan_id)
+
+    @classmethod
+    def get_features_by_owner(cls, attribute: str, owner_id: str) -> list[QgsFeature]:
+        """Returns the lifecycle dates of the object referenced by `attribute`, like a plan or a plan feature."""
+        index = cls.get_index()
+        if index is not None:
+            return cls.get_features_by_fids(index.rows((attribute, owner_id)))
+        return list(cls.get_features_by_attribute_value(attribute, owner_id))
+
+
+def _group_features_by(features: Iterable[QgsFeature], attribute: str) -> dict[str, list[QgsFeature]]:
+    grouped: dict[str, list[QgsFeature]] = defaultdict(list)
+    for feature in features:
+        grouped[feature[attribute]].append(feature)
+    return grouped
+
+
+def _group_values_by(features: Iterable[QgsFeature], attribute: str, target_attribute: str) -> dict[str, list[str]]:
+    grouped: dict[str, list[str]] = defaultdict(list)
+    for feature in features:
+        grouped[feature[attribute]].append(feature[target_attribute])
+    return grouped
+
+
+class PlanModelLoader:
+    """
+    Builds plan models from features with one request per related layer.
+
+    Child features of all given features are prefetched with `IN` filters and the model trees are assembled
+    in memory instead of querying the children of every feature separately.
+    """
+
+    @classmethod
+    def plan_from_feature(cls, feature: QgsFeature) -> Plan:
+        plan_id = feature["id"]
+        group_ids = list(RegulationGroupAssociationLayer.get_group_ids_for_feature(plan_id, PlanLayer.name))
+
+        return Plan(
+            geom=feature.geometry(),
+            name=deserialize_localized_text(feature["name"]),
+            description=deserialize_localized_text(feature["description"]),
+            scale=feature["scale"],
+            permanent_plan_identifier=feature["permanent_plan_identifier"],
+            record_number=feature["record_number"],
+            producers_plan_identifier=feature["producers_plan_identifier"],
+            matter_management_identifier=feature["matter_management_identifier"],
+            plan_type_id=feature["plan_type_id"],
+            lifecycle_status_id=feature["lifecycle_status_id"],
+            organisation_id=feature["organisation_id"],
+            general_regulations=sorted(cls.regulation_groups_by_ids(group_ids), key=regulation_group_order_key),
+            legal_effect_ids=list(LegalEffectAssociationLayer.get_legal_effect_ids_for_plan(plan_id)),
+            documents=[
+                DocumentLayer.model_from_feature(feat)
+                for feat in DocumentLayer.get_features_by_attribute_value("plan_id", plan_id)
+            ],
+            id_=plan_id,
+            lifecycles=[
+                LifeCycleLayer.model_from_feature(feat)
+                for feat in LifeCycleLayer.get_features_by_plan_id(plan_id)
+                if feat is not None
+            ],
+            modified=False,
+        )
+
+    @classmethod
+    def plan_features_from_features(
+        cls, layer_class: type[PlanFeatureLayer], features: list[QgsFeature]
+    ) -> list[PlanFeature]:
+        attribute = RegulationGroupAssociationLayer.layer_name_to_attribute_map.get(layer_class.name)
+        if not attribute:
+            raise LayerNotFoundError(layer_class.name)
+
+        group_ids_by_feature = RegulationGroupAssociationLayer.get_group_ids_for_features(
+            [feature["id"] for feature in features], layer_class.name
+        )
+        groups_by_id = {
+            group.id_: group
+            for group in cls.regulation_groups_by_ids(
+                group_id for group_ids in group_ids_by_feature.values() for group_id in group_ids
+            )
+        }
+        layer_name = layer_class.get_from_project().name()
+
+        return [
+            PlanFeature(
+                geom=feature.geometry(),
+                type_of_underground_id=feature["type_of_underground_id"],
+                layer_name=layer_name,
+                name=deserialize_localized_text(feature["name"]),
+                description=deserialize_localized_text(feature["description"]),
+                regulation_groups=[
+                    groups_by_id[group_id]
+                    for group_id in group_ids_by_feature.get(feature["id"], [])
+                    if group_id in groups_by_id
+                ],
+                plan_id=feature["plan_id"],
+                modified=False,
+                id_=feature["id"],
+            )
+            for feature in features
+        ]
+
+    @classmethod
+    def regulation_groups_by_ids(
+        cls,
+        group_ids: Iterable[str],
+        lazy_children: bool = False,  # noqa: FBT001, FBT002
+    ) -> list[RegulationGroup]:
+        """Returns regulation group models in the order of the given IDs. Missing groups are skipped."""
+        group_ids = list(dict.fromkeys(group_ids))
+        groups_by_id: dict[str, RegulationGroup] = {}
+        if model_identity_map.is_usable(RegulationGroupLayer):
+            for group_id in group_ids:
+                group = model_identity_map.get(RegulationGroupLayer, group_id)
+                if group is not None:
+                    groups_by_id[group_id] = group
+
+        missing_ids = [group_id for group_id in group_ids if group_id not in groups_by_id]
+        if missing_ids:
+            features = RegulationGroupLayer.get_features_by_attribute_values("id", missing_ids)
+            groups_by_id.update(
+                (group.id_, group) for group in cls.regulation_groups_from_features(list(features), lazy_children)
+            )
+        return [groups_by_id[group_id] for group_id in group_ids if group_id in groups_by_id]
+
+    @classmethod
+    def regulation_groups_from_features(
+        cls,
+        features: list[QgsFeature],
+        lazy_children: bool = False,  # noqa: FBT001, FBT002
+    ) -> list[RegulationGroup]:
+        """
+        Returns regulation group models of the features.
+
+        Models are shared through `model_identity_map`, so only groups not loaded before are built. If
+        `lazy_children` is True, regulations and propositions of the built groups are loaded only when accessed.
+        """
+        use_identity_map = model_identity_map.is_usable(RegulationGroupLayer)
+        if not use_identity_map:
+            return cls._build_regulation_groups(features, lazy_children)
+
+        groups: dict[str, RegulationGroup] = {}
+        for feature in features:
+            group = model_identity_map.get(RegulationGroupLayer, feature["id"])
+            if group is not None:
+                groups[feature["id"]] = group
+        for group in cls._build_regulation_groups(
+            [feature for feature in features if feature["id"] not in groups], lazy_children
+        ):
+            model_identity_map.put(RegulationGroupLayer, group.id_, group)
+            groups[cast(str, group.id_)] = group
+        return [groups[feature["id"]] for feature in features]
+
+    @classmethod
+    def _build_regulation_groups(
+        cls,
+        features: list[QgsFeature],
+        lazy_children: bool,  # noqa: FBT001
+    ) -> list[RegulationGroup]:
+        if not features:
+            return []
+        group_ids = [feature["id"] for feature in features]
+        if lazy_children:
+            regulations_by_group, propositions_by_group = cls._lazy_children_by_group(group_ids)
+        else:
+            regulations_by_group, propositions_by_group = cls._children_by_group(group_ids)
+
+        return [
+            regulation_group_model_from_feature(
+                feature, regulations_by_group.get(feature["id"], []), propositions_by_group.get(feature["id"], [])
+            )
+            for feature in features
+        ]
+
+    @classmethod
+    def _children_by_group(
+        cls, group_ids: list[str]
+    ) -> tuple[dict[str, MutableSequence[Regulation]], dict[str, MutableSequence[Proposition]]]:
+        regulations_by_group: dict[str, MutableSequence[Regulation]] = defaultdict(list)
+        for regulation in cls.regulations_from_features(
+            list(PlanRegulationLayer.get_features_by_attribute_values("plan_regulation_group_id", group_ids))
+        ):
+            regulations_by_group[cast(str, regulation.regulation_group_id)].append(regulation)
+
+        propositions_by_group: dict[str, MutableSequence[Proposition]] = defaultdict(list)
+        for proposition in cls.propositions_from_features(
+            list(PlanPropositionLayer.get_features_by_attribute_values("plan_regulation_group_id", group_ids))
+        ):
+            propositions_by_group[cast(str, proposition.regulation_group_id)].append(proposition)
+        return regulations_by_group, propositions_by_group
+
+    @classmethod
+    def _lazy_children_by_group(
+        cls, group_ids: list[str]
+    ) -> tuple[dict[str, MutableSequence[Regulation]], dict[str, MutableSequence[Proposition]]]:
+        return (
+            {group_id: LazyModelList(partial(cls.regulations_of_group, group_id)) for group_id in group_ids},
+            {group_id: LazyModelList(partial(cls.propositions_of_group, group_id)) for group_id in group_ids},
+        )
+
+    @classmethod
+    def regulations_of_group(cls, group_id: str) -> list[Regulation]:
+        return cls.regulations_from_features(
+            list(PlanRegulationLayer.get_features_by_attribute_value("plan_regulation_group_id", group_id))
+        )
+
+    @classmethod
+    def propositions_of_group(cls, group_id: str) -> list[Proposition]:
+        return cls.propositions_from_features(
+            list(PlanPropositionLayer.get_features_by_attribute_value("plan_regulation_group_id", group_id))
+        )
+
+    @classmethod
+    def regulations_from_features(cls, features: list[QgsFeature]) -> list[Regulation]:
+        regulation_ids = [feature["id"] for feature in features]
+
+        additional_information_by_regulation = {
+            regulation_id: [AdditionalInformationLayer.model_from_feature(ai_feat) for ai_feat in ai_features]
+            for regulation_id, ai_features in _group_features_by(
+                AdditionalInformationLayer.get_features_by_attribute_values("plan_regulation_id", regulation_ids),
+                "plan_regulation_id",
+            ).items()
+        }
+        theme_ids_by_regulation = PlanThemeAssociationLayer.get_source_ids_by_target_ids(
+            "plan_regulation_id", regulation_ids
+        )
+        verbal_type_ids_by_regulation = TypeOfVerbalRegulationAssociationLayer.get_target_ids_by_source_ids(
+            regulation_ids
+        )
+
+        return [
+            regulation_model_from_feature(
+                feature, additional_information_by_regulation, theme_ids_by_regulation, verbal_type_ids_by_regulation
+            )
+            for feature in features
+        ]
+
+    @classmethod
+    def propositions_from_features(cls, features: list[QgsFeature]) -> list[Proposition]:
+        theme_ids_by_proposition = PlanThemeAssociationLayer.get_source_ids_by_target_ids(
+            "plan_proposition_id", [feature["id"] for feature in features]
+        )
+
+        return [proposition_model_from_feature(feature, theme_ids_by_proposition) for feature in features]
 
 
 FEATURE_LAYER_NAME_TO_CLASS_MAP: dict[str, type[PlanFeatureLayer]] = {
@@ -831,8 +1433,70 @@ FEATURE_LAYER_NAME_TO_CLASS_MAP: dict[str, type[PlanFeatureLayer]] = {
     LandUseAreaLayer.name: LandUseAreaLayer,
 }
 
+
+def _attribute_values(features: list[QgsFeature], attribute: str) -> list[Any]:
+    return [feature[attribute] for feature in features if feature[attribute] != NULL]
+
+
+def _group_ids_of_features(features: list[QgsFeature]) -> list[str]:
+    return _attribute_values(features, "plan_regulation_group_id")
+
+
+def _group_ids_of_children(layer_class: type[AbstractLayer], child_ids: list[str]) -> list[str]:
+    return _group_ids_of_features(
+        list(layer_class.get_features_by_attribute_values("id", child_ids, attributes=["plan_regulation_group_id"]))
+    )
+
+
+def _group_ids_of_regulation_children(features: list[QgsFeature]) -> list[str]:
+    return _group_ids_of_children(PlanRegulationLayer, _attribute_values(features, "plan_regulation_id"))
+
+
+def _group_ids_of_theme_associations(features: list[QgsFeature]) -> list[str]:
+    return [
+        *_group_ids_of_regulation_children(features),
+        *_group_ids_of_children(PlanPropositionLayer, _attribute_values(features, "plan_proposition_id")),
+    ]
+
+
+# Regulation groups are dropped from the identity map when their own features or features of their regulations,
+# propositions or the regulations' and propositions' associations are changed
+model_identity_map.register(
+    RegulationGroupLayer,
+    {
+        RegulationGroupLayer: partial(_attribute_values, attribute="id"),
+        PlanRegulationLayer: _group_ids_of_features,
+        PlanPropositionLayer: _group_ids_of_features,
+        AdditionalInformationLayer: _group_ids_of_regulation_children,
+        PlanThemeAssociationLayer: _group_ids_of_theme_associations,
+        TypeOfVerbalRegulationAssociationLayer: _group_ids_of_regulation_children,
+    },
+)
+
 plan_layers = AbstractPlanLayer.__subclasses__()
 plan_layers.remove(PlanFeatureLayer)
+plan_layers.remove(AbstractAssociationLayer)
 
 plan_feature_layers = PlanFeatureLayer.__subclasses__()
 plan_layers.extend(plan_feature_layers)
+
+association_layers = AbstractAssociationLayer.__subclasses__()
+plan_layers.extend(association_layers)
+
+# Layers whose rows of the active plan are indexed in memory
+indexed_layers: list[type[AbstractAssociationLayer | LifeCycleLayer]] = [*association_layers, LifeCycleLayer]
+
+
+def apply_plan_filters(plan_id: str | None) -> dict[str, float]:
+    """
+    Filters all plan layers by the plan.
+
+    Returns the time spent filtering each layer in seconds. Rendering is not handled here, so callers should
+    freeze the map canvas while filtering and refresh it once afterwards.
+    """
+    timings: dict[str, float] = {}
+    for layer_class in plan_layers:
+        start = time.perf_counter()
+        layer_class.apply_filter(plan_id)
+        timings[layer_class.name] = time.perf_counter() - start
+    return timings
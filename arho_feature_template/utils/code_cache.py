@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from qgis.core import QgsApplication, QgsDataSourceUri, QgsFeatureRequest
+from qgis.PyQt.QtCore import NULL
+
+if TYPE_CHECKING:
+    from qgis.core import QgsAbstractFeatureSource, QgsVectorLayer
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = "arho_code_cache.sqlite"
+
+
+def _cache_file_path() -> Path:
+    return Path(QgsApplication.qgisSettingsDirPath()) / CACHE_FILE_NAME
+
+
+def _to_json(value: Any) -> Any:
+    if value == NULL:
+        return None
+    return str(value)
+
+
+class PersistentCodeCache:
+    """
+    Stores the cached features of a code layer in an SQLite file in the QGIS profile directory.
+
+    Entries are keyed by the database connection and table of the layer. A stored entry is used only if the
+    latest `modified_at` value and the feature count of the table still match the ones stored with it.
+    """
+
+    def __init__(self, layer: QgsVectorLayer, feature_source: QgsAbstractFeatureSource | None = None):
+        """
+        If `feature_source` is given, the freshness of the stored entry is checked through it instead of the
+        layer. This allows loading and storing the cache in a background task.
+        """
+        uri = QgsDataSourceUri(layer.source())
+        # Hash the connection info to avoid storing credentials that might be part of it
+        self.connection = hashlib.sha256(uri.connectionInfo(False).encode("utf-8")).hexdigest()
+        self.table = f"{uri.schema()}.{uri.table()}" if uri.table() else layer.name()
+        self._feature_source = feature_source if feature_source is not None else layer
+        self._fields = layer.fields()
+        self._feature_count = layer.featureCount()
+        self._freshness: str | None = None
+
+    @property
+    def freshness(self) -> str:
+        if self._freshness is None:
+            self._freshness = f"{self._get_latest_modification()}|{self._feature_count}"
+        return self._freshness
+
+    def _get_latest_modification(self) -> Any:
+        if self._fields.indexOf("modified_at") == -1:
+            return None
+        request = QgsFeatureRequest()
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(["modified_at"], self._fields)
+        request.addOrderBy("modified_at", ascending=False, nullsfirst=False)
+        request.setLimit(1)
+        feature = next(iter(self._feature_source.getFeatures(request)), None)
+        return feature["modified_at"] if feature else None
+
+    @staticmethod
+    def _connect() -> sqlite3.Connection:
+        connection = sqlite3.connect(_cache_file_path())
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS code_cache (
+                connection TEXT NOT NULL,
+                code_table TEXT NOT NULL,
+                freshness TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (connection, code_table)
+            )
+            """
+        )
+        return connection
+
+    def load(self) -> dict[str, dict[str, Any]] | None:
+        """Returns the stored features of the layer, or None if there is no up-to-date entry."""
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    "SELECT data FROM code_cache WHERE connection = ? AND code_table = ? AND freshness = ?",
+                    (self.connection, self.table, self.freshness),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Could not read code cache for table %s: %s", self.table, e)
+            return None
+
+        return json.loads(row[0]) if row else None
+
+    def store(self, data: dict[str, dict[str, Any]]) -> None:
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO code_cache (connection, code_table, freshness, data) VALUES (?, ?, ?, ?)",
+                    (self.connection, self.table, self.freshness, json.dumps(data, default=_to_json)),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Could not write code cache for table %s: %s", self.table, e)
@@ -1,26 +1,189 @@
 from __future__ import annotations
 
 import logging
+import threading
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any
 
-from qgis.core import QgsProviderRegistry
+from qgis.core import QgsDataSourceUri, QgsFeedback, QgsProviderRegistry, QgsTask
 
-from arho_feature_template.exceptions import UnexpectedNoneError
+from arho_feature_template.exceptions import QueryTimeoutError, UnexpectedNoneError
+
+if TYPE_CHECKING:
+    from qgis.core import QgsAbstractDatabaseProviderConnection, QgsProviderMetadata, QgsVectorLayer
 
 LOGGER = logging.getLogger("LandUsePlugin")
 
+# Seconds after which a query is cancelled
+DEFAULT_QUERY_TIMEOUT = 30
 
-def get_existing_database_connection_names() -> list[str]:
-    """
-    Retrieve the list of existing database connections from QGIS settings.
 
-    :return: A set of available PostgreSQL connection names.
-    """
+def quote_literal(value: str) -> str:
+    """Quotes a string literal for PostgreSQL."""
+    return "'" + value.replace("\x00", "").replace("'", "''") + "'"
 
+
+def quote_identifier(identifier: str) -> str:
+    """Quotes an identifier like a table or column name for PostgreSQL."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _postgres_provider_metadata() -> QgsProviderMetadata:
     provider_registry = QgsProviderRegistry.instance()
     if provider_registry is None:
         raise UnexpectedNoneError
     postgres_provider_metadata = provider_registry.providerMetadata("postgres")
     if postgres_provider_metadata is None:
         raise UnexpectedNoneError
+    return postgres_provider_metadata
+
+
+class DatabaseConnectionManager:
+    """
+    Keeps PostgreSQL provider connections by connection name for running SQL directly.
+
+    Connection handles and the list of connection names are created once and reused, and dropped when the
+    connections are changed in the QGIS settings. The provider reuses the underlying database connections
+    through its connection pool. Handles can be used from background threads.
+    """
+
+    def __init__(self):
+        self._connections: dict[str, QgsAbstractDatabaseProviderConnection] = {}
+        self._layer_connections: dict[str, QgsAbstractDatabaseProviderConnection] = {}
+        self._connection_names: list[str] | None = None
+        self._lock = threading.Lock()
+        self._provider_metadata: QgsProviderMetadata | None = None
+
+    def connection_names(self) -> list[str]:
+        with self._lock:
+            if self._connection_names is None:
+                self._connection_names = list(self._get_provider_metadata().dbConnections(False))
+            return list(self._connection_names)
+
+    def get_connection(self, connection_name: str) -> QgsAbstractDatabaseProviderConnection:
+        with self._lock:
+            connection = self._connections.get(connection_name)
+            if connection is None:
+                connection = self._get_provider_metadata().createConnection(connection_name)
+                self._connections[connection_name] = connection
+            return connection
+
+    def get_connection_for_layer(self, layer: QgsVectorLayer) -> QgsAbstractDatabaseProviderConnection | None:
+        """Returns a connection to the database of the layer, or None if the layer is not in PostgreSQL."""
+        if layer.providerType() != "postgres":
+            return None
+        connection_info = QgsDataSourceUri(layer.source()).connectionInfo(False)
+        with self._lock:
+            connection = self._layer_connections.get(connection_info)
+            if connection is None:
+                connection = self._get_provider_metadata().createConnection(connection_info, {})
+                self._layer_connections[connection_info] = connection
+            return connection
+
+    def execute_sql(
+        self,
+        connection: str | QgsAbstractDatabaseProviderConnection,
+        sql: str,
+        feedback: QgsFeedback | None = None,
+        timeout: float = DEFAULT_QUERY_TIMEOUT,
+    ) -> list[list[Any]]:
+        """
+        Runs the SQL in the calling thread and returns the result rows.
+
+        `connection` is either a connection name or a connection returned by this manager.
+
+        The query is cancelled if `feedback` is cancelled or the query takes longer than `timeout` seconds,
+        in which case `QueryTimeoutError` is raised.
+        """
+        if isinstance(connection, str):
+            connection = self.get_connection(connection)
+        if feedback is None:
+            feedback = QgsFeedback()
+        timed_out = threading.Event()
+
+        def cancel_on_timeout():
+            timed_out.set()
+            feedback.cancel()
+
+        timer = threading.Timer(timeout, cancel_on_timeout)
+        timer.start()
+        try:
+            rows = connection.executeSql(sql, feedback)
+        finally:
+            timer.cancel()
+        if timed_out.is_set():
+            raise QueryTimeoutError(timeout)
+        return rows
+
+    def clear(self):
+        """Drops the connection handles and stops following changes to the connections."""
+        self._drop_connections()
+        provider_metadata = self._provider_metadata
+        self._provider_metadata = None
+        if provider_metadata is not None:
+            with suppress(TypeError, RuntimeError):
+                provider_metadata.connectionCreated.disconnect(self._on_connections_changed)
+                provider_metadata.connectionDeleted.disconnect(self._on_connections_changed)
+                provider_metadata.connectionChanged.disconnect(self._on_connections_changed)
+
+    def _drop_connections(self):
+        with self._lock:
+            self._connections.clear()
+            self._layer_connections.clear()
+            self._connection_names = None
+
+    def _get_provider_metadata(self) -> QgsProviderMetadata:
+        if self._provider_metadata is None:
+            self._provider_metadata = _postgres_provider_metadata()
+            self._provider_metadata.connectionCreated.connect(self._on_connections_changed)
+            self._provider_metadata.connectionDeleted.connect(self._on_connections_changed)
+            self._provider_metadata.connectionChanged.connect(self._on_connections_changed)
+        return self._provider_metadata
+
+    def _on_connections_changed(self, _connection_name: str):
+        self._drop_connections()
+
+
+database_connections = DatabaseConnectionManager()
+
+
+class SqlQueryTask(QgsTask):
+    """
+    Runs SQL with `database_connections` in a background task.
+
+    The result rows are stored in `rows`. If the query fails or times out, the error is stored in `exception`.
+    """
+
+    def __init__(self, description: str, connection_name: str, sql: str, timeout: float = DEFAULT_QUERY_TIMEOUT):
+        super().__init__(description, QgsTask.CanCancel)
+        self.connection_name = connection_name
+        self.sql = sql
+        self.timeout = timeout
+        # Create the connection handle in the main thread
+        database_connections.get_connection(connection_name)
+
+        self._feedback = QgsFeedback()
+        self.rows: list[list[Any]] = []
+        self.exception: Exception | None = None
+
+    def cancel(self):
+        self._feedback.cancel()
+        super().cancel()
+
+    def run(self) -> bool:
+        try:
+            self.rows = database_connections.execute_sql(self.connection_name, self.sql, self._feedback, self.timeout)
+        except Exception as e:  # noqa: BLE001
+            self.exception = e
+            return False
+        return not self.isCanceled()
+
+
+def get_existing_database_connection_names() -> list[str]:
+    """
+    Retrieve the list of existing database connections from QGIS settings.
+
+    :return: A set of available PostgreSQL connection names.
+    """
 
-    return list(postgres_provider_metadata.dbConnections(False))
+    return database_connections.connection_names()
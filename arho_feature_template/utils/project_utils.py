@@ -1,13 +1,18 @@
+from __future__ import annotations
+
 import logging
+from contextlib import suppress
+from typing import Iterable
 
 from qgis.core import QgsProject, QgsVectorLayer
+from qgis.PyQt.QtCore import QObject
 
 from arho_feature_template.exceptions import LayerNotFoundError
 
 logger = logging.getLogger(__name__)
 
 
-def get_vector_layer_from_project(layer_name: str) -> QgsVectorLayer:
+def _find_vector_layer(layer_name: str) -> QgsVectorLayer:
     project = QgsProject.instance()
     if not project:
         raise LayerNotFoundError(layer_name)
@@ -23,3 +28,88 @@ def get_vector_layer_from_project(layer_name: str) -> QgsVectorLayer:
     if len(vector_layers) > 1:
         logger.warning("Multiple layers with the same name found. Using the first one.")
     return vector_layers[0]
+
+
+class LayerRegistry(QObject):
+    """
+    Caches the vector layers of the project by layer name.
+
+    A layer is looked up from the project only the first time it is requested. Cached layers are dropped when
+    they are removed from the project or renamed, and all of them when the project is cleared. Missing layers
+    are not cached, so layers added later are found.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._layers: dict[str, QgsVectorLayer] = {}
+        self._project: QgsProject | None = None
+
+    def get(self, layer_name: str) -> QgsVectorLayer:
+        layer = self._layers.get(layer_name)
+        if layer is not None:
+            return layer
+
+        layer = _find_vector_layer(layer_name)
+        self._connect_project()
+        self._layers[layer_name] = layer
+        layer.nameChanged.connect(self._on_layer_name_changed)
+        return layer
+
+    def exists(self, layer_name: str) -> bool:
+        try:
+            self.get(layer_name)
+        except LayerNotFoundError:
+            return False
+        return True
+
+    def missing_layer_names(self, layer_names: Iterable[str]) -> list[str]:
+        """Returns the names of the given layers that are not found in the project."""
+        return [layer_name for layer_name in layer_names if not self.exists(layer_name)]
+
+    def clear(self):
+        for layer in self._layers.values():
+            self._disconnect_layer(layer)
+        self._layers.clear()
+
+    def _connect_project(self):
+        project = QgsProject.instance()
+        if project is self._project:
+            return
+        self._project = project
+        project.layerWillBeRemoved.connect(self._on_layer_removed)
+        project.layersRemoved.connect(self._on_layers_removed)
+        project.cleared.connect(self.clear)
+
+    def _disconnect_layer(self, layer: QgsVectorLayer):
+        # Layer might have been deleted already
+        with suppress(TypeError, RuntimeError):
+            layer.nameChanged.disconnect(self._on_layer_name_changed)
+
+    def _drop_layers(self, layer_ids: Iterable[str]):
+        layer_ids = set(layer_ids)
+        for layer_name, layer in list(self._layers.items()):
+            try:
+                dropped = layer.id() in layer_ids
+            except RuntimeError:
+                dropped = True
+            if dropped:
+                self._disconnect_layer(layer)
+                del self._layers[layer_name]
+
+    def _on_layer_removed(self, layer_id: str):
+        self._drop_layers([layer_id])
+
+    def _on_layers_removed(self, layer_ids: list[str]):
+        self._drop_layers(layer_ids)
+
+    def _on_layer_name_changed(self):
+        layer = self.sender()
+        if isinstance(layer, QgsVectorLayer):
+            self._drop_layers([layer.id()])
+
+
+layer_registry = LayerRegistry()
+
+
+def get_vector_layer_from_project(layer_name: str) -> QgsVectorLayer:
+    return layer_registry.get(layer_name)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from qgis.core import QgsFeature, QgsField, QgsFields
+from qgis.PyQt.QtCore import NULL, QVariant
+
+from arho_feature_template.project.layers.association_index import AssociationIndex
+
+TARGET_ATTRIBUTES = ["plan_regulation_id", "plan_proposition_id"]
+
+
+def _feature(fid: int, group_id, regulation_id=NULL, proposition_id=NULL) -> QgsFeature:
+    fields = QgsFields()
+    for name in ["plan_regulation_group_id", *TARGET_ATTRIBUTES]:
+        fields.append(QgsField(name, QVariant.String))
+    feature = QgsFeature(fields, fid)
+    feature["plan_regulation_group_id"] = group_id
+    feature["plan_regulation_id"] = regulation_id
+    feature["plan_proposition_id"] = proposition_id
+    return feature
+
+
+def _index(*features: QgsFeature) -> AssociationIndex:
+    index = AssociationIndex("plan_regulation_group_id", TARGET_ATTRIBUTES)
+    for feature in features:
+        index.add_feature(feature)
+    return index
+
+
+def test_add_feature_indexes_both_directions():
+    index = _index(_feature(1, "group", regulation_id="regulation"), _feature(2, "group", proposition_id="proposition"))
+
+    assert index.exists("group", ("plan_regulation_id", "regulation"))
+    assert index.targets("group") == {
+        ("plan_regulation_id", "regulation"): {1},
+        ("plan_proposition_id", "proposition"): {2},
+    }
+    assert index.sources(("plan_proposition_id", "proposition")) == {"group": {2}}
+
+
+def test_remove_feature_drops_pair():
+    index = _index(_feature(1, "group", regulation_id="regulation"))
+
+    index.remove_feature(1)
+
+    assert not index.exists("group", ("plan_regulation_id", "regulation"))
+    assert index.targets("group") == {}
+    assert index.sources(("plan_regulation_id", "regulation")) == {}
+
+
+def test_duplicate_rows_keep_pair_until_last_is_removed():
+    index = _index(_feature(1, "group", regulation_id="regulation"), _feature(2, "group", regulation_id="regulation"))
+    assert index.targets("group") == {("plan_regulation_id", "regulation"): {1, 2}}
+
+    index.remove_feature(1)
+    assert index.exists("group", ("plan_regulation_id", "regulation"))
+    assert index.sources(("plan_regulation_id", "regulation")) == {"group": {2}}
+
+    index.remove_feature(2)
+    assert not index.exists("group", ("plan_regulation_id", "regulation"))
+
+
+def test_readding_feature_replaces_previous_row():
+    index = _index(_feature(1, "group", regulation_id="regulation"))
+
+    index.add_feature(_feature(1, "other_group", regulation_id="regulation"))
+
+    assert index.targets("group") == {}
+    assert index.sources(("plan_regulation_id", "regulation")) == {"other_group": {1}}
+
+
+def test_null_source_or_target_is_ignored():
+    index = _index(_feature(1, NULL, regulation_id="regulation"), _feature(2, "group"))
+
+    assert index.sources(("plan_regulation_id", "regulation")) == {}
+    assert index.targets("group") == {}
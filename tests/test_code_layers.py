@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+from qgis.core import QgsFeature, QgsVectorLayer
+
+from arho_feature_template.project.layers.code_layers import AbstractCodeLayer
+
+
+class _CodeLayer(AbstractCodeLayer):
+    name = "Testikoodisto"
+
+
+@pytest.fixture
+def code_layer(monkeypatch) -> QgsVectorLayer:
+    layer = QgsVectorLayer("None?field=id:string&field=value:string", _CodeLayer.name, "memory")
+    feature = QgsFeature(layer.fields())
+    feature["id"] = "id-1"
+    feature["value"] = "1"
+    layer.dataProvider().addFeatures([feature])
+
+    monkeypatch.setattr(_CodeLayer, "get_from_project", classmethod(lambda _cls: layer))
+    monkeypatch.setattr(_CodeLayer, "_cache", {})
+    monkeypatch.setattr(_CodeLayer, "_indexes", {})
+    monkeypatch.setattr(_CodeLayer, "_missing_lookups", set())
+    return layer
+
+
+@pytest.fixture
+def provider_requests(monkeypatch) -> list[tuple[str, str]]:
+    requests = []
+    get_features = _CodeLayer.get_features_by_attribute_value.__func__
+
+    def counting_get_features(cls, attribute, value, *args, **kwargs):
+        requests.append((attribute, value))
+        return get_features(cls, attribute, value, *args, **kwargs)
+
+    monkeypatch.setattr(_CodeLayer, "get_features_by_attribute_value", classmethod(counting_get_features))
+    return requests
+
+
+@pytest.mark.usefixtures("code_layer")
+def test_miss_reaches_provider_once(provider_requests):
+    assert _CodeLayer.get_id_by_attribute("value", "2") is None
+    assert _CodeLayer.get_id_by_attribute("value", "2") is None
+    assert _CodeLayer.get_attribute_value_by_another_attribute_value("id", "value", "2") is None
+
+    assert provider_requests == [("value", "2")]
+
+
+@pytest.mark.usefixtures("code_layer")
+def test_uncached_lookups_are_fetched_from_provider(provider_requests):
+    assert _CodeLayer.get_id_by_attribute("value", "1") == "id-1"
+    assert _CodeLayer.get_attribute_by_id("value", "id-1") == "1"
+
+    assert provider_requests == [("value", "1"), ("id", "id-1")]
+
+
+@pytest.mark.usefixtures("code_layer")
+def test_resaving_feature_keeps_other_features_with_same_value_indexed():
+    _CodeLayer.set_cache({"id-1": {"id": "id-1", "value": "1"}, "id-2": {"id": "id-2", "value": "1"}})
+    assert _CodeLayer.get_id_by_attribute("value", "1") == "id-1"
+
+    _CodeLayer.set_cache({"id-1": {"id": "id-1", "value": "3"}})
+
+    assert _CodeLayer.get_id_by_attribute("value", "1") == "id-2"
+    assert _CodeLayer.get_id_by_attribute("value", "3") == "id-1"
+
+
+@pytest.mark.usefixtures("code_layer")
+def test_set_cache_clears_misses_and_bumps_version_once():
+    _CodeLayer.get_id_by_attribute("value", "2")
+    version = _CodeLayer.cache_version()
+
+    _CodeLayer.set_cache({"id-2": {"id": "id-2", "value": "2"}, "id-3": {"id": "id-3", "value": "3"}})
+
+    assert _CodeLayer.cache_version() == version + 1
+    assert _CodeLayer.get_id_by_attribute("value", "2") == "id-2"
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from qgis.core import QgsFeature, QgsField, QgsFields
+from qgis.PyQt.QtCore import NULL, QVariant
+
+from arho_feature_template.project.layers.owner_index import OwnerIndex
+
+OWNER_ATTRIBUTES = ["plan_id", "line_id"]
+
+
+def _feature(fid: int, plan_id=NULL, line_id=NULL) -> QgsFeature:
+    fields = QgsFields()
+    for name in OWNER_ATTRIBUTES:
+        fields.append(QgsField(name, QVariant.String))
+    feature = QgsFeature(fields, fid)
+    feature["plan_id"] = plan_id
+    feature["line_id"] = line_id
+    return feature
+
+
+def test_rows_are_indexed_by_owner():
+    index = OwnerIndex(OWNER_ATTRIBUTES)
+    index.add_feature(_feature(1, plan_id="plan"))
+    index.add_feature(_feature(2, plan_id="plan"))
+    index.add_feature(_feature(3, line_id="line"))
+
+    assert index.rows(("plan_id", "plan")) == {1, 2}
+    assert index.rows(("line_id", "line")) == {3}
+    assert index.rows(("line_id", "plan")) == set()
+
+
+def test_readding_row_moves_it_to_new_owner():
+    index = OwnerIndex(OWNER_ATTRIBUTES)
+    index.add_feature(_feature(1, plan_id="plan"))
+
+    index.add_feature(_feature(1, line_id="line"))
+
+    assert index.rows(("plan_id", "plan")) == set()
+    assert index.rows(("line_id", "line")) == {1}
+
+
+def test_removed_and_ownerless_rows_are_not_indexed():
+    index = OwnerIndex(OWNER_ATTRIBUTES)
+    index.add_feature(_feature(1, plan_id="plan"))
+    index.add_feature(_feature(2))
+
+    index.remove_feature(1)
+
+    assert index.rows(("plan_id", "plan")) == set()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from arho_feature_template.core.models import RegulationGroup, RegulationGroupHeadingIndex, RegulationGroupLibrary
+
+
+def _library(name: str, *headings: str | None) -> RegulationGroupLibrary:
+    return RegulationGroupLibrary(
+        name=name, regulation_groups=[RegulationGroup(heading=heading, letter_code=name) for heading in headings]
+    )
+
+
+def test_resolve_finds_group_by_heading():
+    index = RegulationGroupHeadingIndex([_library("first", "A", "B")])
+
+    group = index.resolve("B")
+
+    assert group is not None
+    assert group.heading == "B"
+    assert index.unresolved_headings == set()
+    assert index.ambiguous_headings == {}
+
+
+def test_first_library_wins_and_duplicates_are_reported():
+    index = RegulationGroupHeadingIndex([_library("first", "A"), _library("second", "A", "B"), _library("third", "A")])
+
+    group = index.resolve("A")
+
+    assert group is not None
+    assert group.letter_code == "first"
+    assert index.ambiguous_headings == {"A": ["first", "second", "third"]}
+
+
+def test_duplicates_are_reported_only_when_resolved():
+    index = RegulationGroupHeadingIndex([_library("first", "A"), _library("second", "A")])
+
+    index.resolve("B")
+
+    assert index.ambiguous_headings == {}
+    assert index.unresolved_headings == {"B"}
+
+
+def test_groups_without_heading_are_skipped():
+    index = RegulationGroupHeadingIndex([_library("first", None, "A")])
+
+    assert list(index.groups) == ["A"]
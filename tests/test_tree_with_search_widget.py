@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from qgis.PyQt.QtCore import QModelIndex
+from qgis.PyQt.QtGui import QStandardItem, QStandardItemModel
+
+from arho_feature_template.gui.components.tree_with_search_widget import (
+    TreeSearchProxyModel,
+    _build_search_index,
+    normalize_search_text,
+)
+
+
+def _model() -> QStandardItemModel:
+    model = QStandardItemModel()
+    noise = QStandardItem("Melu")
+    noise.appendRow(QStandardItem("Ääni"))
+    noise.appendRow(QStandardItem("Abc"))
+    model.appendRow(noise)
+    model.appendRow(QStandardItem("Alue"))
+    return model
+
+
+def _visible_texts(proxy: TreeSearchProxyModel, parent: QModelIndex | None = None) -> list[str]:
+    parent = parent or QModelIndex()
+    texts = []
+    for row in range(proxy.rowCount(parent)):
+        index = proxy.index(row, 0, parent)
+        texts.append(index.data())
+        texts.extend(_visible_texts(proxy, index))
+    return texts
+
+
+def test_normalize_search_text():
+    assert normalize_search_text("Ääni") == "aani"
+    assert normalize_search_text("  Kaava\t  MÄÄRÄYS \n") == "kaava maarays"
+    assert normalize_search_text("Straße") == "strasse"
+
+
+def test_build_search_index():
+    index = _build_search_index(_model())
+
+    assert index[(0,)].sub_tree_text == "melu\naani\nabc"
+    assert index[(0,)].top_level_text == "melu"
+    assert index[(0, 0)].sub_tree_text == "aani"
+    assert index[(0, 0)].top_level_text == "melu"
+    assert index[(1,)].sub_tree_text == "alue"
+    assert index[(1,)].top_level_text == "alue"
+
+
+def test_proxy_narrows_search():
+    model = _model()
+    proxy = TreeSearchProxyModel()
+    proxy.setSourceModel(model)
+
+    proxy.set_search_text("a")
+    assert _visible_texts(proxy) == ["Melu", "Ääni", "Abc", "Alue"]
+
+    proxy.set_search_text("ab")
+    assert _visible_texts(proxy) == ["Melu", "Abc"]
+
+    proxy.set_search_text("")
+    assert _visible_texts(proxy) == ["Melu", "Ääni", "Abc", "Alue"]
+
+
+def test_proxy_shows_children_of_matching_top_level_item():
+    model = _model()
+    proxy = TreeSearchProxyModel()
+    proxy.setSourceModel(model)
+
+    proxy.set_search_text("mel")
+
+    assert _visible_texts(proxy) == ["Melu", "Ääni", "Abc"]